@@ -0,0 +1,155 @@
+"""
+Benchmarks of parsing and extraction on synthetic GM pages of various sizes.
+
+Records wall time (best of --repeat runs) and peak memory (measured with tracemalloc in a separate run)
+of each benchmark and compares them with the stored baseline. Timings depend on the machine
+so the baseline should be regenerated with --update-baseline when moving to a different one.
+
+    python -m benchmarks.bench_extraction
+    python -m benchmarks.bench_extraction --sizes small medium --update-baseline
+"""
+import argparse
+import gc
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+from tests.gm_pages import generate_season_pages, write_archive
+from unicorner import SeasonParse, UnicornerEnv
+from unicorner.extraction import create_extraction, iter_extraction, list_seasons, write_extraction
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# name -> (number of teams, number of weeks, number of seasons)
+SIZES = {
+    "small": (8, 12, 2),
+    "medium": (16, 30, 5),
+    "large": (20, 40, 8),
+}
+
+
+def measure(func: Callable, repeat: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(times), "peak_kb": peak / 1024}
+
+
+def run_size(size: str, work_dir: Path, repeat: int) -> Dict[str, Dict[str, float]]:
+    num_teams, num_weeks, num_seasons = SIZES[size]
+    standings_html, fixtures_html = generate_season_pages(100, num_teams=num_teams, num_weeks=num_weeks)
+    input_dir = write_archive(work_dir / size / "input", num_seasons, num_teams=num_teams, num_weeks=num_weeks)
+    output_dir = work_dir / size / "output"
+    output_dir.mkdir()
+
+    standings_parsed = SeasonParse()
+    standings_parsed.parse_standings_page(html=standings_html)
+
+    events_env = UnicornerEnv()
+    events_env.html_parser = "events"
+
+    # Tables are parsed lazily, access them to have them parsed
+    def parse_standings_page(env=None):
+        season = SeasonParse(env=env)
+        season.parse_standings_page(html=standings_html)
+        season.teams
+
+    def parse_fixtures_page(env=None):
+        season = SeasonParse(env=env)
+        season.teams = standings_parsed.teams
+        season.season_id = standings_parsed.season_id
+        season.game_days = []
+        season.parse_fixtures_page(html=fixtures_html)
+        season.game_days
+
+    extraction = create_extraction(input_dir=input_dir)
+
+    return {
+        f"{size}.parse_standings_page": measure(parse_standings_page, repeat),
+        f"{size}.parse_fixtures_page": measure(parse_fixtures_page, repeat),
+        f"{size}.parse_standings_page_events": measure(lambda: parse_standings_page(events_env), repeat),
+        f"{size}.parse_fixtures_page_events": measure(lambda: parse_fixtures_page(events_env), repeat),
+        f"{size}.list_seasons": measure(lambda: list_seasons(input_dir), repeat),
+        f"{size}.create_extraction": measure(lambda: create_extraction(input_dir=input_dir), repeat),
+        f"{size}.write_extraction": measure(lambda: write_extraction(extraction, output_dir=output_dir), repeat),
+        f"{size}.extract_streaming": measure(
+            lambda: write_extraction(iter_extraction(input_dir=input_dir), output_dir=output_dir), repeat,
+        ),
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> bool:
+    """
+    Print results next to baseline and return False if any benchmark regressed by more than tolerance.
+    """
+    ok = True
+    print(f"{'benchmark':<36} {'seconds':>10} {'baseline':>10} {'peak KiB':>10} {'baseline':>10}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        flags = []
+        if not base:
+            # A benchmark without a baseline could never fail, regenerate it with --update-baseline
+            flags.append("NO BASELINE")
+        else:
+            if result["seconds"] > base["seconds"] * (1 + tolerance):
+                flags.append("SLOWER")
+            if result["peak_kb"] > base["peak_kb"] * (1 + tolerance):
+                flags.append("MORE MEMORY")
+        print(
+            f"{name:<36} {result['seconds']:>10.4f} {base['seconds'] if base else float('nan'):>10.4f} "
+            f"{result['peak_kb']:>10.0f} {base['peak_kb'] if base else float('nan'):>10.0f} {' '.join(flags)}"
+        )
+        ok = ok and not flags
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown relative to the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="Also write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            results.update(run_size(size, Path(work_dir), repeat=args.repeat))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    ok = compare(results, baseline, tolerance=args.tolerance)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.update_baseline:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of incremental rating updates.
+
+Ratings are built from histories of increasing length and saved to a checkpoint, then the
+checkpoint is loaded and updated with the whole history plus the same number of new games,
+like the ratings command does with all games of its input. Only the new games are rated
+but the whole history is still scanned, so the incremental update grows with the history,
+just much slower than replaying it. Fails if replaying the longest history is less than
+--min-speedup times slower than the incremental update of it.
+
+    python -m benchmarks.bench_ratings
+    python -m benchmarks.bench_ratings --history 1000 10000 100000 --new-games 500
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from tests.gm_pages import generate_games
+from unicorner.ratings import EloRatings
+
+
+def best_time(func: Callable, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--new-games", type=int, default=500)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    all_games = generate_games(max(args.history) + args.new_games, num_teams=args.teams)
+
+    print(f"{'history':>10} {'replay s':>10} {'incremental s':>14} {'speedup':>8}")
+    speedup = None
+    with tempfile.TemporaryDirectory() as work_dir:
+        checkpoint_path = Path(work_dir) / "ratings.json"
+        for history in args.history:
+            history_games = all_games[:history]
+            games = all_games[:history + args.new_games]
+
+            ratings = EloRatings()
+            ratings.update(history_games)
+            ratings.save(checkpoint_path)
+
+            replay_time = best_time(lambda: EloRatings().update(games), args.repeat)
+            # Loading the checkpoint is part of the incremental update
+            incremental_time = best_time(lambda: EloRatings.load(checkpoint_path).update(games), args.repeat)
+            speedup = replay_time / incremental_time
+            print(f"{history:>10} {replay_time:>10.4f} {incremental_time:>14.4f} {speedup:>8.1f}")
+
+    print(f"Incremental update of the longest history is {speedup:.1f}x faster than replaying it")
+    if speedup < args.min_speedup:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
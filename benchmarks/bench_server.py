@@ -0,0 +1,97 @@
+"""
+Benchmark of requests per second of the query server.
+
+An extraction of synthetic seasons is served on localhost and clients on kept-alive connections
+request standings, fixtures, results and games on dates of all seasons. Clients run in the same
+process and event loop as the server, so all of it shares one core. The first request of each
+target computes its response, the rest are answered from the response cache.
+Fails if fewer than --min-rps requests per second are answered.
+
+    python -m benchmarks.bench_server
+    python -m benchmarks.bench_server --seasons 200 --clients 20 --requests 20000
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from tests.gm_pages import write_archive
+from unicorner.extraction import create_extraction, write_extraction
+from unicorner.server import ExtractionServer
+
+
+def get_targets(server: ExtractionServer) -> List[str]:
+    archive = server.loaded.archive
+    targets = ["/seasons"]
+    for season_id in archive.seasons:
+        targets += [
+            f"/seasons/{season_id}/standings",
+            f"/seasons/{season_id}/fixtures",
+            f"/seasons/{season_id}/results",
+        ]
+        games = archive.games_of_season(season_id)
+        targets.append(f"/games?date={games[0].scheduled_time.date()}")
+    return targets
+
+
+async def run_client(port: int, targets, count: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for target in itertools.islice(targets, count):
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        content_length = 0
+        status_line = await reader.readline()
+        assert status_line.startswith(b"HTTP/1.1 200"), status_line
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            if line.lower().startswith(b"content-length:"):
+                content_length = int(line.split(b":")[1])
+        await reader.readexactly(content_length)
+    writer.close()
+
+
+async def measure(server: ExtractionServer, clients: int, requests: int) -> float:
+    port = await server.start(port=0)
+    targets = itertools.cycle(get_targets(server))
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client(port, targets, requests // clients) for _ in range(clients)))
+        return time.perf_counter() - started
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--min-rps", type=float, default=500)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = write_archive(Path(work_dir) / "input", num_seasons=args.seasons)
+        extraction_dir = Path(work_dir) / "extraction"
+        extraction_dir.mkdir()
+        write_extraction(create_extraction(input_dir=input_dir), extraction_dir)
+
+        started = time.perf_counter()
+        server = ExtractionServer(extraction_dir)
+        print(f"Loaded {len(server.loaded.archive)} games in {time.perf_counter() - started:.3f} s")
+
+        elapsed = asyncio.run(measure(server, clients=args.clients, requests=args.requests))
+
+    rps = args.requests // args.clients * args.clients / elapsed
+    print(f"{rps:.0f} requests per second with {args.clients} clients")
+    if rps < args.min_rps:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
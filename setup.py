@@ -12,6 +12,11 @@ requirements = [
     "requests",
 ]
 
+extras_requirements = {
+    "lxml": ["lxml"],
+    "numpy": ["numpy"],
+}
+
 setup_requirements = ["pytest-runner", ]
 
 test_requirements = ["pytest>=3", ]
@@ -31,6 +36,7 @@ setup(
     ],
     description="GM standings and fixtures parser",
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="BSD license",
     long_description=readme,
     include_package_data=True,
@@ -0,0 +1,313 @@
+"""
+Generator of synthetic GM standings and fixtures pages, and other test data shared by tests and benchmarks.
+
+Pages follow the structure of the real pages in tests/data closely enough for SeasonParse:
+a round robin regular season (with byes when the number of teams is odd), a finals week,
+a few games with no score, and a fixtures page which repeats the last played week
+(those games are discarded as duplicates) followed by upcoming weeks.
+"""
+import csv
+import datetime as dt
+import random
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from unicorner.dtos import GameDto
+from unicorner.values import GameOutcomes, SeasonStages
+
+LEAGUE_ID = 505
+DIVISION_ID = 3568
+
+GAME_TIMES = ("18:45", "19:30", "20:15", "21:00")
+VENUES = ("Sports Hall", "Main Court")
+
+FINALS_STAGES = ("Grand Final", "3rd Place Playoff", "5th Place Playoff", "7th Place Final")
+
+# One in this many played games has no score
+MISSING_SCORE_EVERY = 37
+
+
+def round_robin(team_ids: List[int], num_weeks: int) -> List[List[Tuple[int, int]]]:
+    """
+    Pairings for num_weeks weeks using the circle method. None in a pairing means a bye.
+    """
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)
+    weeks = []
+    for week in range(num_weeks):
+        pairs = []
+        for i in range(len(teams) // 2):
+            home, away = teams[i], teams[-1 - i]
+            pairs.append((home, away) if week % 2 else (away, home))
+        weeks.append(pairs)
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    return weeks
+
+
+def _team_link(season_id: int, team_id: int) -> str:
+    return (
+        f'TeamProfile.aspx?VenueId=0&amp;LeagueId={LEAGUE_ID}&amp;SeasonId={season_id}'
+        f'&amp;DivisionId={DIVISION_ID}&amp;TeamId={team_id}'
+    )
+
+
+def _page(season_id: int, season_name: str, page_title: str, link_page: str, body: str) -> str:
+    title = f"Basketball - Mixed (Synthetic (City) - Thurs - Rec) - {season_name} - Division 1 - {page_title}"
+    nav = ''.join(f'<li><a href="/page{i}">Page {i}</a></li>' for i in range(30))
+    return (
+        '<!DOCTYPE html>\n<html><head><script>var x = 1;</script><title>\n\t'
+        f'{title} \n</title><link rel="stylesheet" href="style.css" /></head>\n'
+        f'<body><div class="Nav"><ul>{nav}</ul></div>\n'
+        f'<h3>{title}  (<a href="{link_page}.aspx?VenueId=0&LeagueId={LEAGUE_ID}&SeasonId={season_id}'
+        f'&DivisionId={DIVISION_ID}">{link_page}</a>)</h3>'
+        f'{body}'
+        '<div class="Footer"><script>var y = 2;</script></div></body></html>\n'
+    )
+
+
+def _game_row(season_id, team_names, game_id, time, venue, home, away, score, band, duplicate_nobr=True) -> str:
+    if score is None:
+        score_cell = f'<nobr data-fixture-id="{game_id}">vs</nobr>'
+    elif duplicate_nobr:
+        score_cell = (
+            f'<nobr data-fixture-id="{game_id}"><div><nobr data-fixture-id="">'
+            f'{score[0]} - {score[1]}</nobr></div></nobr>'
+        )
+    else:
+        score_cell = f'<div><nobr data-fixture-id="{game_id}">vs</nobr></div>'
+    return (
+        f'<tr class="FRow{" FBand" if band else ""}"><td class="FDate">{time}</td>'
+        f'<td class="FPlayingArea"><nobr>{venue}<br /></nobr></td>'
+        f'<td class="FHomeTeam"><a href="{_team_link(season_id, home)}">{team_names[home]}</a><br /></td>'
+        f'<td class="FScore">{score_cell}</td>'
+        f'<td class="FAwayTeam"><a href="{_team_link(season_id, away)}">{team_names[away]}</a><br /></td></tr>'
+    )
+
+
+def _bye_row(season_id, team_names, team_id) -> str:
+    return (
+        f'<tr class="FRow"><td class="FDate">Bye</td><td class="FPlayingArea"></td>'
+        f'<td class="FHomeTeam"><a href="{_team_link(season_id, team_id)}">{team_names[team_id]}</a></td>'
+        f'<td class="FScore"></td><td class="FAwayTeam"></td></tr>'
+    )
+
+
+def _title_row(title: str) -> str:
+    return f'<tr class="FRow"><td colspan="2"><br /></td><td class="FTitle" colspan="3">{title}</td></tr>'
+
+
+def _week_table(date: dt.date, rows: List[str]) -> str:
+    return ''.join([
+        f'<table class="FTable"><tr class="FHeader"><td colspan="5">{date.strftime("%A %d %b %Y")}</td></tr>',
+        *rows,
+        '</table>',
+        # Mobile version of the same week, which the parser ignores
+        f'<table class="SpawtzFixtureList"><tr><td class="SpawtzDate">{date.strftime("%A %d %B %Y")}</td></tr>',
+        *(f'<tr class="SpawtzBand"><td>{i}</td></tr>' for i in range(len(rows))),
+        '</table>',
+    ])
+
+
+def generate_season_pages(
+    season_id: int, num_teams: int = 8, num_weeks: int = 12, num_upcoming_weeks: int = 2,
+    first_week_date: dt.date = None, seed: int = None,
+) -> Tuple[str, str]:
+    """
+    Returns HTML of the standings page and the fixtures page of a synthetic season
+    of num_teams teams playing num_weeks regular season weeks followed by a finals week.
+    """
+    rnd = random.Random(season_id if seed is None else seed)
+    first_week_date = first_week_date or dt.date(2000, 1, 6) + dt.timedelta(weeks=(num_weeks + 4) * (season_id % 100))
+
+    team_ids = [1000 + i for i in range(num_teams)]
+    team_names = {team_id: f"Team {team_id}" for team_id in team_ids}
+    stats: Dict[int, Dict[str, int]] = {
+        team_id: dict(played=0, won=0, lost=0, drawn=0, ff=0, fa=0, score_for=0, score_against=0, points=0)
+        for team_id in team_ids
+    }
+    game_ids = iter(range(season_id * 100000, (season_id + 1) * 100000))
+
+    def record(home, away, score):
+        if score is None:
+            return
+        for team_id, own, other in ((home, score[0], score[1]), (away, score[1], score[0])):
+            s = stats[team_id]
+            s["played"] += 1
+            s["score_for"] += own
+            s["score_against"] += other
+            if (own, other) == (20, 0):
+                s["ff"] += 1
+                s["points"] += 3
+            elif (own, other) == (0, 20):
+                s["fa"] += 1
+                s["points"] += 1
+            elif own > other:
+                s["won"] += 1
+                s["points"] += 3
+            elif own < other:
+                s["lost"] += 1
+                s["points"] += 1
+            else:
+                s["drawn"] += 1
+                s["points"] += 2
+
+    def random_score():
+        roll = rnd.random()
+        if roll < 0.02:
+            return 20, 0
+        if roll < 0.03:
+            return 0, 20
+        return rnd.randint(20, 70), rnd.randint(20, 70)
+
+    schedule = round_robin(team_ids, num_weeks + num_upcoming_weeks)
+
+    results_tables = []
+    played_weeks = []
+    game_count = 0
+    for week in range(num_weeks):
+        rows = []
+        week_games = []
+        for i, (home, away) in enumerate(schedule[week]):
+            if home is None or away is None:
+                rows.append(_bye_row(season_id, team_names, home or away))
+                continue
+            game_count += 1
+            score = None if game_count % MISSING_SCORE_EVERY == 0 else random_score()
+            record(home, away, score)
+            game = (next(game_ids), GAME_TIMES[i % len(GAME_TIMES)], VENUES[i // len(GAME_TIMES) % len(VENUES)], home, away)
+            week_games.append(game)
+            rows.append(_game_row(season_id, team_names, *game, score, band=i % 2 == 0))
+        date = first_week_date + dt.timedelta(weeks=week)
+        played_weeks.append((date, week_games))
+        results_tables.append(_week_table(date, rows))
+
+    ranking = sorted(team_ids, key=lambda t: (-stats[t]["points"], -(stats[t]["score_for"] - stats[t]["score_against"])))
+
+    # Finals week: 1st v 2nd, 3rd v 4th and so on
+    finals_rows = []
+    for i, stage in enumerate(FINALS_STAGES):
+        if 2 * i + 1 >= len(ranking):
+            break
+        home, away = ranking[2 * i], ranking[2 * i + 1]
+        finals_rows.append(_title_row(stage))
+        score = rnd.randint(20, 70), rnd.randint(20, 70)
+        if score[0] == score[1]:
+            score = score[0] + 1, score[1]
+        finals_rows.append(_game_row(
+            season_id, team_names, next(game_ids), GAME_TIMES[i % len(GAME_TIMES)], VENUES[0], home, away, score,
+            band=i % 2 == 0,
+        ))
+    results_tables.append(_week_table(first_week_date + dt.timedelta(weeks=num_weeks), finals_rows))
+
+    standings_rows = []
+    for position, team_id in enumerate(ranking):
+        s = stats[team_id]
+        standings_rows.append(
+            f'<tr class="STRow{"Band" if position % 2 else ""}"><td><a class="ToolTipLeft">{position + 1}</a></td>'
+            f'<td class="STTeamCell"><a HREF="{_team_link(season_id, team_id)}">{team_names[team_id]}</a></td>'
+            f'<td>{s["played"]}</td><td>{s["won"]}</td><td>{s["lost"]}</td><td>{s["drawn"]}</td>'
+            f'<td>{s["ff"]}</td><td>{s["fa"]}</td><td>{s["score_for"]}</td><td>{s["score_against"]}</td>'
+            f'<td>{s["score_for"] - s["score_against"]}</td><td>0</td>'
+            f'<td><b><a class="ToolTipRight">{s["points"]}</a></b></td></tr>'
+        )
+    standings_table = ''.join([
+        '<table class="STTable"><tr class="STHeaderRow"><td><br /></td><td>Team</td><td>Pld</td><td>W</td>'
+        '<td>L</td><td>D</td><td>FF</td><td>FA</td><td>F</td><td>A</td><td>Dif</td><td>B</td><td>Pts</td></tr>',
+        *standings_rows,
+        '</table>',
+    ])
+
+    season_name = f"Season {season_id}"
+    standings_html = _page(
+        season_id, season_name, "Current Standings", "Fixtures",
+        standings_table + '<h3>Results</h3>' + ''.join(results_tables),
+    )
+
+    # Fixtures page repeats the last played week and lists upcoming weeks
+    fixtures_tables = []
+    if played_weeks:
+        date, week_games = played_weeks[-1]
+        fixtures_tables.append(_week_table(date, [
+            _game_row(season_id, team_names, *game, (0, 0), band=False, duplicate_nobr=False) for game in week_games
+        ]))
+    for week in range(num_weeks, num_weeks + num_upcoming_weeks):
+        rows = []
+        for i, (home, away) in enumerate(schedule[week]):
+            if home is None or away is None:
+                continue
+            game = (next(game_ids), GAME_TIMES[i % len(GAME_TIMES)], VENUES[0], home, away)
+            rows.append(_game_row(season_id, team_names, *game, (0, 0), band=i % 2 == 0, duplicate_nobr=False))
+        fixtures_tables.append(_week_table(first_week_date + dt.timedelta(weeks=week + 1), rows))
+
+    fixtures_html = _page(
+        season_id, season_name, "Current Fixtures", "Standings", ''.join(fixtures_tables),
+    )
+
+    return standings_html, fixtures_html
+
+
+def write_archive(
+    directory: Path, num_seasons: int, num_teams: int = 8, num_weeks: int = 12, first_season_id: int = 100,
+) -> Path:
+    """
+    Write standings and fixtures pages of num_seasons synthetic seasons to directory,
+    named the way extraction.parse_seasons expects.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for season_id in range(first_season_id, first_season_id + num_seasons):
+        standings_html, fixtures_html = generate_season_pages(season_id, num_teams=num_teams, num_weeks=num_weeks)
+        (directory / f"season-{season_id}-standings.html").write_text(standings_html)
+        (directory / f"season-{season_id}-fixtures.html").write_text(fixtures_html)
+    return directory
+
+
+def bundle_input(input_dir: Path, bundle_path: Path) -> Path:
+    """
+    Bundle files of input_dir under a directory, with fixtures pages before standings pages.
+    """
+    paths = sorted(input_dir.iterdir(), key=lambda p: (not p.name.endswith("fixtures.html"), p.name))
+    if bundle_path.name.endswith(".zip"):
+        with zipfile.ZipFile(bundle_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for path in paths:
+                zf.write(path, f"pages/{path.name}")
+    else:
+        with tarfile.open(bundle_path, "w:gz") as tf:
+            for path in paths:
+                tf.add(path, f"pages/{path.name}")
+    return bundle_path
+
+
+def rewrite_csv(path: Path, change_row: Callable[[Dict[str, str]], Optional[Dict[str, str]]]):
+    """
+    Rewrite rows of a CSV file written by write_extraction, change_row returns None to drop a row.
+    """
+    with path.open() as f:
+        reader = csv.DictReader(f)
+        field_names = reader.fieldnames
+        rows = [row for row in map(change_row, reader) if row is not None]
+    with path.open("w") as f:
+        writer = csv.DictWriter(f, fieldnames=field_names, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def generate_games(num_games: int, num_teams: int = 6, seed: int = 0) -> List[GameDto]:
+    """
+    Regular season games with scores between num_teams teams with ids "t0", "t1", ..., three games a week.
+    """
+    rnd = random.Random(seed)
+    started = dt.datetime(2020, 1, 6, 19)
+    games = []
+    for i in range(num_games):
+        home, away = rnd.sample(range(num_teams), 2)
+        home_pts, away_pts = rnd.randint(20, 60), rnd.randint(20, 60)
+        home_outcome, away_outcome = GameOutcomes.from_scores(home_pts, away_pts)
+        games.append(GameDto(
+            id=1000 + i, scheduled_time=started + dt.timedelta(days=7 * (i // 3)), season_stage=SeasonStages.regular,
+            home_team_id=f"t{home}", home_team_pts=home_pts, home_team_outcome=home_outcome,
+            away_team_id=f"t{away}", away_team_pts=away_pts, away_team_outcome=away_outcome,
+        ))
+    return games
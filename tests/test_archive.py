@@ -0,0 +1,56 @@
+import datetime as dt
+
+from unicorner.archive import SeasonArchive
+from unicorner.extraction import create_extraction
+from unicorner.values import SeasonStages
+
+from .gm_pages import write_archive
+
+
+def test_archive_queries(tmp_path):
+    write_archive(tmp_path, num_seasons=3, num_teams=8, num_weeks=10)
+    archive = SeasonArchive.from_input_dir(tmp_path)
+    games = archive.games
+
+    assert sorted(archive.seasons) == [100, 101, 102]
+    assert archive.times == sorted(archive.times)
+
+    season_games = archive.games_of_season(101)
+    assert season_games == [g for g in games if g.season_id == 101]
+    finals = archive.finals_of_season(101)
+    assert len(finals) == 4
+    assert {g.season_stage for g in finals} <= set(SeasonStages.all_playoffs)
+
+    team_id = season_games[0].home_team_id
+    assert archive.games_of_team(team_id) == [g for g in games if team_id in (g.home_team_id, g.away_team_id)]
+    assert archive.games_of_team("0999.1") == []
+
+    venue = archive.get_venues()[0]
+    schedule = archive.games_at_venue(venue)
+    assert schedule == [g for g in games if archive.get_venue(g.id) == venue]
+
+    start, end = games[10].scheduled_time, games[40].scheduled_time
+    assert archive.games_between(start, end) == [g for g in games if start <= g.scheduled_time < end]
+    assert archive.games_at_venue(venue, start, end) == [g for g in schedule if start <= g.scheduled_time < end]
+    assert archive.games_on(start.date()) == [g for g in games if g.scheduled_time.date() == start.date()]
+
+    assert archive.get_game(games[5].id) is games[5]
+    assert archive.get_game(1) is None
+
+
+def test_archive_of_franchises(data_dir):
+    archive = SeasonArchive.from_extraction(create_extraction(input_dir=data_dir))
+    franchise = archive.get_franchise_of_team("0114.4949")
+    assert franchise.name == "Burritos"
+    assert "0114.4949" in {t.id for t in archive.get_teams_of_franchise(int(franchise.id))}
+
+    games = archive.games_of_franchise(int(franchise.id))
+    assert games == archive.games_of_team("0114.4949")
+    assert len(games) == 11
+
+    in_june = archive.games_of_franchise(int(franchise.id), dt.datetime(2019, 6, 1), dt.datetime(2019, 7, 1))
+    assert in_june == [g for g in games if g.scheduled_time.month == 6]
+    assert 0 < len(in_june) < len(games)
+
+    # Extractions have no venues
+    assert archive.get_venues() == []
@@ -0,0 +1,51 @@
+import pytest
+
+from unicorner.bundle import is_bundle, iter_bundle_season_pages
+from unicorner.dtos import FranchiseDto, GameDto, SeasonDto, TeamDto
+from unicorner.extraction import create_extraction, extract_all, get_output_path, list_seasons
+
+from .gm_pages import bundle_input, write_archive
+
+
+@pytest.fixture
+def input_dir(data_dir, tmp_path):
+    input_dir = write_archive(tmp_path / "input", num_seasons=3, num_teams=6, num_weeks=6)
+    for path in data_dir.iterdir():
+        if path.suffix in (".html", ".csv"):
+            (input_dir / path.name).write_bytes(path.read_bytes())
+    return input_dir
+
+
+@pytest.mark.parametrize("bundle_name", ["pages.zip", "pages.tar.gz"])
+def test_extraction_from_bundle(input_dir, tmp_path, bundle_name):
+    bundle_path = bundle_input(input_dir, tmp_path / bundle_name)
+    assert is_bundle(bundle_path) and not is_bundle(input_dir)
+
+    expected = create_extraction(input_dir=input_dir)
+    for jobs in (1, 2):
+        extraction = create_extraction(input_dir=bundle_path, jobs=jobs)
+        for dto_cls in (FranchiseDto, TeamDto, SeasonDto, GameDto):
+            assert sorted(extraction[dto_cls], key=lambda d: d.id) == sorted(expected[dto_cls], key=lambda d: d.id)
+    assert len(expected[FranchiseDto]) == 26
+
+    assert [s.season_id for s in list_seasons(bundle_path)] == [100, 101, 102, 114]
+
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    extract_all(input_dir=bundle_path, output_dir=output_dir, incremental=True)
+    assert get_output_path(output_dir, GameDto).exists()
+
+
+def test_bundle_pages_are_paired(input_dir, tmp_path):
+    bundle_path = bundle_input(input_dir, tmp_path / "pages.tar.gz")
+    (input_dir / "season-101-fixtures.html").unlink()
+    bundle_path_without_fixtures = bundle_input(input_dir, tmp_path / "pages-without-fixtures.tar.gz")
+
+    seasons = list(iter_bundle_season_pages(bundle_path))
+    # All fixtures pages come first, so seasons are complete when their standings page is read
+    assert [season_id for season_id, _ in seasons] == [100, 101, 102, 114]
+    assert {tuple(sorted(pages)) for _, pages in seasons} == {("fixtures_path", "standings_path")}
+    assert str(seasons[0][1]["standings_path"]) == f"{bundle_path}:pages/season-100-standings.html"
+
+    seasons = dict(iter_bundle_season_pages(bundle_path_without_fixtures))
+    assert list(seasons[101]) == ["standings_path"]
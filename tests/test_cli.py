@@ -0,0 +1,67 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules which only the subcommands that need them should import
+HEAVY_MODULES = (
+    "bs4",
+    "lxml",
+    "numpy",
+    "requests",
+    "unicorner.extraction",
+    "unicorner.fetch",
+    "unicorner.season_page",
+)
+
+# Cumulative import time of unicorner.cli in microseconds. It takes about a fifth of that
+# when nothing heavy is imported, and several times that when bs4 and requests sneak in.
+IMPORT_TIME_BUDGET_US = 100000
+
+
+def get_import_times(statement: str) -> dict:
+    """
+    Cumulative import time in microseconds of each module imported by statement, as reported by -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], check=True, capture_output=True, text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_imports_are_lazy():
+    times = get_import_times("import unicorner.cli")
+    assert "unicorner.cli" in times
+    assert [name for name in HEAVY_MODULES if name in times] == []
+    assert times["unicorner.cli"] < IMPORT_TIME_BUDGET_US
+
+
+def test_season_parse_is_imported_on_demand():
+    times = get_import_times("from unicorner import SeasonParse")
+    assert "unicorner.season_page" in times
+
+
+def test_cli_help():
+    result = subprocess.run(
+        [sys.executable, "-m", "unicorner", "--help"], check=True, capture_output=True, text=True,
+    )
+    assert "extract_all" in result.stdout
+
+
+@pytest.mark.parametrize("output", ["sqlite", "snapshot"])
+def test_extract_all_rejects_incremental_output(data_dir, tmp_path, output):
+    result = subprocess.run(
+        [
+            sys.executable, "-m", "unicorner", "extract_all", "--input-dir", str(data_dir),
+            "--output", f"{output}:{tmp_path / 'out'}", "--incremental", "--no-cache",
+        ],
+        capture_output=True, text=True,
+    )
+    assert result.returncode != 0 and "--incremental" in result.stderr
+    assert list(tmp_path.iterdir()) == []
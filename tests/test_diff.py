@@ -0,0 +1,68 @@
+import json
+import shutil
+import subprocess
+import sys
+
+from unicorner.diff import DELETED, INSERTED, UPDATED, diff_extractions
+from unicorner.extraction import create_extraction, write_extraction
+from unicorner.snapshot import write_snapshot
+
+from .gm_pages import rewrite_csv
+
+
+def test_diff_extractions(data_dir, tmp_path):
+    old_dir = tmp_path / "old"
+    old_dir.mkdir()
+    write_extraction(create_extraction(input_dir=data_dir), old_dir)
+    write_snapshot(create_extraction(input_dir=data_dir), tmp_path / "old.snap")
+
+    # Same extraction as CSV files and as a snapshot
+    assert list(diff_extractions(old_dir, tmp_path / "old.snap")) == []
+    assert list(diff_extractions(old_dir, old_dir)) == []
+
+    new_dir = tmp_path / "new"
+    shutil.copytree(old_dir, new_dir)
+
+    def change_game(row):
+        if row["id"] == "204707":
+            row["away_team_pts"] = "52"
+        return row
+
+    def change_franchises(row):
+        if row["id"] == "1":
+            return None
+        return row
+
+    rewrite_csv(new_dir / "gmgames.csv", change_game)
+    rewrite_csv(new_dir / "gmfranchises.csv", change_franchises)
+    with (new_dir / "gmfranchises.csv").open("a") as f:
+        f.write('"100","New Franchise"\n')
+
+    changes = [(c.table, c.change, c.id) for c in diff_extractions(tmp_path / "old.snap", new_dir)]
+    assert changes == [
+        ("gmfranchises", INSERTED, "100"),
+        ("gmfranchises", DELETED, "1"),
+        ("gmgames", UPDATED, "204707"),
+    ]
+
+    deleted = next(c for c in diff_extractions(old_dir, new_dir) if c.change == DELETED)
+    assert deleted.row == {"id": "1", "name": "Supernova"}
+
+
+def test_diff_command(data_dir, tmp_path):
+    old_dir = tmp_path / "old"
+    old_dir.mkdir()
+    write_extraction(create_extraction(input_dir=data_dir), old_dir)
+    new_dir = tmp_path / "new"
+    new_dir.mkdir()
+    write_extraction(create_extraction(input_dir=data_dir), new_dir)
+    (new_dir / "gmseasons.csv").unlink()
+
+    result = subprocess.run(
+        [sys.executable, "-m", "unicorner", "diff", str(old_dir), str(new_dir)],
+        check=True, capture_output=True, text=True,
+    )
+    changes = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(c["table"], c["change"], c["id"]) for c in changes] == [("gmseasons", DELETED, "114")]
+    assert changes[0]["row"]["name"] == "Spring 2019"
+    assert "gmseasons: 1 deleted" in result.stderr
@@ -0,0 +1,139 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from unicorner.dtos import SeasonDto
+from unicorner.extraction import create_extraction
+from unicorner.fetch import FETCH_STATE_NAME, SeasonRef, create_session, fetch_seasons, load_fetch_state
+
+from .gm_pages import generate_season_pages
+
+
+class GmServer:
+    """
+    Stand-in for GM serving synthetic pages, with ETags and a number of failures to return before each page.
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.failures = {}
+        self.requests = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                key = (url.path.lstrip("/"), int(parse_qs(url.query)["SeasonId"][0]))
+                server.requests.append((key, self.headers.get("If-None-Match")))
+
+                if server.failures.get(key):
+                    server.failures[key] -= 1
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+
+                if key not in server.pages:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                body = server.pages[key].encode()
+                etag = f'"{hash(body)}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def add_season(self, season_id):
+        standings_html, fixtures_html = generate_season_pages(season_id, num_teams=6, num_weeks=4)
+        self.pages["Standings.aspx", season_id] = standings_html
+        self.pages["Fixtures.aspx", season_id] = fixtures_html
+
+
+@pytest.fixture
+def gm_server():
+    server = GmServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+def test_fetch_seasons(gm_server, tmp_path):
+    for season_id in (101, 102):
+        gm_server.add_season(season_id)
+    seasons = [SeasonRef(101, 505, 3568), SeasonRef(102, 505, 3568)]
+    session = create_session(pool_size=2, backoff_factor=0)
+
+    results = fetch_seasons(seasons, output_dir=tmp_path, base_url=gm_server.base_url, jobs=2, session=session)
+    assert sorted((r.season_id, r.page, r.status) for r in results) == [
+        (101, "fixtures", "downloaded"),
+        (101, "standings", "downloaded"),
+        (102, "fixtures", "downloaded"),
+        (102, "standings", "downloaded"),
+    ]
+    assert (tmp_path / "season-101-standings.html").read_text() == gm_server.pages["Standings.aspx", 101]
+    assert set(load_fetch_state(tmp_path)) == {
+        "season-101-standings.html", "season-101-fixtures.html",
+        "season-102-standings.html", "season-102-fixtures.html",
+    }
+
+    extraction = create_extraction(input_dir=tmp_path)
+    assert sorted(s.id for s in extraction[SeasonDto]) == [101, 102]
+
+    # Second run revalidates pages and only downloads the one that changed
+    mtime_ns = (tmp_path / "season-101-standings.html").stat().st_mtime_ns
+    gm_server.pages["Fixtures.aspx", 102] += "<!-- changed -->"
+    gm_server.requests.clear()
+
+    results = fetch_seasons(seasons, output_dir=tmp_path, base_url=gm_server.base_url, jobs=2, session=session)
+    assert sorted((r.season_id, r.page, r.status) for r in results) == [
+        (101, "fixtures", "not_modified"),
+        (101, "standings", "not_modified"),
+        (102, "fixtures", "downloaded"),
+        (102, "standings", "not_modified"),
+    ]
+    assert all(etag is not None for _, etag in gm_server.requests)
+    assert (tmp_path / "season-101-standings.html").stat().st_mtime_ns == mtime_ns
+    assert (tmp_path / "season-102-fixtures.html").read_text().endswith("<!-- changed -->")
+
+
+def test_fetch_retries_and_reports_failures(gm_server, tmp_path):
+    gm_server.add_season(101)
+    gm_server.failures["Standings.aspx", 101] = 2
+    session = create_session(pool_size=2, retries=3, backoff_factor=0)
+
+    results = fetch_seasons(
+        [SeasonRef(101, 505, 3568), SeasonRef(103, 505, 3568)],
+        output_dir=tmp_path, base_url=gm_server.base_url, session=session,
+    )
+    statuses = {(r.season_id, r.page): r.status for r in results}
+    assert statuses == {
+        (101, "standings"): "downloaded",
+        (101, "fixtures"): "downloaded",
+        (103, "standings"): "failed",
+        (103, "fixtures"): "failed",
+    }
+    assert [key for key, _ in gm_server.requests].count(("Standings.aspx", 101)) == 3
+    assert not (tmp_path / "season-103-standings.html").exists()
+    assert (tmp_path / FETCH_STATE_NAME).exists()
+
+
+def test_season_ref_from_str():
+    assert SeasonRef.from_str("114:505:3568") == SeasonRef(season_id=114, league_id=505, division_id=3568)
@@ -0,0 +1,88 @@
+import pytest
+
+from unicorner.dtos import FranchiseDto, GameDto, TeamDto
+from unicorner.extraction import create_extraction
+from unicorner.values import GameOutcomes, SeasonStages
+
+pytest.importorskip("numpy")
+
+from unicorner.franchise_history import FranchiseHistory  # noqa: E402
+
+
+def game(season_id, home_team_id, home_team_pts, away_team_id, away_team_pts, season_stage=SeasonStages.regular):
+    home_team_outcome, away_team_outcome = GameOutcomes.from_scores(home_team_pts, away_team_pts)
+    if home_team_pts is None:
+        home_team_outcome = away_team_outcome = None
+    return GameDto(
+        season_id=season_id, season_stage=season_stage,
+        home_team_id=f"{season_id:0>4}.{home_team_id}", home_team_pts=home_team_pts,
+        home_team_outcome=home_team_outcome,
+        away_team_id=f"{season_id:0>4}.{away_team_id}", away_team_pts=away_team_pts,
+        away_team_outcome=away_team_outcome,
+    )
+
+
+@pytest.fixture
+def history():
+    franchises = [FranchiseDto(id="1", name="Supernova"), FranchiseDto(id="2", name="Rockets"),
+                  FranchiseDto(id="3", name="Lions")]
+    teams = [
+        TeamDto(season_id=1, team_id=10, franchise_id="1"),
+        TeamDto(season_id=1, team_id=20, franchise_id="2"),
+        TeamDto(season_id=1, team_id=30, franchise_id="3"),
+        # Franchises 1 and 2 play under different team ids in season 2
+        TeamDto(season_id=2, team_id=11, franchise_id="1"),
+        TeamDto(season_id=2, team_id=21, franchise_id="2"),
+    ]
+    games = [
+        game(1, 10, 50, 20, 40),
+        game(1, 20, 30, 10, 30),
+        game(1, 30, 20, 10, 0),
+        game(1, 10, 45, 20, 44, season_stage=SeasonStages.final1st),
+        game(2, 21, 60, 11, 50),
+        # Not played yet
+        game(2, 11, None, 21, None),
+        # Team without a franchise
+        game(2, 99, 40, 11, 20),
+    ]
+    return FranchiseHistory(games=games, teams=teams, franchises=franchises)
+
+
+def test_head_to_head(history):
+    assert history.franchise_ids == [1, 2, 3]
+    h2h = history.head_to_head()
+    assert h2h.get(1, 2) == {"played": 4, "won": 2, "drawn": 1, "lost": 1, "score_difference": 1}
+    assert h2h.get(2, 1) == {"played": 4, "won": 1, "drawn": 1, "lost": 2, "score_difference": -1}
+    # Forfeit counts as a win
+    assert h2h.get(3, 1) == {"played": 1, "won": 1, "drawn": 0, "lost": 0, "score_difference": 20}
+    assert h2h.get(2, 3)["played"] == 0
+
+    assert (h2h["won"] == h2h["lost"].T).all()
+    assert (h2h["score_difference"] == -h2h["score_difference"].T).all()
+
+    regular = history.head_to_head(stages=[SeasonStages.regular])
+    assert regular.get(1, 2) == {"played": 3, "won": 1, "drawn": 1, "lost": 1, "score_difference": 0}
+    finals = history.head_to_head(stages=SeasonStages.all_playoffs)
+    assert finals["played"].sum() == 2
+
+
+def test_career(history):
+    career = history.career()
+    assert career.get(1) == {
+        "seasons": 2, "played": 5, "won": 2, "drawn": 1, "lost": 2, "forfeit_for": 0, "forfeit_against": 1,
+        "score_for": 175, "score_against": 194, "score_difference": -19,
+    }
+    assert career.get(3)["seasons"] == 1
+    assert (career["played"] == history.head_to_head()["played"].sum(axis=1)).all()
+    assert history.career(stages=[SeasonStages.final1st]).get(2)["lost"] == 1
+
+
+def test_history_of_extraction(data_dir):
+    extraction = create_extraction(input_dir=data_dir)
+    teams = {t.id: t for t in extraction[TeamDto]}
+    history = FranchiseHistory.from_extraction(extraction)
+
+    career = history.career()
+    # Season 114 is the only season with games
+    assert career["played"].sum() == 80
+    assert career.get(int(teams["0114.4949"].franchise_id))["won"] == 8
@@ -0,0 +1,37 @@
+from unicorner import SeasonParse
+from unicorner.dtos import GameDto, SeasonDto
+from unicorner.extraction import create_extraction
+from unicorner.values import ScoreStatuses
+
+from .gm_pages import generate_season_pages, write_archive
+
+
+def test_synthetic_season_pages_parse():
+    standings_html, fixtures_html = generate_season_pages(120, num_teams=9, num_weeks=10, num_upcoming_weeks=2)
+
+    sp = SeasonParse()
+    sp.parse_standings_page(html=standings_html)
+    sp.parse_fixtures_page(html=fixtures_html)
+
+    assert sp.season_id == 120
+    assert sp.season_name == "Season 120"
+    assert len(sp.teams) == 9
+
+    # 10 regular weeks with a bye each, a finals week and 2 upcoming weeks
+    assert len(sp.game_days) == 13
+    assert all(len(gd.games) == 4 for gd in sp.game_days[:10])
+    # Finals are played between teams next to each other in standings
+    finals_ranks = [t.finals_rank for t in sorted(sp.teams.values(), key=lambda t: t.position)]
+    assert [set(finals_ranks[i:i + 2]) for i in range(0, 8, 2)] == [{1, 2}, {3, 4}, {5, 6}, {7, 8}]
+    assert finals_ranks[8] is None
+    assert any(g.score_status == ScoreStatuses.unknown for gd in sp.game_days for g in gd.games)
+
+
+def test_synthetic_archive_extraction(tmp_path):
+    write_archive(tmp_path, num_seasons=3, num_teams=6, num_weeks=5)
+
+    extraction = create_extraction(input_dir=tmp_path)
+    assert sorted(s.id for s in extraction[SeasonDto]) == [100, 101, 102]
+    assert [s.sequence_number for s in sorted(extraction[SeasonDto], key=lambda s: s.id)] == [1, 2, 3]
+    # 5 regular weeks of 3 games, 3 finals games and 2 upcoming weeks of 3 games in each season
+    assert len(extraction[GameDto]) == 3 * (5 * 3 + 3 + 2 * 3)
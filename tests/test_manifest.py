@@ -0,0 +1,91 @@
+import shutil
+
+import pytest
+
+from unicorner.extraction import extract_all
+from unicorner.manifest import MANIFEST_NAME, load_manifest
+
+
+def copy_data_dir(data_dir, input_dir):
+    input_dir.mkdir()
+    for item in data_dir.iterdir():
+        shutil.copy(item, input_dir / item.name)
+
+
+def test_incremental_extraction_only_rewrites_changed_outputs(data_dir, tmp_path):
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    copy_data_dir(data_dir, input_dir)
+
+    extract_all(input_dir=input_dir, output_dir=output_dir)
+    manifest = load_manifest(output_dir)
+    assert len(manifest["seasons"]["114"]["game_ids"]) == 44
+
+    def output_mtimes():
+        return {p.name: p.stat().st_mtime_ns for p in output_dir.glob("gm*s.csv")}
+
+    # Nothing changed, nothing is rewritten
+    mtimes = output_mtimes()
+    extract_all(input_dir=input_dir, output_dir=output_dir, incremental=True)
+    assert output_mtimes() == mtimes
+
+    # Changed score override of a game in the season causes the season to be re-extracted
+    game_id = manifest["seasons"]["114"]["game_ids"][0]
+    overrides_path = input_dir / "score_overrides.csv"
+    overrides_path.write_text(overrides_path.read_text() + f'{game_id},,20,,0,3,"Forfeit",\n')
+
+    extract_all(input_dir=input_dir, output_dir=output_dir, incremental=True)
+
+    games_csv = (output_dir / "gmgames.csv").read_text()
+    game_line = [line for line in games_csv.splitlines() if line.startswith(f'"{game_id}",')][0]
+    assert '"20","FF"' in game_line
+    assert game_line.endswith('"0","FA"')
+    new_mtimes = output_mtimes()
+    assert new_mtimes["gmgames.csv"] != mtimes["gmgames.csv"]
+    assert new_mtimes["gmfranchises.csv"] == mtimes["gmfranchises.csv"]
+    assert new_mtimes["gmteams.csv"] == mtimes["gmteams.csv"]
+    assert (output_dir / MANIFEST_NAME).exists()
+
+
+def test_incremental_extraction_matches_full_extraction(data_dir, tmp_path):
+    input_dir = tmp_path / "input"
+    copy_data_dir(data_dir, input_dir)
+
+    incremental_dir = tmp_path / "incremental"
+    incremental_dir.mkdir()
+    extract_all(input_dir=input_dir, output_dir=incremental_dir, incremental=True)
+
+    # Add another season
+    for page in ("standings", "fixtures"):
+        html = (data_dir / f"season-114-{page}.html").read_text()
+        (input_dir / f"season-113-{page}.html").write_text(html.replace("SeasonId=114", "SeasonId=113"))
+    extract_all(input_dir=input_dir, output_dir=incremental_dir, incremental=True)
+    assert set(load_manifest(incremental_dir)["seasons"]) == {"113", "114"}
+
+    full_dir = tmp_path / "full"
+    full_dir.mkdir()
+    extract_all(input_dir=input_dir, output_dir=full_dir)
+
+    for name in ("gmfranchises.csv", "gmteams.csv", "gmgames.csv", "gmseasons.csv"):
+        assert (incremental_dir / name).read_text() == (full_dir / name).read_text()
+    assert (incremental_dir / "gmseasons.csv").read_text().count("\n") == 3
+
+
+@pytest.mark.parametrize("previous_run", [True, False])
+def test_extraction_fails_on_mismatched_season_ids(data_dir, tmp_path, previous_run):
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    copy_data_dir(data_dir, input_dir)
+    if previous_run:
+        extract_all(input_dir=input_dir, output_dir=output_dir, incremental=True)
+
+    # Pages of season 114 saved under the name of season 113
+    for page in ("standings", "fixtures"):
+        shutil.copy(data_dir / f"season-114-{page}.html", input_dir / f"season-113-{page}.html")
+
+    # Without a previous run this is a full extraction
+    with pytest.raises(ValueError, match=r"season-113-\w+\.html is a page of season 114, not of season 113"):
+        extract_all(input_dir=input_dir, output_dir=output_dir, incremental=True)
+    assert load_manifest(output_dir) is None or "113" not in load_manifest(output_dir)["seasons"]
@@ -0,0 +1,113 @@
+import pytest
+
+from unicorner import SeasonParse, UnicornerEnv
+from unicorner.extraction import create_extraction, load_score_overrides
+from unicorner.page_events import GAME_ROW, HEADING_LINK, TEAM_ROW, TITLE, WEEK, iter_page_events, read_page_header
+
+from .gm_pages import generate_season_pages, write_archive
+
+
+def parse_pages(standings_html, fixtures_html, html_parser, score_overrides=None):
+    env = UnicornerEnv()
+    env.html_parser = html_parser
+    env.score_overrides = score_overrides or {}
+    sp = SeasonParse(env=env)
+    sp.parse_standings_page(html=standings_html)
+    sp.parse_fixtures_page(html=fixtures_html)
+    return sp
+
+
+def assert_same_season(actual, expected):
+    assert actual.season_name == expected.season_name
+    assert (actual.season_id, actual.league_id, actual.division_id) == (
+        expected.season_id, expected.league_id, expected.division_id,
+    )
+    assert actual.teams == expected.teams
+    assert actual.game_days == expected.game_days
+
+
+def test_events_of_standings_page(data_dir):
+    events = list(iter_page_events((data_dir / "season-114-standings.html").read_text()))
+    kinds = [kind for kind, _ in events]
+
+    assert kinds[:2] == [TITLE, HEADING_LINK]
+    assert kinds.count(TEAM_ROW) == 8
+    assert kinds.count(WEEK) == 10
+
+    team_cells = events[2][1]
+    assert team_cells[1].classes == ("STTeamCell",)
+    assert "TeamId=" in team_cells[1].link_href
+
+    game_cells = next(value for kind, value in events if kind == GAME_ROW and "FScore" in value)
+    assert game_cells["FScore"].fixture_id.isdigit()
+    assert game_cells["FScore"].has_score_div
+    assert " - " in game_cells["FScore"].score_text
+
+
+def test_page_header_matches_events(data_dir):
+    pages = [path.read_text() for path in sorted(data_dir.glob("*.html"))]
+    pages.extend(generate_season_pages(140))
+
+    for html in pages:
+        events = dict((kind, value) for kind, value in iter_page_events(html) if kind in (TITLE, HEADING_LINK))
+        assert read_page_header(html) == (events[TITLE], events[HEADING_LINK])
+
+
+def test_events_do_not_depend_on_chunk_boundaries(data_dir):
+    html = (data_dir / "season-114-fixtures.html").read_text()
+
+    def describe(events):
+        return [
+            (kind, repr(value) if kind != GAME_ROW else sorted(
+                (c, cell.text, cell.link_href, cell.fixture_id, cell.score_text) for c, cell in value.items()
+            ))
+            for kind, value in events
+        ]
+
+    assert describe(iter_page_events(html, chunk_size=7)) == describe(iter_page_events(html))
+
+
+def test_events_engine_matches_beautifulsoup_engine(data_dir):
+    standings_html = (data_dir / "season-114-standings.html").read_text()
+    fixtures_html = (data_dir / "season-114-fixtures.html").read_text()
+    score_overrides = load_score_overrides(data_dir)
+
+    assert_same_season(
+        parse_pages(standings_html, fixtures_html, "events", score_overrides),
+        parse_pages(standings_html, fixtures_html, "html.parser", score_overrides),
+    )
+
+
+@pytest.mark.parametrize("num_teams, num_weeks, num_upcoming_weeks", [(8, 12, 2), (9, 10, 3), (7, 3, 0)])
+def test_events_engine_matches_beautifulsoup_engine_on_synthetic_pages(num_teams, num_weeks, num_upcoming_weeks):
+    standings_html, fixtures_html = generate_season_pages(
+        130, num_teams=num_teams, num_weeks=num_weeks, num_upcoming_weeks=num_upcoming_weeks,
+    )
+    # Override one of the finals
+    expected = parse_pages(standings_html, fixtures_html, "html.parser")
+    final = expected.game_days[num_weeks].games[0]
+    score_overrides = {
+        final.id: {
+            "home_team_id": final.away_team_id.split(".")[1],
+            "away_team_id": final.home_team_id.split(".")[1],
+            "home_team_score": 20,
+            "away_team_score": 0,
+            "score_status": "forfeit",
+            "score_status_comments": "Swapped",
+            "season_stage": None,
+        },
+    }
+
+    assert_same_season(
+        parse_pages(standings_html, fixtures_html, "events", score_overrides),
+        parse_pages(standings_html, fixtures_html, "html.parser", score_overrides),
+    )
+
+
+def test_extraction_with_events_engine(tmp_path):
+    write_archive(tmp_path, num_seasons=2, num_teams=7, num_weeks=6)
+
+    expected = create_extraction(input_dir=tmp_path)
+    actual = create_extraction(input_dir=tmp_path, html_parser="events", profile=True)
+    assert dict(actual) == dict(expected)
+    assert "build_tree" not in actual.stats.timings
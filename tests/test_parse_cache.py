@@ -0,0 +1,113 @@
+from unicorner import UnicornerEnv, parse_cache
+from unicorner.extraction import load_score_overrides, parse_season
+from unicorner.parse_cache import ParseCache
+
+
+def parse_cached(data_dir, cache, score_overrides=None):
+    env = UnicornerEnv()
+    env.score_overrides = load_score_overrides(data_dir) if score_overrides is None else score_overrides
+    env.parse_cache = cache
+    return parse_season(
+        standings_path=data_dir / "season-114-standings.html",
+        fixtures_path=data_dir / "season-114-fixtures.html",
+        env=env,
+    )
+
+
+def test_cached_season_matches_parsed_season(data_dir, tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path)
+    parsed = parse_cached(data_dir, cache)
+    assert len(list(tmp_path.glob("*.season"))) == 1
+
+    monkeypatch.setattr("unicorner.extraction.SeasonParse.parse_standings_page", None)
+    cached = parse_cached(data_dir, cache)
+
+    assert cached.season_id == parsed.season_id
+    assert cached.season_name == parsed.season_name
+    assert (cached.league_id, cached.division_id) == (parsed.league_id, parsed.division_id)
+    assert cached.teams == parsed.teams
+    assert cached.game_days == parsed.game_days
+
+    def points(season):
+        return [(g.home_team_points, g.away_team_points) for gd in season.game_days for g in gd.games]
+
+    assert points(cached) == points(parsed)
+
+
+def test_changed_score_overrides_invalidate_cached_season(data_dir, tmp_path):
+    cache = ParseCache(tmp_path)
+    score_overrides = load_score_overrides(data_dir)
+    parse_cached(data_dir, cache, score_overrides=score_overrides)
+
+    game = parse_cached(data_dir, cache, score_overrides=score_overrides).game_days[0].games[0]
+    key = cache.get_key(
+        standings_html=(data_dir / "season-114-standings.html").read_text(),
+        fixtures_html=(data_dir / "season-114-fixtures.html").read_text(),
+    )
+
+    env = UnicornerEnv()
+    env.score_overrides = dict(score_overrides)
+    assert cache.load(key, env=env) is not None
+
+    env.score_overrides[game.id] = {
+        "game_id": game.id,
+        "home_team_id": 0,
+        "home_team_score": 20,
+        "away_team_id": 0,
+        "away_team_score": 0,
+        "score_status": 3,
+        "score_status_comments": "",
+        "season_stage": None,
+    }
+    assert cache.load(key, env=env) is None
+
+
+def test_cache_evicts_least_recently_used_entries(data_dir, tmp_path):
+    cache = ParseCache(tmp_path)
+    season = parse_cached(data_dir, cache)
+
+    entry_size = next(tmp_path.glob("*.season")).stat().st_size
+    cache.max_size = 2 * entry_size
+    for key in ("a", "b", "c"):
+        cache.store(key, season)
+
+    assert sorted(p.stem for p in tmp_path.glob("*.season")) == ["b", "c"]
+
+
+def test_cache_directory_is_scanned_only_to_evict(data_dir, tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path)
+    season = parse_cached(data_dir, cache)
+    entry_size = next(tmp_path.glob("*.season")).stat().st_size
+
+    scans = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(None) or scan())
+
+    cache.max_size = 8 * entry_size
+    for i in range(20):
+        cache.store(str(i), season)
+    # Evicted down to 6 entries, then again after every 3 stores
+    assert len(scans) == 5
+    assert len(list(tmp_path.glob("*.season"))) <= 8
+    assert cache._size == sum(p.stat().st_size for p in tmp_path.glob("*.season"))
+
+
+def test_unreadable_entries_are_discarded(data_dir, tmp_path):
+    cache = ParseCache(tmp_path)
+    parsed = parse_cached(data_dir, cache)
+    entry_path = next(tmp_path.glob("*.season"))
+
+    for data in (b"garbage", entry_path.read_bytes()[:-20]):
+        entry_path.write_bytes(data)
+        assert parse_cached(data_dir, cache).game_days == parsed.game_days
+        # The entry was replaced by a freshly parsed one
+        assert len(list(tmp_path.glob("*.season"))) == 1
+
+
+def test_cache_format_is_part_of_key(tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path)
+    key = cache.get_key(standings_html="<html/>")
+    monkeypatch.setattr(parse_cache, "CACHE_FORMAT", parse_cache.CACHE_FORMAT + 1)
+    assert cache.get_key(standings_html="<html/>") != key
+    monkeypatch.setattr(parse_cache, "_game_fields", parse_cache._game_fields + ["new_field"])
+    assert cache.get_key(standings_html="<html/>") != key
@@ -0,0 +1,125 @@
+import csv
+import subprocess
+import sys
+
+import pytest
+
+from unicorner.dtos import FranchiseDto, GameDto, SeasonDto, TeamDto
+from unicorner.extraction import create_extraction, get_output_path
+from unicorner import partitions as partitions_module
+from unicorner.partitions import PARTITION_INDEX_NAME, extract_partitioned, group_partitions, load_partition_index
+
+from .gm_pages import bundle_input, write_archive
+
+
+def read_ids(path):
+    with path.open() as f:
+        return sorted(row["id"] for row in csv.DictReader(f))
+
+
+@pytest.fixture
+def input_dir(data_dir, tmp_path):
+    input_dir = write_archive(tmp_path / "input", num_seasons=4, num_teams=6, num_weeks=6)
+    # Seasons 102 and 103 are of another division
+    for season_id in (102, 103):
+        for page in ("standings", "fixtures"):
+            path = input_dir / f"season-{season_id}-{page}.html"
+            path.write_text(path.read_text().replace("DivisionId=3568", "DivisionId=4000"))
+    for path in data_dir.iterdir():
+        if path.suffix in (".html", ".csv"):
+            (input_dir / path.name).write_bytes(path.read_bytes())
+    return input_dir
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_extract_partitioned(input_dir, tmp_path, jobs):
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    partitions = extract_partitioned(input_dir=input_dir, output_dir=output_dir, jobs=jobs)
+
+    assert partitions == load_partition_index(output_dir)
+    assert (output_dir / PARTITION_INDEX_NAME).exists()
+    assert [(p.league_id, p.division_id, p.path, p.season_ids) for p in partitions] == [
+        (505, 3568, "league-505/division-3568", [100, 101, 114]),
+        (505, 4000, "league-505/division-4000", [102, 103]),
+    ]
+
+    extraction = create_extraction(input_dir=input_dir)
+    games = {g.id: g for g in extraction[GameDto]}
+    partition_game_ids = []
+    for partition in partitions:
+        partition_dir = output_dir / partition.path
+        game_ids = read_ids(get_output_path(partition_dir, GameDto))
+        assert {games[int(game_id)].season_id for game_id in game_ids} == set(partition.season_ids)
+        assert partition.counts["gmgames"] == len(game_ids)
+        partition_game_ids.extend(game_ids)
+
+    # Every game is in exactly one partition
+    assert sorted(partition_game_ids) == sorted(str(game_id) for game_id in games)
+
+    # Teams only of seasons of the partition, franchises only of those teams
+    for partition in partitions:
+        partition_dir = output_dir / partition.path
+        teams = [t for t in extraction[TeamDto] if int(t.season_id) in partition.season_ids]
+        assert read_ids(get_output_path(partition_dir, TeamDto)) == sorted(t.id for t in teams)
+        assert read_ids(get_output_path(partition_dir, FranchiseDto)) == sorted({t.franchise_id for t in teams})
+        assert read_ids(get_output_path(partition_dir, SeasonDto)) == [str(s) for s in partition.season_ids]
+
+
+def test_seasons_of_one_partition_are_parsed_in_parallel(data_dir, tmp_path, monkeypatch):
+    input_dir = write_archive(tmp_path / "input", num_seasons=3, num_teams=4, num_weeks=2)
+    parse_season_pages = partitions_module.parse_season_pages
+    jobs_used = []
+
+    def spy(season_pages, env=None, jobs=1):
+        jobs_used.append(jobs)
+        return parse_season_pages(season_pages, env=env, jobs=jobs)
+
+    monkeypatch.setattr(partitions_module, "parse_season_pages", spy)
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    partitions = extract_partitioned(input_dir=input_dir, output_dir=output_dir, jobs=2)
+
+    assert len(partitions) == 1 and partitions[0].season_ids == [100, 101, 102]
+    assert jobs_used == [2]
+    assert read_ids(get_output_path(output_dir / partitions[0].path, SeasonDto)) == ["100", "101", "102"]
+
+
+@pytest.mark.parametrize("bundle_name", ["pages.zip", "pages.tar.gz"])
+def test_extract_partitioned_from_bundle(input_dir, tmp_path, bundle_name):
+    bundle_path = bundle_input(input_dir, tmp_path / bundle_name)
+    # Only season ids are held on to until the seasons are parsed
+    assert group_partitions(bundle_path) == {(505, 3568): [100, 101, 114], (505, 4000): [102, 103]}
+
+    directory_output_dir = tmp_path / "directory_output"
+    bundle_output_dir = tmp_path / "bundle_output"
+    for output_dir in (directory_output_dir, bundle_output_dir):
+        output_dir.mkdir()
+    partitions = extract_partitioned(input_dir=input_dir, output_dir=directory_output_dir)
+    assert extract_partitioned(input_dir=bundle_path, output_dir=bundle_output_dir, jobs=2) == partitions
+
+    # Rows are in the order of the input, which differs between a directory and a bundle
+    for partition in partitions:
+        for dto_cls in (GameDto, SeasonDto, TeamDto, FranchiseDto):
+            bundle_rows = get_output_path(bundle_output_dir / partition.path, dto_cls).read_text().splitlines()
+            directory_rows = get_output_path(directory_output_dir / partition.path, dto_cls).read_text().splitlines()
+            assert sorted(bundle_rows) == sorted(directory_rows)
+
+
+def test_extract_partitioned_command(input_dir, tmp_path):
+    output_dir = tmp_path / "output"
+    subprocess.run(
+        [
+            sys.executable, "-m", "unicorner", "extract_all", "--input-dir", str(input_dir),
+            "--output-dir", str(output_dir), "--partitioned", "--no-cache", "--profile", str(tmp_path / "profile.json"),
+        ],
+        check=True, capture_output=True,
+    )
+    assert [p.path for p in load_partition_index(output_dir)] == ["league-505/division-3568", "league-505/division-4000"]
+    assert (tmp_path / "profile.json").exists()
+
+    result = subprocess.run(
+        [sys.executable, "-m", "unicorner", "extract_all", "--input-dir", str(input_dir), "--partitioned", "--incremental"],
+        capture_output=True, text=True,
+    )
+    assert result.returncode != 0 and "--partitioned" in result.stderr
@@ -0,0 +1,91 @@
+import dataclasses
+import subprocess
+import sys
+
+import pytest
+
+from unicorner.dtos import GameDto, TeamDto
+from unicorner.extraction import create_extraction
+from unicorner.ratings import EloRatings, get_franchise_of_team
+from unicorner.values import GameOutcomes, SeasonStages
+
+from .gm_pages import generate_games
+
+
+def test_incremental_update_matches_full_replay(tmp_path):
+    games = generate_games(60)
+    replayed = EloRatings()
+    assert replayed.update(games) == 60
+
+    ratings = EloRatings()
+    ratings.update(games[:25])
+    ratings.save(tmp_path / "ratings.json")
+
+    ratings = EloRatings.load(tmp_path / "ratings.json")
+    # Only games after the checkpoint are applied, in order of their scheduled time
+    assert ratings.update(reversed(games)) == 35
+    assert ratings.ratings == pytest.approx(replayed.ratings)
+    assert ratings.played == replayed.played
+    assert ratings.update(games) == 0
+
+    assert sum(replayed.ratings.values()) == pytest.approx(1500 * 6)
+    assert [key for key, _ in replayed.get_ranking()][0] == max(replayed.ratings, key=replayed.ratings.get)
+
+
+def test_forfeits_and_finals():
+    game = generate_games(1)[0]
+    game = dataclasses.replace(game, home_team_pts=50, away_team_pts=40,
+                               home_team_outcome=GameOutcomes.won, away_team_outcome=GameOutcomes.lost)
+
+    regular = EloRatings()
+    regular.apply(game)
+    finals = EloRatings()
+    finals.apply(dataclasses.replace(game, season_stage=SeasonStages.final1st))
+    assert regular.get_rating(game.home_team_id) == pytest.approx(1510)
+    assert finals.get_rating(game.home_team_id) == pytest.approx(1515)
+
+    forfeit = EloRatings()
+    forfeit.apply(dataclasses.replace(
+        game, home_team_pts=20, away_team_pts=0,
+        home_team_outcome=GameOutcomes.forfeit_for, away_team_outcome=GameOutcomes.forfeit_against,
+    ))
+    assert forfeit.ratings == {}
+    assert forfeit.forfeits == {game.home_team_id: 1, game.away_team_id: 1}
+
+
+def test_games_scored_late_are_applied():
+    games = generate_games(9)
+    unscored = dataclasses.replace(
+        games[1], home_team_pts=None, away_team_pts=None, home_team_outcome=None, away_team_outcome=None,
+    )
+    ratings = EloRatings()
+    assert ratings.update(games[:1] + [unscored] + games[2:]) == 8
+    assert ratings.pending_game_ids == {games[1].id}
+
+    assert ratings.update(games) == 1
+    assert ratings.pending_game_ids == set()
+
+
+def test_ratings_follow_franchises(data_dir):
+    extraction = create_extraction(input_dir=data_dir)
+    franchise_of_team = get_franchise_of_team(extraction[TeamDto])
+    ratings = EloRatings(franchise_of_team=franchise_of_team)
+    ratings.update(extraction[GameDto])
+
+    assert ratings.ratings.keys() == {str(franchise_of_team[g.home_team_id]) for g in extraction[GameDto]}
+    assert set(ratings.played.values()) == {10}
+    assert sum(ratings.ratings.values()) == pytest.approx(1500 * len(ratings.ratings))
+
+
+def test_ratings_command_uses_parse_cache(data_dir, tmp_path):
+    command = [
+        sys.executable, "-m", "unicorner", "ratings", "--input-dir", str(data_dir),
+        "--state", str(tmp_path / "ratings.json"), "--cache-dir", str(tmp_path / "cache"),
+    ]
+    first = subprocess.run(command, check=True, capture_output=True, text=True)
+    assert len(list((tmp_path / "cache").glob("*.season"))) == 1
+
+    second = subprocess.run(command, check=True, capture_output=True, text=True)
+    assert "Loaded season 114 from parse cache" in second.stderr
+    assert "Applied 0 new games" in second.stderr
+    assert second.stdout == first.stdout
@@ -0,0 +1,162 @@
+import asyncio
+import http.client
+import json
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from unicorner.extraction import create_extraction, write_extraction  # noqa: E402
+from unicorner.server import ExtractionServer, load_extraction  # noqa: E402
+from unicorner.snapshot import write_snapshot  # noqa: E402
+
+from .gm_pages import rewrite_csv  # noqa: E402
+
+
+@pytest.fixture
+def extraction_dir(data_dir, tmp_path):
+    extraction_dir = tmp_path / "extraction"
+    extraction_dir.mkdir()
+    write_extraction(create_extraction(input_dir=data_dir), extraction_dir)
+    return extraction_dir
+
+
+def get(server, target, headers=None):
+    status, response_headers, body = server.handle_request("GET", target, headers or {})
+    return status, response_headers, json.loads(body) if body else None
+
+
+def test_endpoints(extraction_dir):
+    server = ExtractionServer(extraction_dir)
+
+    status, _, seasons = get(server, "/seasons")
+    assert status == 200
+    assert [s["id"] for s in seasons] == [114]
+    assert seasons[0]["first_week_date"] == "2019-05-02T00:00:00"
+
+    _, _, standings = get(server, "/seasons/114/standings")
+    rows = standings["standings"]
+    assert len(rows) == 8
+    assert [r["points"] for r in rows] == sorted((r["points"] for r in rows), reverse=True)
+    assert sum(r["won"] for r in rows) == sum(r["lost"] for r in rows)
+
+    _, _, fixtures = get(server, "/seasons/114/fixtures")
+    _, _, results = get(server, "/seasons/114/results")
+    assert len(fixtures) == 4 and len(results) == 40
+    assert all(g["home_team_pts"] is None for g in fixtures)
+
+    _, _, team_games = get(server, "/teams/0114.4949/games")
+    assert len(team_games) == 11
+    _, _, franchise_games = get(server, "/franchises/11/games?start=2019-06-01&end=2019-07-01")
+    assert {g["scheduled_time"][:7] for g in franchise_games} == {"2019-06"}
+    _, _, games = get(server, "/games?date=2019-05-02")
+    assert [g["id"] for g in games] == [204707, 204708, 204709, 204710]
+
+    _, _, head_to_head = get(server, "/head-to-head/11/6")
+    assert head_to_head["franchise"]["name"] == "Burritos"
+    assert head_to_head["record"]["played"] == len([g for g in head_to_head["games"] if g["home_team_pts"] is not None])
+    assert head_to_head["record"]["won"] + head_to_head["record"]["drawn"] + head_to_head["record"]["lost"] == 2
+
+    assert get(server, "/seasons/1/standings")[0] == 404
+    assert get(server, "/nothing")[0] == 404
+    assert get(server, "/games?date=tomorrow")[0] == 400
+    assert get(server, "/franchises/11/games?start=2019-06-01T00:00%2B00:00")[0] == 400
+    assert server.handle_request("POST", "/seasons", {})[0] == 405
+
+
+def test_unexpected_errors_are_answered(extraction_dir, monkeypatch):
+    server = ExtractionServer(extraction_dir)
+
+    def fail(query):
+        raise TypeError("Bug")
+
+    monkeypatch.setattr(server.loaded, "seasons", fail)
+    status, _, body = get(server, "/seasons")
+    assert status == 500 and "error" in body
+    assert get(server, "/seasons/114/results")[0] == 200
+
+
+def test_etags(extraction_dir):
+    server = ExtractionServer(extraction_dir)
+    status, headers, _ = get(server, "/seasons/114/standings")
+    assert status == 200
+    assert get(server, "/seasons/114/standings", {"if-none-match": headers["ETag"]})[0] == 304
+    assert get(server, "/seasons/114/results", {"if-none-match": headers["ETag"]})[0] == 200
+
+
+def test_serves_over_http_and_reloads(extraction_dir):
+    async def main():
+        server = ExtractionServer(extraction_dir, interval=0.01)
+        port = await server.start(port=0)
+        loop = asyncio.get_running_loop()
+
+        def request(conn, target, headers=None):
+            conn.request("GET", target, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, response.getheader("ETag"), response.read()
+
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        try:
+            # Requests on one kept-alive connection
+            status, etag, body = await loop.run_in_executor(None, request, conn, "/games?date=2019-05-02")
+            assert status == 200 and json.loads(body)[0]["home_team_pts"] == 50
+            status, _, body = await loop.run_in_executor(None, request, conn, "/games?date=2019-05-02", {"If-None-Match": etag})
+            assert status == 304 and body == b""
+
+            def change_game(row):
+                if row["id"] == "204707":
+                    row["home_team_pts"] = "52"
+                return row
+
+            games_path = extraction_dir / "gmgames.csv"
+            rewrite_csv(games_path, change_game)
+            # Make sure the change is seen even on file systems with coarse mtimes
+            os.utime(games_path, ns=(0, 0))
+            for _ in range(500):
+                if server.reloads:
+                    break
+                await asyncio.sleep(0.01)
+            assert server.reloads == 1
+
+            status, new_etag, body = await loop.run_in_executor(None, request, conn, "/games?date=2019-05-02", {"If-None-Match": etag})
+            assert status == 200 and new_etag != etag
+            assert json.loads(body)[0]["home_team_pts"] == 52
+        finally:
+            conn.close()
+            await server.close()
+
+    asyncio.run(main())
+
+
+def test_snapshot_is_served_and_failed_reload_is_retried(data_dir, tmp_path):
+    snapshot_path = tmp_path / "extraction.snap"
+    write_snapshot(create_extraction(input_dir=data_dir), snapshot_path)
+    loads = []
+
+    def load(source):
+        loads.append(source)
+        if len(loads) == 2:
+            raise OSError("Transient failure")
+        return load_extraction(source)
+
+    server = ExtractionServer(snapshot_path, load=load)
+    assert get(server, "/seasons/114/results")[2] == get(server, "/seasons/114/results")[2]
+    assert len(get(server, "/seasons/114/results")[2]) == 40
+
+    snapshot_path.write_bytes(snapshot_path.read_bytes())
+    os.utime(snapshot_path, ns=(0, 0))
+
+    async def reload():
+        pending = await server.reload_if_changed()
+        assert pending is not None
+        # The first attempt fails, the previous extraction is kept and the reload stays pending
+        pending = await server.reload_if_changed(pending)
+        assert pending is not None and server.reloads == 0
+        assert len(get(server, "/seasons/114/results")[2]) == 40
+        assert await server.reload_if_changed(pending) is None
+        assert server.reloads == 1
+        assert await server.reload_if_changed() is None
+
+    asyncio.run(reload())
+    assert len(loads) == 3
@@ -0,0 +1,80 @@
+import datetime as dt
+import subprocess
+import sys
+
+import pytest
+
+from unicorner.dtos import GameDto, SeasonDto, TeamDto
+from unicorner.extraction import create_extraction, iter_extraction
+from unicorner.snapshot import NULL, open_snapshot, write_snapshot
+
+
+def test_snapshot_round_trip(data_dir, tmp_path):
+    extraction = create_extraction(input_dir=data_dir)
+    path = tmp_path / "unicorner.snap"
+    write_snapshot(iter_extraction(input_dir=data_dir), path)
+
+    with open_snapshot(path) as snapshot:
+        assert len(snapshot[GameDto]) == 44
+        assert snapshot[GameDto].kinds["scheduled_time"] == "datetime"
+        assert snapshot[TeamDto].kinds["team_id"] == "str"
+
+        loaded = snapshot.to_extraction()
+        for dto_cls in (GameDto, SeasonDto, TeamDto):
+            assert loaded[dto_cls] == extraction[dto_cls]
+
+        games = snapshot[GameDto]
+        row = games.values("id").index(204707)
+        with games.column("home_team_pts") as pts:
+            assert pts[row] == 50
+        assert games.values("scheduled_time")[row] == dt.datetime(2019, 5, 2, 18, 45)
+        assert games.values("home_team_id")[row] == "0114.4949"
+
+        # Each string is stored once and columns refer to it
+        assert len(snapshot.strings) == len(set(snapshot.strings))
+        with games.column("season_stage") as stages:
+            assert set(stages.tolist()) == {snapshot.strings.index("regular")}
+
+
+def test_snapshot_missing_values(tmp_path):
+    path = tmp_path / "unicorner.snap"
+    write_snapshot([
+        GameDto(id=1, scheduled_time=dt.datetime(2020, 1, 1, 19, 30), home_team_id="0001.1"),
+        GameDto(id=2),
+    ], path)
+
+    with open_snapshot(path) as snapshot:
+        games = snapshot[GameDto]
+        with games.column("home_team_pts") as pts:
+            assert pts.tolist() == [NULL, NULL]
+        assert list(games.iter_dtos())[1] == GameDto(id=2)
+        assert len(snapshot[SeasonDto]) == 0
+
+
+def test_snapshot_is_zero_copy(data_dir, tmp_path):
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "unicorner.snap"
+    write_snapshot(create_extraction(input_dir=data_dir), path)
+
+    snapshot = open_snapshot(path)
+    pts = np.frombuffer(snapshot[GameDto].column("home_team_pts"), dtype=np.int64)
+    assert not pts.flags.owndata and not pts.flags.writeable
+    assert pts.sum() == sum(g.home_team_pts or 0 for g in create_extraction(input_dir=data_dir)[GameDto])
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "gmgames.csv"
+    path.write_text("id,scheduled_time\n")
+    with pytest.raises(ValueError):
+        open_snapshot(path)
+
+
+def test_extract_all_to_snapshot(data_dir, tmp_path):
+    path = tmp_path / "unicorner.snap"
+    subprocess.run(
+        [sys.executable, "-m", "unicorner", "extract_all", "--input-dir", str(data_dir), "--no-cache",
+         "--output", f"snapshot:{path}"],
+        check=True, capture_output=True,
+    )
+    with open_snapshot(path) as snapshot:
+        assert len(snapshot[GameDto]) == 44
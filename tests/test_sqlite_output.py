@@ -0,0 +1,25 @@
+import sqlite3
+
+from unicorner.extraction import create_extraction, iter_extraction
+from unicorner.sqlite_output import write_sqlite
+
+
+def test_write_sqlite_upserts_rows(data_dir, tmp_path):
+    db_path = tmp_path / "unicorner.db"
+
+    write_sqlite(iter_extraction(input_dir=data_dir), db_path=db_path)
+    write_sqlite(create_extraction(input_dir=data_dir), db_path=db_path)
+
+    conn = sqlite3.connect(str(db_path))
+    assert conn.execute("SELECT COUNT(*) FROM gmgames").fetchone() == (44,)
+    assert conn.execute("SELECT COUNT(*) FROM gmseasons").fetchone() == (1,)
+    assert conn.execute("SELECT COUNT(*) FROM gmfranchises").fetchone() == (26,)
+
+    assert conn.execute(
+        "SELECT scheduled_time, home_team_id, home_team_pts, away_team_pts FROM gmgames WHERE id = 204707"
+    ).fetchone() == ("2019-05-02 18:45:00", "0114.4949", 50, 45)
+    assert conn.execute("SELECT id, name, sequence_number FROM gmseasons").fetchone() == (114, "Spring 2019", 1)
+    assert conn.execute("SELECT typeof(team_id), typeof(id) FROM gmteams LIMIT 1").fetchone() == ("integer", "text")
+
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM gmgames WHERE season_id = 114").fetchall()
+    assert "ix_gmgames_season_id" in str(plan)
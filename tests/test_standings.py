@@ -0,0 +1,63 @@
+import dataclasses
+
+import pytest
+
+from unicorner.extraction import iter_game_dtos, parse_seasons
+from unicorner.values import GameOutcomes, SeasonStages
+
+from .gm_pages import write_archive
+
+pytest.importorskip("numpy")
+
+from unicorner.standings import COLUMNS, StandingsMismatch, check_seasons, compute_standings  # noqa: E402
+
+
+def test_standings_match_gm_standings(data_dir, tmp_path):
+    seasons = list(parse_seasons(data_dir))
+    write_archive(tmp_path, num_seasons=3, num_teams=9)
+    seasons.extend(parse_seasons(tmp_path))
+
+    mismatches, corrected = check_seasons(seasons)
+    assert mismatches == []
+    teams = [team for season in seasons for team in season.teams.values()]
+    assert corrected == teams
+
+
+def test_standings_of_one_team(data_dir):
+    season = next(parse_seasons(data_dir))
+    games = list(iter_game_dtos(season))
+    team = next(iter(season.teams.values()))
+
+    standings = compute_standings(games)
+    computed = standings.get(team.id)
+
+    counted = [g for g in games if g.season_stage == SeasonStages.regular and g.home_team_pts is not None]
+    team_games = [
+        (g.home_team_outcome, g.home_team_pts, g.away_team_pts) if g.home_team_id == team.id
+        else (g.away_team_outcome, g.away_team_pts, g.home_team_pts)
+        for g in counted
+        if team.id in (g.home_team_id, g.away_team_id)
+    ]
+    assert computed["played"] == len(team_games) == team.played
+    assert computed["score_for"] == sum(score for _, score, _ in team_games)
+    assert computed["points"] == sum(GameOutcomes.regular_season_points[o] for o, _, _ in team_games)
+    assert set(computed) == set(COLUMNS)
+
+
+def test_standings_report_and_correct_mismatches(data_dir):
+    season = next(parse_seasons(data_dir))
+    teams = list(season.teams.values())
+    wrong = dataclasses.replace(teams[0], won=teams[0].won + 1, points=teams[0].points + 3)
+
+    standings = compute_standings(iter_game_dtos(season))
+    assert standings.compare([wrong] + teams[1:]) == [
+        StandingsMismatch(team_id=wrong.id, column="won", parsed=wrong.won, computed=teams[0].won),
+        StandingsMismatch(team_id=wrong.id, column="points", parsed=wrong.points, computed=teams[0].points),
+    ]
+    assert standings.correct([wrong]) == [teams[0]]
+
+    # Team without any games
+    idle = dataclasses.replace(teams[0], id="0114.0", played=0, won=0, lost=0, drawn=0, forfeit_for=0,
+                               forfeit_against=0, score_for=0, score_against=0, score_difference=0, points=5,
+                               bonus_points=5)
+    assert standings.compare([idle]) == []
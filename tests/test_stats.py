@@ -0,0 +1,68 @@
+import json
+
+from unicorner import UnicornerEnv
+from unicorner.dtos import GameDto
+from unicorner.extraction import create_extraction, extract_all, parse_season
+from unicorner.stats import ExtractionStats
+
+from .gm_pages import write_archive
+
+
+def test_stats_are_disabled_by_default(data_dir):
+    extraction = create_extraction(input_dir=data_dir)
+    assert not extraction.stats.enabled
+    assert extraction.stats.to_dict() == {"timings": {}, "counters": {}}
+
+
+def test_profiled_extraction_records_stages_and_counters(tmp_path):
+    input_dir = write_archive(tmp_path, num_seasons=2, num_teams=9)
+    extraction = create_extraction(input_dir=input_dir, profile=True)
+
+    counters = extraction.stats.counters
+    assert counters["seasons_parsed"] == 2
+    assert counters["games_parsed"] == len(extraction[GameDto])
+    assert counters["byes_skipped"] == 2 * 12
+    assert counters["duplicate_fixtures_discarded"] == 2 * 4
+    assert counters["unresolved_scores"] == 2
+
+    for stage in ("read_file", "build_tree", "standings_table", "fixtures_table", "build_dtos"):
+        assert extraction.stats.timings[stage] > 0
+
+
+def test_parallel_stats_are_merged(data_dir, tmp_path):
+    for path in data_dir.iterdir():
+        (tmp_path / path.name).write_bytes(path.read_bytes())
+    for page in ("standings", "fixtures"):
+        html = (data_dir / f"season-114-{page}.html").read_text()
+        (tmp_path / f"season-113-{page}.html").write_text(html.replace("SeasonId=114", "SeasonId=113"))
+
+    serial = create_extraction(input_dir=tmp_path, profile=True)
+    parallel = create_extraction(input_dir=tmp_path, jobs=2, profile=True)
+
+    assert parallel.stats.counters == serial.stats.counters
+    assert parallel.stats.counters["seasons_parsed"] == 2
+
+
+def test_extract_all_writes_output_stage(data_dir, tmp_path):
+    stats = ExtractionStats()
+    extract_all(input_dir=data_dir, output_dir=tmp_path, stats=stats)
+
+    assert stats.timings["write_output"] > 0
+    assert json.loads(json.dumps(stats.to_dict()))["counters"]["games_parsed"] > 0
+    assert "games_parsed" in stats.format_table()
+
+
+def test_parse_season_parses_tables(data_dir):
+    env = UnicornerEnv()
+    env.stats = ExtractionStats()
+    season = parse_season(
+        standings_path=data_dir / "season-114-standings.html",
+        fixtures_path=data_dir / "season-114-fixtures.html",
+        env=env,
+    )
+
+    assert env.stats.timings["standings_table"] > 0
+    assert env.stats.timings["fixtures_table"] > 0
+    timings = dict(env.stats.timings)
+    assert len(season.teams) == 8 and len(season.game_days) == 12
+    assert env.stats.timings == timings
@@ -1,15 +1,18 @@
-from pathlib import Path
+import dataclasses
+import datetime as dt
+import shutil
+from urllib.parse import parse_qs
 
 import pytest
 
-from unicorner import SeasonParse
-from unicorner.dtos import FranchiseDto, GameDto, SeasonDto
-from unicorner.extraction import create_extraction
+from unicorner import SeasonParse, UnicornerEnv
+from unicorner.dtos import FranchiseDto, GameDto, SeasonDto, TeamDto
+from unicorner.extraction import create_extraction, iter_extraction, list_seasons, read_extraction, write_extraction
+from unicorner.season_page import _get_team_id, parse_gm_date
+from unicorner.stats import ExtractionStats
+from unicorner.values import GameOutcomes, SeasonStages
 
-
-@pytest.fixture
-def data_dir() -> Path:
-    return Path(__file__).parents[0] / "data"
+from .gm_pages import write_archive
 
 
 def test_parses_season_standings_and_fixtures(data_dir):
@@ -35,3 +38,182 @@ def test_extraction(data_dir):
 
     assert isinstance(extraction[FranchiseDto][0], FranchiseDto)
     assert extraction[FranchiseDto][0].name == "Supernova"
+
+
+def test_parallel_extraction_matches_serial(data_dir, tmp_path):
+    for item in data_dir.iterdir():
+        shutil.copy(item, tmp_path / item.name)
+    # Second copy of the season so that there is more than one season for the pool to work on.
+    for page in ("standings", "fixtures"):
+        shutil.copy(data_dir / f"season-114-{page}.html", tmp_path / f"season-113-{page}.html")
+
+    serial = create_extraction(input_dir=tmp_path)
+    parallel = create_extraction(input_dir=tmp_path, jobs=2)
+    assert list(parallel.keys()) == list(serial.keys())
+    for dto_cls, dtos in serial.items():
+        assert parallel[dto_cls] == dtos
+
+
+def test_lxml_parser_matches_html_parser(data_dir):
+    pytest.importorskip("lxml")
+
+    seasons = {}
+    for html_parser in ("html.parser", "lxml"):
+        env = UnicornerEnv()
+        env.html_parser = html_parser
+        sp = SeasonParse(env=env)
+        sp.parse_standings_page(path=data_dir / "season-114-standings.html")
+        sp.parse_fixtures_page(path=data_dir / "season-114-fixtures.html")
+        seasons[html_parser] = sp
+
+    expected, actual = seasons["html.parser"], seasons["lxml"]
+    assert actual.season_name == expected.season_name
+    assert (actual.season_id, actual.league_id, actual.division_id) == (
+        expected.season_id, expected.league_id, expected.division_id,
+    )
+    assert actual.teams == expected.teams
+    assert actual.game_days == expected.game_days
+
+
+def test_streaming_write_matches_extraction_write(data_dir, tmp_path):
+    (tmp_path / "dict").mkdir()
+    (tmp_path / "stream").mkdir()
+
+    write_extraction(create_extraction(input_dir=data_dir), output_dir=tmp_path / "dict")
+    write_extraction(iter_extraction(input_dir=data_dir), output_dir=tmp_path / "stream")
+
+    names = sorted(p.name for p in (tmp_path / "dict").iterdir())
+    assert names == ["gmfranchises.csv", "gmgames.csv", "gmseasons.csv", "gmteams.csv"]
+    assert names == sorted(p.name for p in (tmp_path / "stream").iterdir())
+    for name in names:
+        assert (tmp_path / "stream" / name).read_text() == (tmp_path / "dict" / name).read_text()
+
+
+def test_read_extraction_reads_back_written_extraction(data_dir, tmp_path):
+    extraction = create_extraction(input_dir=data_dir)
+    write_extraction(extraction, output_dir=tmp_path)
+
+    read_back = read_extraction(tmp_path)
+    assert set(read_back) == set(extraction)
+    assert read_back[GameDto] == extraction[GameDto]
+    assert read_back[SeasonDto] == extraction[SeasonDto]
+    # Teams and franchises come from CSV input files as strings, they are read back as typed values
+    assert [t.id for t in read_back[TeamDto]] == [t.id for t in extraction[TeamDto]]
+    assert read_back[TeamDto][0].franchise_id == int(extraction[TeamDto][0].franchise_id)
+    assert read_back[FranchiseDto][0] == FranchiseDto(id=1, name="Supernova")
+    assert any(g.home_team_pts is None for g in read_back[GameDto])
+
+
+def test_season_lookups(data_dir):
+    sp = SeasonParse()
+    sp.parse_standings_page(path=data_dir / "season-114-standings.html")
+    sp.parse_fixtures_page(path=data_dir / "season-114-fixtures.html")
+
+    game = sp.get_game(204707)
+    assert game.home_team_id == "0114.4949"
+    assert sp.get_game(1) is None
+
+    assert game in sp.games_for_team("0114.4949")
+    assert game in sp.games_for_team("0114.4611")
+    assert all("0114.4949" in (g.home_team_id, g.away_team_id) for g in sp.games_for_team("0114.4949"))
+    assert sp.games_for_team("0114.1") == []
+
+    game_day = sp.game_day_for(dt.date(2019, 5, 2))
+    assert game in game_day.games
+    assert sp.game_day_for(dt.datetime(2019, 5, 2)) is game_day
+    assert sp.game_day_for(dt.date(2019, 5, 3)) is None
+
+
+def test_fixtures_of_known_game_day_are_added_to_it(data_dir):
+    fixtures_html = (data_dir / "season-114-fixtures.html").read_text().replace(
+        "Thursday 11 Jul 2019", "Thursday 04 Jul 2019",
+    )
+
+    sp = SeasonParse()
+    sp.parse_standings_page(path=data_dir / "season-114-standings.html")
+    known_games = list(sp.game_day_for(dt.date(2019, 7, 4)).games)
+    sp.parse_fixtures_page(html=fixtures_html)
+
+    game_day = sp.game_day_for(dt.date(2019, 7, 4))
+    assert game_day.games[:len(known_games)] == known_games
+    assert sp.get_game(204747) in game_day.games
+    assert len(sp.game_days) == 11
+
+
+def test_dtos_are_slotted_and_serialize_like_asdict():
+    dto = GameDto(
+        id=1,
+        scheduled_time=dt.datetime(2019, 5, 2, 18, 45),
+        season_id=114,
+        season_stage="regular",
+        home_team_id="0114.1",
+        home_team_pts=40,
+        home_team_outcome="W",
+        away_team_id="0114.2",
+        away_team_pts=30,
+        away_team_outcome="L",
+    )
+    assert not hasattr(dto, "__dict__")
+    assert dto.to_dict() == dataclasses.asdict(dto)
+    assert dto.to_row() == tuple(dataclasses.asdict(dto).values())
+
+    team = TeamDto(team_id=2, season_id=114, franchise_id=3, name="Rockets")
+    assert team.id == "0114.2"
+    assert team.to_dict() == dataclasses.asdict(team)
+
+    assert FranchiseDto(id=1, name="Supernova").to_row() == (1, "Supernova")
+
+
+def test_value_tables_match_rules():
+    for outcome, points in GameOutcomes.regular_season_points.items():
+        assert GameOutcomes.get_points_for(outcome, SeasonStages.regular) == points
+        for stage in SeasonStages.all_playoffs:
+            assert GameOutcomes.get_points_for(outcome, stage) == 0
+
+    href = "TeamProfile.aspx?VenueId=0&LeagueId=505&SeasonId=114&DivisionId=3568&TeamId=4949"
+    assert _get_team_id(href) == parse_qs(href)["TeamId"][0] == "4949"
+    with pytest.raises(KeyError):
+        _get_team_id("TeamProfile.aspx?VenueId=0&LeagueId=505")
+
+    assert parse_gm_date("Thursday 06 Nov 2014") == dt.datetime(2014, 11, 6)
+    assert parse_gm_date("Thursday 06 Nov 2014") is parse_gm_date("Thursday 06 Nov 2014")
+
+
+def test_tables_are_parsed_on_first_access(data_dir):
+    env = UnicornerEnv()
+    env.stats = ExtractionStats()
+    sp = SeasonParse(env=env)
+    sp.parse_standings_page(path=data_dir / "season-114-standings.html")
+    sp.parse_fixtures_page(path=data_dir / "season-114-fixtures.html")
+
+    assert (sp.season_id, sp.season_name, sp.league_id, sp.division_id) == (114, "Spring 2019", 505, 3568)
+    assert "standings_table" not in env.stats.timings
+
+    assert len(sp.game_days) == 12
+    assert len(sp.teams) == 8
+    assert env.stats.timings["standings_table"] > 0
+    assert env.stats.timings["fixtures_table"] > 0
+
+
+@pytest.mark.parametrize("accessed", ["game_days", "teams"])
+def test_fixtures_page_parsed_after_tables_were_accessed(data_dir, accessed):
+    sp = SeasonParse()
+    sp.parse_standings_page(path=data_dir / "season-114-standings.html")
+    getattr(sp, accessed)
+    sp.parse_fixtures_page(path=data_dir / "season-114-fixtures.html")
+
+    assert len(sp.game_days) == 12
+    assert sum(len(game_day.games) for game_day in sp.game_days) == 44
+
+
+def test_list_seasons(tmp_path):
+    write_archive(tmp_path, num_seasons=3, num_teams=4, num_weeks=2, first_season_id=110)
+    (tmp_path / "season-111-standings.html").unlink()
+
+    seasons = list_seasons(tmp_path)
+    assert [(s.season_id, s.season_name, s.league_id, s.division_id) for s in seasons] == [
+        (110, "Season 110", 505, 3568),
+        (112, "Season 112", 505, 3568),
+    ]
+    assert "teams" not in seasons[0].__dict__
+    assert len(seasons[0].teams) == 4
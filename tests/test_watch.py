@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from unicorner import watch
+from unicorner.watch import ADDED, CHANGED, REMOVED, SeasonWatcher
+
+
+def touch(path, content):
+    # Change mtime explicitly in case the file system's timestamps are too coarse
+    mtime_ns = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+
+
+def test_watcher_reports_changed_games(data_dir, tmp_path):
+    for page in ("standings", "fixtures"):
+        shutil.copy(data_dir / f"season-114-{page}.html", tmp_path / f"season-114-{page}.html")
+        html = (data_dir / f"season-114-{page}.html").read_text()
+        # Season 113 is a copy of season 114 with a different id of one game
+        (tmp_path / f"season-113-{page}.html").write_text(
+            html.replace("SeasonId=114", "SeasonId=113").replace('"204707"', '"104707"')
+        )
+
+    emitted = []
+    watcher = SeasonWatcher(tmp_path, on_change=emitted.append)
+    assert watcher.poll() == []
+    assert watcher.poll() == []
+
+    # New score of a game
+    standings_path = tmp_path / "season-114-standings.html"
+    touch(standings_path, standings_path.read_text().replace(">50 - 45<", ">50 - 52<"))
+    changes = watcher.poll()
+    assert [(c.kind, c.season_id, c.game.id) for c in changes] == [(CHANGED, 114, 204707)]
+    assert set(changes[0].changed_fields) == {
+        "away_team_score", "home_team_outcome", "away_team_outcome", "home_team_points", "away_team_points",
+    }
+    assert (changes[0].previous.away_team_score, changes[0].game.away_team_score) == (45, 52)
+    assert emitted == changes
+    assert json.loads(changes[0].to_json())["game"]["away_team_score"] == 52
+
+    # Score override of a game which only season 113 has
+    touch(tmp_path / "score_overrides.csv", (
+        "game_id,home_team_id,home_team_score,away_team_id,away_team_score,"
+        "score_status,score_status_comments,season_stage\n"
+        "104707,,20,,0,1,Forfeit,\n"
+    ))
+    changes = watcher.poll()
+    assert [(c.kind, c.season_id, c.game.id) for c in changes] == [(CHANGED, 113, 104707)]
+    assert changes[0].game.score_status_comments == "Forfeit"
+
+    # Season pages removed
+    (tmp_path / "season-113-standings.html").unlink()
+    (tmp_path / "season-113-fixtures.html").unlink()
+    changes = watcher.poll()
+    assert {c.kind for c in changes} == {REMOVED}
+    assert len(changes) == 44
+
+
+def test_watcher_can_report_initial_games(data_dir, tmp_path):
+    for page in ("standings", "fixtures"):
+        shutil.copy(data_dir / f"season-114-{page}.html", tmp_path / f"season-114-{page}.html")
+
+    changes = SeasonWatcher(tmp_path, emit_initial=True, html_parser="events").poll()
+    assert len(changes) == 44
+    assert {c.kind for c in changes} == {ADDED}
+
+
+def write_two_seasons(data_dir, tmp_path):
+    for page in ("standings", "fixtures"):
+        html = (data_dir / f"season-114-{page}.html").read_text()
+        (tmp_path / f"season-114-{page}.html").write_text(html)
+        (tmp_path / f"season-113-{page}.html").write_text(
+            html.replace("SeasonId=114", "SeasonId=113").replace('"204707"', '"104707"')
+        )
+
+
+def change_scores(tmp_path):
+    for season_id in (113, 114):
+        path = tmp_path / f"season-{season_id}-standings.html"
+        touch(path, path.read_text().replace(">50 - 45<", ">50 - 52<"))
+
+
+def test_changes_are_not_lost_when_a_season_fails(data_dir, tmp_path, monkeypatch):
+    write_two_seasons(data_dir, tmp_path)
+    watcher = SeasonWatcher(tmp_path)
+    watcher.poll()
+
+    change_scores(tmp_path)
+    parse_season = watch.parse_season
+
+    def fail_on_season_114(env, standings_path, fixtures_path=None):
+        if "114" in standings_path.name:
+            raise ValueError("Half-written page")
+        return parse_season(env=env, standings_path=standings_path, fixtures_path=fixtures_path)
+
+    monkeypatch.setattr(watch, "parse_season", fail_on_season_114)
+    with pytest.raises(ValueError):
+        watcher.poll()
+
+    monkeypatch.setattr(watch, "parse_season", parse_season)
+    changes = watcher.poll()
+    assert [(c.kind, c.season_id) for c in changes] == [(CHANGED, 113), (CHANGED, 114)]
+    assert watcher.poll() == []
+
+
+def test_changes_are_reported_again_when_on_change_fails(data_dir, tmp_path):
+    write_two_seasons(data_dir, tmp_path)
+    emitted = []
+
+    def on_change(change):
+        if not emitted:
+            emitted.append(None)
+            raise ConnectionError("Consumer went away")
+        emitted.append(change)
+
+    watcher = SeasonWatcher(tmp_path, on_change=on_change)
+    watcher.poll()
+
+    change_scores(tmp_path)
+    with pytest.raises(ConnectionError):
+        watcher.poll()
+    watcher.poll()
+    assert [(c.kind, c.season_id) for c in emitted[1:]] == [(CHANGED, 113), (CHANGED, 114)]
@@ -3,7 +3,6 @@ __email__ = "jazeps.basko@gmail.com"
 __version__ = "0.3.4"
 
 from .env import UnicornerEnv
-from .season_page import SeasonParse
 from .values import GameOutcomes, ScoreStatuses, SeasonStages
 
 __all__ = [
@@ -13,3 +12,13 @@ __all__ = [
     "SeasonStages",
     "ScoreStatuses",
 ]
+
+
+def __getattr__(name):
+    # SeasonParse pulls in BeautifulSoup, only import it when it is asked for
+    # so that commands which don't parse pages start quickly.
+    if name == "SeasonParse":
+        from .season_page import SeasonParse
+
+        return SeasonParse
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,197 @@
+"""
+All seasons, teams, franchises and games of an extraction in one object, with indexes
+for the lookups that consumers of an extraction otherwise do with nested loops.
+
+Games are stored in columns, one row per game, ordered by scheduled time. Indexes map a season,
+team, franchise or venue to the rows of its games together with their scheduled times so that
+games of a key between two dates are found by bisecting instead of scanning.
+"""
+import datetime as dt
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .dtos import FranchiseDto, GameDto, SeasonDto, TeamDto
+from .extraction import (
+    assign_sequence_numbers, create_env, create_season_dto, iter_franchises, iter_game_dtos, iter_teams,
+    load_score_overrides, parse_seasons,
+)
+from .parse_cache import ParseCache
+from .values import SeasonStages
+
+# Scheduled time of games without one, so that they sort last
+UNSCHEDULED = dt.datetime.max
+
+
+class _Index:
+    """
+    Key -> rows of games of the key and their scheduled times, both in order of scheduled time.
+    """
+
+    __slots__ = ("_rows", "_times")
+
+    def __init__(self):
+        self._rows: Dict = {}
+        self._times: Dict = {}
+
+    def add(self, key, row: int, time: dt.datetime):
+        if key not in self._rows:
+            self._rows[key] = array("l")
+            self._times[key] = []
+        self._rows[key].append(row)
+        self._times[key].append(time)
+
+    def keys(self):
+        return self._rows.keys()
+
+    def get(self, key, start: dt.datetime = None, end: dt.datetime = None) -> Iterable[int]:
+        """
+        Rows of games of key scheduled at or after start and before end.
+        """
+        rows = self._rows.get(key)
+        if rows is None:
+            return ()
+        if start is None and end is None:
+            return rows
+        times = self._times[key]
+        lo = 0 if start is None else bisect_left(times, start)
+        hi = len(times) if end is None else bisect_left(times, end)
+        return rows[lo:hi]
+
+
+class SeasonArchive:
+    """
+    Build with from_input_dir, which also knows venues of games, or from_extraction.
+    Games returned by queries are in order of scheduled time.
+    """
+
+    def __init__(
+        self, seasons: Iterable[SeasonDto], teams: Iterable[TeamDto], franchises: Iterable[FranchiseDto],
+        games: Iterable[GameDto], venues: Dict[int, str] = None,
+    ):
+        self.seasons: Dict[int, SeasonDto] = {s.id: s for s in seasons}
+        self.teams: Dict[str, TeamDto] = {t.id: t for t in teams}
+        self.franchises: Dict[int, FranchiseDto] = {int(f.id): f for f in franchises}
+        venues = venues or {}
+
+        games = sorted(games, key=lambda g: (g.scheduled_time or UNSCHEDULED, g.id))
+
+        # Columns
+        self.games: List[GameDto] = games
+        self.game_ids = array("q", (g.id for g in games))
+        self.times: List[dt.datetime] = [g.scheduled_time or UNSCHEDULED for g in games]
+        self.venues: List[Optional[str]] = [venues.get(g.id) for g in games]
+
+        self._rows_by_game_id = {game_id: row for row, game_id in enumerate(self.game_ids)}
+        self._franchise_of_team = {t.id: int(t.franchise_id) for t in self.teams.values() if t.franchise_id}
+        self._teams_by_franchise: Dict[int, List[TeamDto]] = {}
+        for team in self.teams.values():
+            if team.franchise_id:
+                self._teams_by_franchise.setdefault(int(team.franchise_id), []).append(team)
+
+        self._by_season = _Index()
+        self._by_team = _Index()
+        self._by_franchise = _Index()
+        self._by_venue = _Index()
+        for row, (game, time, venue) in enumerate(zip(games, self.times, self.venues)):
+            self._by_season.add(game.season_id, row, time)
+            self._by_team.add(game.home_team_id, row, time)
+            if game.away_team_id != game.home_team_id:
+                self._by_team.add(game.away_team_id, row, time)
+            home_franchise = self._franchise_of_team.get(game.home_team_id)
+            away_franchise = self._franchise_of_team.get(game.away_team_id)
+            if home_franchise is not None:
+                self._by_franchise.add(home_franchise, row, time)
+            if away_franchise is not None and away_franchise != home_franchise:
+                self._by_franchise.add(away_franchise, row, time)
+            if venue is not None:
+                self._by_venue.add(venue, row, time)
+
+    @classmethod
+    def from_extraction(cls, extraction) -> "SeasonArchive":
+        """
+        Archive of DTOs of an extraction. GameDtos have no venue so venue queries find nothing.
+        """
+        return cls(
+            seasons=extraction[SeasonDto], teams=extraction[TeamDto], franchises=extraction[FranchiseDto],
+            games=extraction[GameDto],
+        )
+
+    @classmethod
+    def from_input_dir(
+        cls, input_dir: Path, jobs: int = 1, html_parser: str = None, cache: ParseCache = None,
+    ) -> "SeasonArchive":
+        env = create_env(load_score_overrides(input_dir), html_parser=html_parser, cache=cache)
+        seasons, games, venues = [], [], {}
+        for season in parse_seasons(input_dir=input_dir, env=env, jobs=jobs):
+            seasons.append(create_season_dto(season))
+            games.extend(iter_game_dtos(season))
+            for game_day in season.game_days:
+                for game in game_day.games:
+                    venues[game.id] = game.venue
+        assign_sequence_numbers(seasons)
+        return cls(
+            seasons=seasons, teams=iter_teams(input_dir), franchises=iter_franchises(input_dir),
+            games=games, venues=venues,
+        )
+
+    def __len__(self):
+        return len(self.games)
+
+    def _games(self, rows: Iterable[int]) -> List[GameDto]:
+        games = self.games
+        return [games[row] for row in rows]
+
+    def get_game(self, game_id: int) -> Optional[GameDto]:
+        row = self._rows_by_game_id.get(game_id)
+        return None if row is None else self.games[row]
+
+    def get_venue(self, game_id: int) -> Optional[str]:
+        row = self._rows_by_game_id.get(game_id)
+        return None if row is None else self.venues[row]
+
+    def get_franchise_of_team(self, team_id: str) -> Optional[FranchiseDto]:
+        franchise_id = self._franchise_of_team.get(team_id)
+        return None if franchise_id is None else self.franchises.get(franchise_id)
+
+    def get_teams_of_franchise(self, franchise_id: int) -> List[TeamDto]:
+        return self._teams_by_franchise.get(franchise_id, [])
+
+    def get_venues(self) -> List[str]:
+        return sorted(self._by_venue.keys())
+
+    def games_between(self, start: dt.datetime = None, end: dt.datetime = None) -> List[GameDto]:
+        """
+        Games scheduled at or after start and before end.
+        """
+        lo = 0 if start is None else bisect_left(self.times, start)
+        hi = len(self.times) if end is None else bisect_left(self.times, end)
+        return self.games[lo:hi]
+
+    def games_on(self, date: dt.date) -> List[GameDto]:
+        start = dt.datetime.combine(date, dt.time())
+        return self.games_between(start, start + dt.timedelta(days=1))
+
+    def games_of_season(self, season_id: int) -> List[GameDto]:
+        return self._games(self._by_season.get(season_id))
+
+    def finals_of_season(self, season_id: int) -> List[GameDto]:
+        return [g for g in self.games_of_season(season_id) if SeasonStages.is_finals(g.season_stage)]
+
+    def games_of_team(self, team_id: str) -> List[GameDto]:
+        return self._games(self._by_team.get(team_id))
+
+    def games_of_franchise(
+        self, franchise_id: int, start: dt.datetime = None, end: dt.datetime = None,
+    ) -> List[GameDto]:
+        """
+        Games of all teams of a franchise scheduled at or after start and before end.
+        """
+        return self._games(self._by_franchise.get(franchise_id, start, end))
+
+    def games_at_venue(self, venue: str, start: dt.datetime = None, end: dt.datetime = None) -> List[GameDto]:
+        """
+        Schedule of a venue, optionally only games at or after start and before end.
+        """
+        return self._games(self._by_venue.get(venue, start, end))
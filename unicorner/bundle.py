@@ -0,0 +1,108 @@
+"""
+Read season pages and input CSV files straight from .zip and .tar(.gz) bundles of saved pages,
+without extracting them to disk first.
+
+Members are matched by their base name, so pages can be in any directory of the bundle.
+Bundles are read in a single pass in the order of their members. A season's pages are handed
+out together once both have been read, so only pages still waiting for the other page of their
+season are held in memory. Fixtures pages that come before standings pages are therefore still
+parsed after them.
+"""
+import dataclasses
+import functools
+import io
+import re
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Callable, Container, Dict, Generator, Optional, Tuple
+
+BUNDLE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+
+SEASON_PAGE_REGEX = re.compile(r"season-(\d+)-(standings|fixtures)\.html$")
+
+CSV_NAMES = ("score_overrides.csv", "franchises.csv", "franchise_seasons.csv")
+
+
+def is_bundle(path: Path) -> bool:
+    return path.name.endswith(BUNDLE_SUFFIXES) and path.is_file()
+
+
+@dataclasses.dataclass
+class BundleMember:
+    """
+    Content of a file read from a bundle, with the parts of the Path interface that extraction uses.
+    """
+
+    bundle_path: Path
+    member_name: str
+    data: bytes = dataclasses.field(repr=False)
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member_name).name
+
+    def read_bytes(self) -> bytes:
+        return self.data
+
+    def read_text(self, encoding: str = "utf-8") -> str:
+        return self.data.decode(encoding)
+
+    def open(self) -> io.StringIO:
+        return io.StringIO(self.read_text(), newline="")
+
+    def __str__(self):
+        return f"{self.bundle_path}:{self.member_name}"
+
+
+def iter_bundle_members(bundle_path: Path, match: Callable[[str], bool]) -> Generator[BundleMember, None, None]:
+    """
+    Files of a bundle whose base names match, in the order they are stored in.
+    """
+    if bundle_path.name.endswith(".zip"):
+        with zipfile.ZipFile(bundle_path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and match(PurePosixPath(info.filename).name):
+                    yield BundleMember(bundle_path, info.filename, zf.read(info))
+    else:
+        # Stream mode reads the archive front to back without seeking
+        with tarfile.open(bundle_path, "r|*") as tf:
+            for info in tf:
+                if info.isfile() and match(PurePosixPath(info.name).name):
+                    yield BundleMember(bundle_path, info.name, tf.extractfile(info).read())
+
+
+def iter_bundle_season_pages(
+    bundle_path: Path, season_ids: Container[int] = None,
+) -> Generator[Tuple[int, Dict[str, BundleMember]], None, None]:
+    """
+    Season ids and pages of seasons in a bundle, in the same form as group_season_pages returns them.
+    Seasons are yielded as soon as both of their pages have been read, seasons which miss a page at the end.
+    If season_ids is given, pages of other seasons are skipped without being read.
+    """
+    def match(name: str) -> bool:
+        m = SEASON_PAGE_REGEX.match(name)
+        return m is not None and (season_ids is None or int(m.group(1)) in season_ids)
+
+    waiting: Dict[int, Dict[str, BundleMember]] = {}
+    for member in iter_bundle_members(bundle_path, match):
+        season_id, page = SEASON_PAGE_REGEX.match(member.name).groups()
+        pages = waiting.setdefault(int(season_id), {})
+        pages[f"{page}_path"] = member
+        if len(pages) == 2:
+            yield int(season_id), waiting.pop(int(season_id))
+    yield from waiting.items()
+
+
+@functools.lru_cache(maxsize=4)
+def _read_bundle_csvs(bundle_path: Path, mtime_ns: int, size: int) -> Dict[str, BundleMember]:
+    # All input CSV files are read in one pass, a .tar.gz can only be read front to back
+    return {member.name: member for member in iter_bundle_members(bundle_path, CSV_NAMES.__contains__)}
+
+
+def get_bundle_csv(bundle_path: Path, name: str) -> Optional[BundleMember]:
+    """
+    One of CSV_NAMES from a bundle, None if the bundle doesn't have it.
+    """
+    stat = bundle_path.stat()
+    return _read_bundle_csvs(bundle_path, stat.st_mtime_ns, stat.st_size).get(name)
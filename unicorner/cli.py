@@ -1,12 +1,10 @@
+import contextlib
 import logging
+import sys
 from pathlib import Path
-from pprint import pprint
 
 import aarghparse
 
-from unicorner import UnicornerEnv, SeasonParse
-from unicorner.extraction import extract_all
-
 
 def configure_logging(level=logging.INFO):
     logging.basicConfig(level=level)
@@ -17,29 +15,315 @@ def cli(parser, subcommand):
     configure_logging()
 
     @subcommand(name="extract_all", args=[
-        ["--input-dir"],
+        ["--input-dir", {"help": "Directory of season pages and CSV files, or a .zip or .tar.gz bundle of them"}],
         ["--output-dir"],
+        ["--output", {
+            "help": "Write to a SQLite database (sqlite:PATH) or a binary snapshot (snapshot:PATH) instead of CSV files",
+        }],
+        ["--jobs", {"type": int, "default": 1, "help": "Number of worker processes to parse seasons with"}],
+        ["--parser", {
+            "choices": ["html.parser", "lxml", "events"], "default": "html.parser",
+            "help": "HTML parser backend, events reads pages without building a tree",
+        }],
+        ["--cache-dir", {"help": "Directory of the parse cache, defaults to ~/.cache/unicorner"}],
+        ["--no-cache", {"action": "store_true", "help": "Parse all pages, do not read or write the parse cache"}],
+        ["--incremental", {"action": "store_true", "help": "Only re-extract seasons changed since the previous run"}],
+        ["--partitioned", {
+            "action": "store_true",
+            "help": "Write each league and division to its own directory under output dir, with an index of them",
+        }],
+        ["--profile", {
+            "nargs": "?", "const": "-", "metavar": "JSON_PATH",
+            "help": "Print timings of extraction stages and counters, or write them as JSON to JSON_PATH",
+        }],
     ])
     def cmd_extract_all(args):
         """
         Extract all there is to extract.
         """
 
+        import json
+
+        from unicorner.extraction import extract_all, iter_extraction
+        from unicorner.parse_cache import ParseCache, get_default_cache_dir
+        from unicorner.stats import ExtractionStats
+
         input_dir = Path(args.input_dir) if args.input_dir else Path.cwd()
         assert input_dir.exists()
 
+        cache = None
+        if not args.no_cache:
+            cache = ParseCache(Path(args.cache_dir) if args.cache_dir else get_default_cache_dir())
+
+        stats = ExtractionStats(enabled=args.profile is not None)
+
+        if args.partitioned:
+            if args.output or args.incremental:
+                parser.error("--partitioned can't be combined with --output or --incremental")
+
+            from unicorner.partitions import extract_partitioned
+
+            output_dir = Path(args.output_dir) if args.output_dir else Path.cwd()
+            output_dir.mkdir(parents=True, exist_ok=True)
+            extract_partitioned(
+                input_dir=input_dir, output_dir=output_dir, jobs=args.jobs, html_parser=args.parser, cache=cache,
+                stats=stats,
+            )
+        elif args.output:
+            if args.incremental:
+                parser.error("--output can't be combined with --incremental, only CSV files are updated incrementally")
+
+            dtos = iter_extraction(input_dir=input_dir, jobs=args.jobs, html_parser=args.parser, cache=cache, stats=stats)
+            if args.output.startswith("sqlite:"):
+                from unicorner.sqlite_output import write_sqlite
+                write_sqlite(dtos, db_path=Path(args.output[len("sqlite:"):]))
+            elif args.output.startswith("snapshot:"):
+                from unicorner.snapshot import write_snapshot
+                write_snapshot(dtos, path=Path(args.output[len("snapshot:"):]))
+            else:
+                parser.error(f"Unsupported output {args.output}, expected sqlite:PATH or snapshot:PATH")
+        else:
+            output_dir = Path(args.output_dir) if args.output_dir else Path.cwd()
+            assert output_dir.exists()
+
+            extract_all(
+                input_dir=input_dir, output_dir=output_dir, jobs=args.jobs, html_parser=args.parser, cache=cache,
+                incremental=args.incremental, stats=stats,
+            )
+
+        if args.profile == "-":
+            print(stats.format_table())
+        elif args.profile:
+            Path(args.profile).write_text(json.dumps(stats.to_dict(), indent=2, sort_keys=True))
+
+    @subcommand(name="fetch", args=[
+        ["--base-url", {"required": True, "help": "URL of the GM site which Standings.aspx and Fixtures.aspx are under"}],
+        ["--output-dir"],
+        ["--season", {
+            "action": "append", "default": [], "metavar": "SEASON_ID:LEAGUE_ID:DIVISION_ID",
+            "help": "Season to fetch pages of, can be repeated",
+        }],
+        ["--refresh", {"action": "store_true", "help": "Also fetch all seasons which already have pages in output dir"}],
+        ["--jobs", {"type": int, "default": 4, "help": "Number of pages to download at once"}],
+    ])
+    def cmd_fetch(args):
+        """
+        Download standings and fixtures pages of seasons from GM.
+        """
+
+        from unicorner.extraction import list_seasons
+        from unicorner.fetch import SeasonRef, fetch_seasons
+
         output_dir = Path(args.output_dir) if args.output_dir else Path.cwd()
-        assert output_dir.exists()
 
-        extract_all(input_dir=input_dir, output_dir=output_dir)
+        try:
+            seasons = {s.season_id: s for s in map(SeasonRef.from_str, args.season)}
+        except ValueError:
+            parser.error("Seasons should be given as SEASON_ID:LEAGUE_ID:DIVISION_ID")
+
+        if args.refresh and output_dir.exists():
+            for season in list_seasons(output_dir):
+                seasons.setdefault(season.season_id, SeasonRef(season.season_id, season.league_id, season.division_id))
+
+        if not seasons:
+            parser.error("Nothing to fetch, pass --season or --refresh")
+
+        results = fetch_seasons(seasons.values(), output_dir=output_dir, base_url=args.base_url, jobs=args.jobs)
+
+        failed = [r for r in results if r.status == "failed"]
+        if failed:
+            raise SystemExit(f"Failed to fetch {len(failed)} of {len(results)} pages")
+
+    @subcommand(name="watch", args=[
+        ["--input-dir"],
+        ["--interval", {"type": float, "default": 5.0, "help": "Seconds between checks for changed files"}],
+        ["--parser", {"choices": ["html.parser", "lxml", "events"], "default": "html.parser"}],
+        ["--emit-initial", {"action": "store_true", "help": "Also print all games found on start as added"}],
+    ])
+    def cmd_watch(args):
+        """
+        Watch input directory and print games changed in season pages or score overrides as JSON lines.
+        """
+
+        from unicorner.watch import SeasonWatcher
+
+        input_dir = Path(args.input_dir) if args.input_dir else Path.cwd()
+        assert input_dir.exists()
+
+        watcher = SeasonWatcher(
+            input_dir, html_parser=args.parser, emit_initial=args.emit_initial,
+            on_change=lambda change: print(change.to_json(), flush=True),
+        )
+        try:
+            watcher.run(interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+
+    @subcommand(name="list_seasons", args=[
+        ["--input-dir"],
+    ])
+    def cmd_list_seasons(args):
+        """
+        List seasons found in input directory without parsing their tables.
+        """
+
+        from unicorner.extraction import list_seasons
+
+        input_dir = Path(args.input_dir) if args.input_dir else Path.cwd()
+        assert input_dir.exists()
+
+        for season in list_seasons(input_dir):
+            print(f"{season.season_id}\t{season.league_id}\t{season.division_id}\t{season.season_name}")
+
+    @subcommand(name="check_standings", args=[
+        ["--input-dir"],
+        ["--parser", {"choices": ["html.parser", "lxml", "events"], "default": "html.parser"}],
+        ["--jobs", {"type": int, "default": 1, "help": "Number of worker processes to parse seasons with"}],
+        ["--output", {"help": "Write corrected standings of all teams to this CSV file"}],
+    ])
+    def cmd_check_standings(args):
+        """
+        Recompute standings from games and print where GM standings differ, requires numpy.
+        """
+
+        import csv
+
+        from unicorner.extraction import create_env, load_score_overrides, parse_seasons
+        from unicorner.standings import COLUMNS, check_seasons
+
+        input_dir = Path(args.input_dir) if args.input_dir else Path.cwd()
+        assert input_dir.exists()
+
+        env = create_env(load_score_overrides(input_dir), html_parser=args.parser)
+        mismatches, corrected = check_seasons(parse_seasons(input_dir=input_dir, env=env, jobs=args.jobs))
+
+        for m in mismatches:
+            print(f"{m.team_id}\t{m.column}\t{m.parsed}\t{m.computed}")
+
+        if args.output:
+            with open(args.output, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("id", "name") + COLUMNS)
+                for team in corrected:
+                    writer.writerow([team.id, team.name] + [getattr(team, column) for column in COLUMNS])
+
+        if mismatches:
+            raise SystemExit(f"{len(mismatches)} mismatches in standings")
+
+    @subcommand(name="ratings", args=[
+        ["--input-dir"],
+        ["--state", {"required": True, "help": "Checkpoint file of ratings, updated with games played since it was saved"}],
+        ["--parser", {"choices": ["html.parser", "lxml", "events"], "default": "html.parser"}],
+        ["--jobs", {"type": int, "default": 1, "help": "Number of worker processes to parse seasons with"}],
+        ["--cache-dir", {"help": "Directory of the parse cache, defaults to ~/.cache/unicorner"}],
+        ["--no-cache", {"action": "store_true", "help": "Parse all pages, do not read or write the parse cache"}],
+        ["--top", {"type": int, "default": 20, "help": "Number of franchises to print"}],
+    ])
+    def cmd_ratings(args):
+        """
+        Update Elo ratings of franchises with new games and print the top rated.
+        """
+
+        from unicorner.dtos import GameDto
+        from unicorner.extraction import iter_extraction, iter_franchises, iter_teams
+        from unicorner.parse_cache import ParseCache, get_default_cache_dir
+        from unicorner.ratings import EloRatings, get_franchise_of_team
+
+        input_dir = Path(args.input_dir) if args.input_dir else Path.cwd()
+        assert input_dir.exists()
+
+        # All seasons are read on every run, the cache saves parsing the ones that haven't changed
+        cache = None
+        if not args.no_cache:
+            cache = ParseCache(Path(args.cache_dir) if args.cache_dir else get_default_cache_dir())
+
+        state_path = Path(args.state)
+        franchise_of_team = get_franchise_of_team(iter_teams(input_dir))
+        if state_path.exists():
+            ratings = EloRatings.load(state_path, franchise_of_team=franchise_of_team)
+        else:
+            ratings = EloRatings(franchise_of_team=franchise_of_team)
+
+        games = (
+            dto for dto in iter_extraction(input_dir=input_dir, jobs=args.jobs, html_parser=args.parser, cache=cache)
+            if isinstance(dto, GameDto)
+        )
+        applied = ratings.update(games)
+        ratings.save(state_path)
+        print(f"Applied {applied} new games", file=sys.stderr)
+
+        names = {int(f.id): f.name for f in iter_franchises(input_dir)}
+        for key, rating in ratings.get_ranking()[:args.top]:
+            name = names.get(int(key), "") if key.isdigit() else ""
+            print(f"{rating:.1f}\t{key}\t{name}")
+
+    @subcommand(name="diff", args=[
+        ["old", {"help": "Previous extraction, a directory of CSV files or a snapshot file"}],
+        ["new", {"help": "Current extraction, a directory of CSV files or a snapshot file"}],
+        ["--output", {"help": "Write changes to this file instead of stdout"}],
+    ])
+    def cmd_diff(args):
+        """
+        Print rows inserted, updated and deleted between two extractions as JSON lines.
+        """
+
+        import collections
+
+        from unicorner.diff import diff_extractions
+
+        old, new = Path(args.old), Path(args.new)
+        for path in (old, new):
+            if not path.exists():
+                parser.error(f"{path} does not exist")
+
+        counts = collections.Counter()
+        with (open(args.output, "w") if args.output else contextlib.nullcontext(sys.stdout)) as f:
+            for change in diff_extractions(old, new):
+                f.write(change.to_json() + "\n")
+                counts[change.table, change.change] += 1
+
+        for (table, change), count in sorted(counts.items()):
+            print(f"{table}: {count} {change}", file=sys.stderr)
+
+    @subcommand(name="serve", args=[
+        ["extraction", {"help": "Extraction to serve, a directory of CSV files or a snapshot file"}],
+        ["--host", {"default": "127.0.0.1"}],
+        ["--port", {"type": int, "default": 8000}],
+        ["--interval", {"type": float, "default": 2.0, "help": "Seconds between checks for a changed extraction"}],
+    ])
+    def cmd_serve(args):
+        """
+        Serve standings, fixtures, results and head-to-head records of an extraction as JSON over HTTP,
+        requires numpy.
+        """
+
+        import asyncio
+
+        from unicorner.server import ExtractionServer
+
+        source = Path(args.extraction)
+        if not source.exists():
+            parser.error(f"{source} does not exist")
+
+        server = ExtractionServer(source, interval=args.interval)
+        try:
+            asyncio.run(server.serve(host=args.host, port=args.port))
+        except KeyboardInterrupt:
+            pass
 
     @subcommand(name="parse_standings_page", args=[
         ["path",],
     ])
     def cmd_parse_standings_page(args):
+        from pprint import pprint
+
+        from unicorner import SeasonParse, UnicornerEnv
+
         env = UnicornerEnv()
         season = SeasonParse(env=env)
         season.parse_standings_page(path=args.path)
+        # Tables are parsed on first access
+        season.teams
         pprint(season.__dict__)
 
 
@@ -0,0 +1,86 @@
+"""
+Rows inserted, updated and deleted between two extractions, so that only the changes need to
+be loaded downstream instead of the whole extraction.
+
+Each extraction is either a directory of gm*s.csv files as written by write_extraction or a
+snapshot file as written by write_snapshot. Rows are matched by their id. Only an 8 byte hash
+of each row of the old extraction is kept in memory, one DTO class at a time, while rows of
+the new extraction are streamed and compared with them. Deleted rows are read again from the
+old extraction at the end of each DTO class.
+"""
+import csv
+import dataclasses
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, Type
+
+from .dtos import DtoMixin, FranchiseDto, GameDto, SeasonDto, TeamDto
+from .extraction import get_output_path, to_csv_row
+
+DIFF_DTO_CLASSES = (FranchiseDto, SeasonDto, TeamDto, GameDto)
+
+INSERTED = "inserted"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+@dataclasses.dataclass
+class RowChange:
+    table: str
+    change: str
+    id: str
+    # Row as it is in the new extraction, or as it was in the old one for deleted rows
+    row: Dict[str, str]
+
+    def to_json(self) -> str:
+        return json.dumps(dataclasses.asdict(self), sort_keys=True)
+
+
+def iter_rows(source: Path, dto_cls: Type[DtoMixin]) -> Generator[Dict[str, str], None, None]:
+    """
+    Rows of DTOs of dto_cls in a directory of CSV files or a snapshot file, formatted like in CSV files.
+    """
+    if source.is_dir():
+        path = get_output_path(source, dto_cls)
+        if path.exists():
+            with path.open() as f:
+                yield from csv.DictReader(f)
+    else:
+        from .snapshot import open_snapshot
+
+        with open_snapshot(source) as snapshot:
+            if dto_cls in snapshot.tables:
+                for dto in snapshot[dto_cls].iter_dtos():
+                    yield to_csv_row(dto)
+
+
+def _get_row_hash(row: Dict[str, str], field_names: List[str]) -> bytes:
+    # Fields in the order of the DTO, so that CSV files with columns in a different order still match
+    data = "\x1f".join(row.get(name) or "" for name in field_names).encode()
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def diff_extractions(
+    old: Path, new: Path, dto_classes: Iterable[Type[DtoMixin]] = DIFF_DTO_CLASSES,
+) -> Generator[RowChange, None, None]:
+    """
+    Changes which turn the old extraction into the new one, DTO class by DTO class.
+    """
+    for dto_cls in dto_classes:
+        table = dto_cls.get_export_name()
+        field_names = dto_cls.get_field_names()
+
+        old_hashes = {row["id"]: _get_row_hash(row, field_names) for row in iter_rows(old, dto_cls)}
+
+        for row in iter_rows(new, dto_cls):
+            old_hash = old_hashes.pop(row["id"], None)
+            if old_hash is None:
+                yield RowChange(table=table, change=INSERTED, id=row["id"], row=row)
+            elif old_hash != _get_row_hash(row, field_names):
+                yield RowChange(table=table, change=UPDATED, id=row["id"], row=row)
+
+        if old_hashes:
+            for row in iter_rows(old, dto_cls):
+                if row["id"] in old_hashes:
+                    yield RowChange(table=table, change=DELETED, id=row["id"], row=row)
@@ -4,25 +4,59 @@ These DTOs are the format in which we export data.
 
 import dataclasses
 import datetime as dt
-from typing import Dict, List
+import operator
+from typing import Callable, Dict, List, Tuple, Type
+
+from .slots import add_slots
+
+_row_getters: Dict[Type["DtoMixin"], Callable[["DtoMixin"], Tuple]] = {}
 
 
 class DtoMixin:
+    __slots__ = ()
 
     @classmethod
     def get_field_names(self) -> List[str]:
         return [f.name for f in dataclasses.fields(self)]
 
+    @classmethod
+    def get_export_name(cls) -> str:
+        """
+        Name of the exported file (without extension) or table, for example "gmgames" for GameDto.
+        """
+        return f"gm{cls.__name__.lower()[:-3]}s"
+
+    @classmethod
+    def get_row_getter(cls) -> Callable[["DtoMixin"], Tuple]:
+        """
+        Returns a function that takes a DTO of this class and returns a tuple
+        of its field values in the order of get_field_names.
+        """
+        if cls not in _row_getters:
+            field_names = cls.get_field_names()
+            getter = operator.attrgetter(*field_names)
+            if len(field_names) == 1:
+                _row_getters[cls] = lambda dto: (getter(dto),)
+            else:
+                _row_getters[cls] = getter
+        return _row_getters[cls]
+
+    def to_row(self) -> Tuple:
+        return self.get_row_getter()(self)
+
     def to_dict(self) -> Dict:
-        return dataclasses.asdict(self)
+        # All DTO fields are scalars so there is no need for the recursive copy of dataclasses.asdict
+        return dict(zip(self.get_field_names(), self.to_row()))
 
 
+@add_slots
 @dataclasses.dataclass
 class FranchiseDto(DtoMixin):
     id: int = None
     name: str = None
 
 
+@add_slots
 @dataclasses.dataclass
 class SeasonDto(DtoMixin):
     id: int = None
@@ -34,6 +68,7 @@ class SeasonDto(DtoMixin):
     last_week_date: dt.date = None
 
 
+@add_slots
 @dataclasses.dataclass
 class TeamDto(DtoMixin):
     team_id: int = None
@@ -46,11 +81,13 @@ class TeamDto(DtoMixin):
         self.id = f"{self.season_id:0>4}.{self.team_id}"
 
 
+@add_slots
 @dataclasses.dataclass
 class TeamSeasonDto(DtoMixin):
     id: str = None
 
 
+@add_slots
 @dataclasses.dataclass
 class GameDto(DtoMixin):
     id: int = None
@@ -1,5 +1,7 @@
 import logging
 
+from .stats import ExtractionStats
+
 
 def get_logger(name):
     logger = logging.getLogger(name)
@@ -10,3 +12,13 @@ def get_logger(name):
 class UnicornerEnv:
     def __init__(self):
         self.score_overrides = {}
+
+        # BeautifulSoup tree builder used to parse GM pages, "html.parser" or "lxml",
+        # or "events" to read pages with unicorner.page_events without building a tree
+        self.html_parser = "html.parser"
+
+        # unicorner.parse_cache.ParseCache to reuse previously parsed seasons from, if any
+        self.parse_cache = None
+
+        # Timings and counters of the extraction, disabled unless profiling
+        self.stats = ExtractionStats(enabled=False)
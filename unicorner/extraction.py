@@ -2,67 +2,197 @@
 Utilities to extract information from scraped GM fixtures and standings pages.
 """
 import collections
+import contextlib
 import csv
+import dataclasses
+import datetime as dt
+import io
+import itertools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Generator, List, Type
+from typing import Callable, Dict, Generator, Iterable, List, Optional, Tuple, Type, Union
 
-from unicorner import SeasonParse
+from unicorner.bundle import get_bundle_csv, is_bundle, iter_bundle_season_pages
 from unicorner.dtos import DtoMixin, FranchiseDto, GameDto, SeasonDto, TeamDto
 from unicorner.env import UnicornerEnv, get_logger
+from unicorner.manifest import create_manifest, is_season_changed, load_manifest, record_season, same_content, save_manifest
+from unicorner.parse_cache import ParseCache
+from unicorner.season_page import SeasonParse
+from unicorner.stats import ExtractionStats
 
 log = get_logger(__name__)
 
 
-def parse_seasons(input_dir: Path, env: UnicornerEnv = None) -> Generator[SeasonParse, None, None]:
-    seasons: Dict[int, SeasonParse] = {}
+def group_season_pages(input_dir: Path) -> Dict[int, Dict[str, Path]]:
+    """
+    Group season-SEASONID-standings.html and season-SEASONID-fixtures.html files found in input_dir
+    by GM season id. Returned dict maps season id to {"standings_path": ..., "fixtures_path": ...}.
+
+    Seasons are ordered in which they are first encountered in reverse-sorted listing of input_dir.
+    """
+    pages: Dict[int, Dict[str, Path]] = {}
 
-    # Standings should be parsed before fixtures in order to get the teams list first
-    # so we are sorting items in reverse order.
     for item in sorted(input_dir.iterdir(), reverse=True):
         if item.suffix != ".html":
             log.debug(f"Skipping {item}")
             continue
 
-        log.info(f"Parsing {item}")
-
         parts = item.name.split("-")
         gm_season_id = int(parts[1])
         is_fixtures = parts[2] == "fixtures.html"
-        if gm_season_id not in seasons:
-            seasons[gm_season_id] = SeasonParse(env=env)
+        pages.setdefault(gm_season_id, {})["fixtures_path" if is_fixtures else "standings_path"] = item
 
-        if is_fixtures:
-            seasons[gm_season_id].parse_fixtures_page(html=item.read_text())
-        else:
-            seasons[gm_season_id].parse_standings_page(html=item.read_text())
+    return pages
 
-    yield from seasons.values()
+
+def iter_season_pages(input_dir: Path) -> Iterable[Tuple[int, Dict[str, Path]]]:
+    """
+    Season ids and pages of seasons in input_dir, which can also be a bundle (see unicorner.bundle).
+    Pages of a bundle are BundleMembers instead of Paths.
+    """
+    if is_bundle(input_dir):
+        return iter_bundle_season_pages(input_dir)
+    return group_season_pages(input_dir).items()
 
 
-def create_extraction(input_dir: Path) -> Dict[Type[DtoMixin], List[DtoMixin]]:
+def get_input_file(input_dir: Path, name: str) -> Optional[Path]:
     """
-    This expects the following files to be present in input_dir:
-        franchises.csv
-        franchise_seasons.csv
-        score_overrides.csv
-        season-SEASONID-fixtures.html
-        season-SEASONID-standings.html
+    Input CSV file of input_dir, or of the bundle input_dir, if it exists.
+    """
+    if is_bundle(input_dir):
+        return get_bundle_csv(input_dir, name)
+    path = input_dir / name
+    return path if path.exists() else None
 
-    The input_dir can contain fixtures and standings for any number of seasons as long as SEASONID in the file names
-    match the season id.
 
-    Files season-SEASONID-fixtures.html and season-SEASONID-standings.html can be obtained by navigating in browser
-    to your league's fixtures/standings page and saving the HTML file following the naming convention.
+def list_seasons(input_dir: Path) -> List[SeasonParse]:
+    """
+    Seasons of input_dir ordered by GM season id, with only their metadata (id, name,
+    league and division) read from their standings pages. Teams and games of a season
+    are parsed only if accessed.
     """
+    seasons = []
+    for season_id, pages in sorted(iter_season_pages(input_dir), key=lambda item: item[0]):
+        if "standings_path" not in pages:
+            log.warning(f"Season {season_id} has no standings page, skipping it")
+            continue
+        season = SeasonParse()
+        season.parse_standings_page(html=pages["standings_path"].read_text())
+        seasons.append(season)
+    return seasons
 
-    season: SeasonParse
-    season_dto: SeasonDto
 
-    extraction: Dict[Type[DtoMixin], List[DtoMixin]] = collections.defaultdict(list)
+def parse_season(
+    standings_path: Path = None, fixtures_path: Path = None, env: UnicornerEnv = None,
+) -> SeasonParse:
+    env = env or UnicornerEnv()
+
+    with env.stats.timer("read_file"):
+        standings_html = standings_path.read_text() if standings_path is not None else None
+        fixtures_html = fixtures_path.read_text() if fixtures_path is not None else None
 
-    score_overrides_path = input_dir / "score_overrides.csv"
+    cache: ParseCache = env.parse_cache
+    if cache is not None:
+        cache_key = cache.get_key(standings_html=standings_html, fixtures_html=fixtures_html)
+        season = cache.load(cache_key, env=env)
+        if season is not None:
+            log.info(f"Loaded season {season.season_id} from parse cache")
+            env.stats.count("seasons_from_cache")
+            return season
+
+    season = SeasonParse(env=env)
+
+    # Standings should be parsed before fixtures in order to get the teams list first.
+    if standings_html is not None:
+        log.info(f"Parsing {standings_path}")
+        season.parse_standings_page(html=standings_html)
+
+    if fixtures_html is not None:
+        log.info(f"Parsing {fixtures_path}")
+        season.parse_fixtures_page(html=fixtures_html)
+
+    # Tables are parsed lazily, parse them now so that their time is spent (and timed) here
+    # rather than wherever they are first accessed.
+    season._parse_pending_pages()
+
+    if cache is not None:
+        cache.store(cache_key, season)
+
+    env.stats.count("seasons_parsed")
+
+    return season
+
+
+# Env of the current worker process, set once per worker by _init_worker
+# so that score overrides are not pickled for every season.
+_worker_env: UnicornerEnv = None
+
+
+def _init_worker(env: UnicornerEnv):
+    global _worker_env
+    _worker_env = env
+
+
+def _parse_season_in_worker(pages: Dict[str, Path]) -> Tuple[SeasonParse, Optional[ExtractionStats]]:
+    if not _worker_env.stats.enabled:
+        return parse_season(env=_worker_env, **pages), None
+
+    # Fresh stats for each season so that the parent can merge them without double counting
+    _worker_env.stats = ExtractionStats()
+    return parse_season(env=_worker_env, **pages), _worker_env.stats
+
+
+def _worker_result(result: Tuple[SeasonParse, Optional[ExtractionStats]], env: UnicornerEnv) -> SeasonParse:
+    season, stats = result
+    if env is not None:
+        season.env = env
+        if stats is not None:
+            env.stats.merge(stats)
+    return season
+
+
+def parse_seasons(input_dir: Path, env: UnicornerEnv = None, jobs: int = 1) -> Generator[SeasonParse, None, None]:
+    """
+    Parse all seasons found in input_dir, a directory or a bundle of pages.
+
+    If jobs is greater than 1, seasons are parsed in a pool of that many worker processes.
+    Seasons are yielded in the same order regardless of the number of jobs.
+    """
+    yield from parse_season_pages((pages for _, pages in iter_season_pages(input_dir)), env=env, jobs=jobs)
+
+
+def parse_season_pages(
+    season_pages: Union[Dict[int, Dict[str, Path]], Iterable[Dict[str, Path]]], env: UnicornerEnv = None,
+    jobs: int = 1,
+) -> Generator[SeasonParse, None, None]:
+    """
+    Parse seasons from pages grouped by group_season_pages, or from an iterable of pages of each season.
+    """
+    if isinstance(season_pages, dict):
+        season_pages = list(season_pages.values())
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(env,)) as executor:
+            # Only keep a couple of seasons per worker in flight so that parsed seasons
+            # don't pile up in memory when the consumer is slower than the workers.
+            pending = collections.deque()
+            for pages in season_pages:
+                pending.append(executor.submit(_parse_season_in_worker, pages))
+                if len(pending) >= 2 * jobs:
+                    yield _worker_result(pending.popleft().result(), env)
+            while pending:
+                yield _worker_result(pending.popleft().result(), env)
+    else:
+        for pages in season_pages:
+            yield parse_season(env=env, **pages)
+
+
+def load_score_overrides(input_dir: Path) -> Dict[int, Dict]:
+    score_overrides_path = get_input_file(input_dir, "score_overrides.csv")
     score_overrides = {}
-    if score_overrides_path.exists():
+    if score_overrides_path is not None:
         with score_overrides_path.open() as f:
             for row in csv.DictReader(f):
                 game_id = int(row['game_id'])
@@ -74,78 +204,441 @@ def create_extraction(input_dir: Path) -> Dict[Type[DtoMixin], List[DtoMixin]]:
                     "away_team_score": int(row["away_team_score"]),
                     "score_status": int(row["score_status"]),
                     "score_status_comments": row["score_status_comments"],
-                    "season_stage": row["season_stage"] or None,
+                    "season_stage": sys.intern(row["season_stage"]) if row["season_stage"] else None,
                 }
         log.info(f"{len(score_overrides)} score overrides loaded from {score_overrides_path}")
     else:
         log.info(f"No score overrides loaded")
+    return score_overrides
+
 
-    franchises_path = input_dir / "franchises.csv"
-    if franchises_path.exists():
+def iter_franchises(input_dir: Path) -> Generator[FranchiseDto, None, None]:
+    franchises_path = get_input_file(input_dir, "franchises.csv")
+    if franchises_path is not None:
         with franchises_path.open() as f:
-            extraction[FranchiseDto] = [
-                FranchiseDto(**row)
-                for row in csv.DictReader(f)
-            ]
+            for row in csv.DictReader(f):
+                yield FranchiseDto(**row)
+
 
-    franchise_seasons_path = input_dir / "franchise_seasons.csv"
-    if franchise_seasons_path.exists():
+def iter_teams(input_dir: Path) -> Generator[TeamDto, None, None]:
+    franchise_seasons_path = get_input_file(input_dir, "franchise_seasons.csv")
+    if franchise_seasons_path is not None:
         with franchise_seasons_path.open() as f:
             for fs in csv.DictReader(f):
-                extraction[TeamDto].append(TeamDto(
+                yield TeamDto(
                     season_id=fs["season_id"],
                     team_id=fs["team_id"],
                     franchise_id=fs["franchise_id"],
                     name=fs["name"],
-                ))
+                )
 
+
+def create_env(
+    score_overrides: Dict[int, Dict], html_parser: str = None, cache: ParseCache = None,
+    stats: ExtractionStats = None,
+) -> UnicornerEnv:
     env = UnicornerEnv()
     env.score_overrides = score_overrides
+    if html_parser:
+        env.html_parser = html_parser
+    env.parse_cache = cache
+    if stats is not None:
+        env.stats = stats
+    return env
+
+
+def create_season_dto(season: SeasonParse) -> SeasonDto:
+    """
+    Sequence number of the returned SeasonDto is not set, see assign_sequence_numbers.
+    """
+    game_days = sorted(season.game_days, key=lambda gd: gd.date)
+    return SeasonDto(
+        id=season.season_id,
+        league_id=season.league_id,
+        division_id=season.division_id or None,
+        name=season.season_name,
+        first_week_date=game_days[0].date if season.game_days else None,
+        last_week_date=game_days[-1].date if season.game_days else None,
+    )
 
-    for season in parse_seasons(input_dir=input_dir, env=env):
-        game_days = sorted(season.game_days, key=lambda gd: gd.date)
-        extraction[SeasonDto].append(SeasonDto(
-            id=season.season_id,
-            league_id=season.league_id,
-            division_id=season.division_id or None,
-            name=season.season_name,
-            first_week_date=game_days[0].date if season.game_days else None,
-            last_week_date=game_days[-1].date if season.game_days else None,
-        ))
-
-        for game_day in season.game_days:
-            for g in game_day.games:
-                extraction[GameDto].append(GameDto(
-                    id=g.id,
-                    scheduled_time=g.starts_at,
-                    season_id=season.season_id,
-                    season_stage=g.season_stage,
-                    home_team_id=g.home_team_id,
-                    home_team_pts=g.home_team_score,
-                    home_team_outcome=g.home_team_outcome,
-                    away_team_id=g.away_team_id,
-                    away_team_pts=g.away_team_score,
-                    away_team_outcome=g.away_team_outcome,
-                ))
-
-    for i, season_dto in enumerate(sorted(extraction[SeasonDto], key=lambda s: s.first_week_date)):
+
+def iter_game_dtos(season: SeasonParse) -> Generator[GameDto, None, None]:
+    for game_day in season.game_days:
+        for g in game_day.games:
+            yield GameDto(
+                id=g.id,
+                scheduled_time=g.starts_at,
+                season_id=season.season_id,
+                season_stage=g.season_stage,
+                home_team_id=g.home_team_id,
+                home_team_pts=g.home_team_score,
+                home_team_outcome=g.home_team_outcome,
+                away_team_id=g.away_team_id,
+                away_team_pts=g.away_team_score,
+                away_team_outcome=g.away_team_outcome,
+            )
+
+
+def assign_sequence_numbers(season_dtos: List[SeasonDto]):
+    for i, season_dto in enumerate(sorted(season_dtos, key=lambda s: s.first_week_date)):
         season_dto.sequence_number = i + 1
 
+
+def iter_extraction(
+    input_dir: Path, jobs: int = 1, html_parser: str = None, cache: ParseCache = None,
+    stats: ExtractionStats = None,
+) -> Generator[DtoMixin, None, None]:
+    """
+    Streaming version of create_extraction -- yields DTOs as soon as they are extracted.
+
+    Each season is released as soon as its DTOs have been yielded so memory use does not grow
+    with the number of seasons in input_dir. The only DTOs held back until the end are SeasonDtos
+    because their sequence numbers can only be worked out once all seasons are known.
+
+    Pass an enabled ExtractionStats as stats to collect timings and counters of the extraction.
+    """
+
+    env = create_env(load_score_overrides(input_dir), html_parser=html_parser, cache=cache, stats=stats)
+
+    yield from iter_franchises(input_dir)
+    yield from iter_teams(input_dir)
+    yield from iter_season_dtos(parse_seasons(input_dir=input_dir, env=env, jobs=jobs), env=env)
+
+
+def iter_season_dtos(seasons: Iterable[SeasonParse], env: UnicornerEnv) -> Generator[DtoMixin, None, None]:
+    """
+    GameDtos of each season as soon as it is parsed, followed by SeasonDtos of all seasons.
+    """
+
+    season: SeasonParse
+
+    season_dtos: List[SeasonDto] = []
+
+    for season in seasons:
+        with env.stats.timer("build_dtos"):
+            season_dtos.append(create_season_dto(season))
+            game_dtos = list(iter_game_dtos(season))
+        yield from game_dtos
+
+    assign_sequence_numbers(season_dtos)
+
+    yield from season_dtos
+
+
+class Extraction(collections.defaultdict):
+    """
+    DTOs grouped by DTO class, as returned by create_extraction.
+    Timings and counters of the extraction are available in stats.
+    """
+
+    def __init__(self, stats: ExtractionStats = None):
+        super().__init__(list)
+        self.stats = stats if stats is not None else ExtractionStats(enabled=False)
+
+
+def create_extraction(
+    input_dir: Path, jobs: int = 1, html_parser: str = None, cache: ParseCache = None, profile: bool = False,
+) -> Extraction:
+    """
+    This expects the following files to be present in input_dir:
+        franchises.csv
+        franchise_seasons.csv
+        score_overrides.csv
+        season-SEASONID-fixtures.html
+        season-SEASONID-standings.html
+
+    The input_dir can contain fixtures and standings for any number of seasons as long as SEASONID in the file names
+    match the season id. Instead of a directory, input_dir can be a .zip or .tar.gz bundle of the same files.
+
+    Files season-SEASONID-fixtures.html and season-SEASONID-standings.html can be obtained by navigating in browser
+    to your league's fixtures/standings page and saving the HTML file following the naming convention.
+
+    Pass jobs greater than 1 to parse seasons in parallel worker processes.
+    Pass html_parser="lxml" to parse pages with lxml instead of the default pure-Python html.parser.
+    Pass a ParseCache as cache to reuse seasons parsed in previous runs.
+    Pass profile=True to collect timings and counters in stats of the returned extraction.
+    """
+
+    extraction = Extraction(stats=ExtractionStats(enabled=profile))
+
+    for dto in iter_extraction(
+        input_dir=input_dir, jobs=jobs, html_parser=html_parser, cache=cache, stats=extraction.stats,
+    ):
+        extraction[type(dto)].append(dto)
+
     return extraction
 
 
-def write_extraction(extraction: Dict[Type[DtoMixin], List[DtoMixin]], output_dir: Path):
+def get_output_path(output_dir: Path, dto_cls: Type[DtoMixin]) -> Path:
+    return output_dir / f"{dto_cls.get_export_name()}.csv"
+
+
+def write_extraction(
+    extraction: Union[Dict[Type[DtoMixin], List[DtoMixin]], Iterable[DtoMixin]], output_dir: Path,
+    stats: ExtractionStats = None,
+):
+    """
+    Write DTOs to one gm*s.csv file per DTO class.
+
+    extraction can be either a dictionary as returned by create_extraction or any iterable of DTOs,
+    for example iter_extraction, in which case rows are appended to files as DTOs arrive.
+    """
     assert output_dir.exists()
 
-    for dto_cls, dtos in extraction.items():
-        output_path = output_dir / f"gm{dto_cls.__name__.lower()[:-3]}s.csv"
-        with output_path.open("w") as f:
-            csv_writer = csv.DictWriter(f, fieldnames=dto_cls.get_field_names(), quoting=csv.QUOTE_ALL)
-            csv_writer.writeheader()
-            csv_writer.writerows(dto.to_dict() for dto in dtos)
-        log.info(f"{len(dtos)} {dto_cls.__name__}s written to {output_path}")
+    if stats is None:
+        stats = getattr(extraction, "stats", None) or ExtractionStats(enabled=False)
+    perf_counter = time.perf_counter if stats.enabled else None
+
+    if isinstance(extraction, dict):
+        extraction = itertools.chain.from_iterable(extraction.values())
+
+    with contextlib.ExitStack() as stack:
+        # DTO class -> (write row function, row getter)
+        writers: Dict[Type[DtoMixin], Tuple[Callable, Callable]] = {}
+        output_paths: Dict[Type[DtoMixin], Path] = {}
+        counts: Dict[Type[DtoMixin], int] = collections.Counter()
+
+        for dto in extraction:
+            # Only time the writing itself, pulling DTOs from a streaming extraction includes parsing.
+            started = perf_counter() if perf_counter else None
+            dto_cls = type(dto)
+            if dto_cls not in writers:
+                output_paths[dto_cls] = get_output_path(output_dir, dto_cls)
+                f = stack.enter_context(output_paths[dto_cls].open("w"))
+                csv_writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+                csv_writer.writerow(dto_cls.get_field_names())
+                writers[dto_cls] = (csv_writer.writerow, dto_cls.get_row_getter())
+            writerow, get_row = writers[dto_cls]
+            writerow(get_row(dto))
+            counts[dto_cls] += 1
+            if perf_counter:
+                stats.add_time("write_output", perf_counter() - started)
+
+    for dto_cls, output_path in output_paths.items():
+        log.info(f"{counts[dto_cls]} {dto_cls.__name__}s written to {output_path}")
+
+
+def _parse_csv_date(value: str) -> dt.date:
+    # Week dates of seasons are written as datetimes at midnight, they are read back as they were written
+    return dt.datetime.fromisoformat(value) if len(value) > 10 else dt.date.fromisoformat(value)
+
+
+# Type of DTO field -> function which turns its CSV value back into a value of the type
+_CSV_VALUE_PARSERS = {
+    int: int,
+    dt.date: _parse_csv_date,
+    dt.datetime: dt.datetime.fromisoformat,
+}
+
+
+def read_extraction(output_dir: Path) -> Extraction:
+    """
+    Read back gm*s.csv files written by write_extraction. Values are converted to the types of
+    the DTO fields and empty values become None. Files that don't exist are left out.
+    """
+    extraction = Extraction()
+    for dto_cls in (FranchiseDto, SeasonDto, TeamDto, GameDto):
+        path = get_output_path(output_dir, dto_cls)
+        if not path.exists():
+            continue
+        # Fields which aren't init arguments, like TeamDto.id, are derived from the others
+        parsers = {f.name: _CSV_VALUE_PARSERS.get(f.type, str) for f in dataclasses.fields(dto_cls) if f.init}
+        with path.open() as f:
+            for row in csv.DictReader(f):
+                extraction[dto_cls].append(dto_cls(**{
+                    name: parse(row[name]) if row.get(name) else None for name, parse in parsers.items()
+                }))
+    return extraction
+
+
+def to_csv_row(dto: DtoMixin) -> Dict[str, str]:
+    """
+    Row of dto as write_extraction writes it, with the same formatting as csv.writer applies,
+    so that new rows can be compared with rows read back from CSV files.
+    """
+    return {k: "" if v is None else str(v) for k, v in dto.to_dict().items()}
+
+
+def _read_csv_rows(path: Path) -> List[Dict[str, str]]:
+    with path.open() as f:
+        return list(csv.DictReader(f))
+
+
+def _write_csv_rows(path: Path, dto_cls: Type[DtoMixin], rows: List[Dict[str, str]]) -> bool:
+    """
+    Write rows to path unless the file already has exactly this content.
+    Returns True if the file was written.
+    """
+    buffer = io.StringIO()
+    csv_writer = csv.DictWriter(buffer, fieldnames=dto_cls.get_field_names(), quoting=csv.QUOTE_ALL)
+    csv_writer.writeheader()
+    csv_writer.writerows(rows)
+    content = buffer.getvalue()
+
+    if path.exists() and path.read_text() == content:
+        log.info(f"{path} is unchanged")
+        return False
+
+    path.write_text(content)
+    log.info(f"{len(rows)} {dto_cls.__name__}s written to {path}")
+    return True
+
+
+def check_season_ids(
+    season_pages: Dict[int, Dict[str, Path]], seasons: Iterable[SeasonParse],
+) -> Generator[SeasonParse, None, None]:
+    """
+    Seasons parsed from season_pages, in the same order, after checking that each is the season its
+    file names say it is. The manifest records games under the season ids of file names, so a page
+    saved under the wrong name would leave its games unaccounted for. Raises ValueError if not.
+    """
+    for season_id, season in zip(season_pages, seasons):
+        if season.season_id != season_id:
+            page_path = next(iter(season_pages[season_id].values()))
+            raise ValueError(f"{page_path} is a page of season {season.season_id}, not of season {season_id}")
+        yield season
+
+
+def update_extraction(
+    input_dir: Path, output_dir: Path, previous_manifest: Dict,
+    jobs: int = 1, html_parser: str = None, cache: ParseCache = None, stats: ExtractionStats = None,
+) -> Dict:
+    """
+    Re-extract only the seasons whose pages or score overrides have changed since previous_manifest
+    was written and splice their rows into the existing gm*s.csv files in output_dir.
+    Output files whose content would not change are not rewritten.
+
+    Returns the new manifest.
+    """
+    season_pages = group_season_pages(input_dir)
+    score_overrides = load_score_overrides(input_dir)
+    manifest = create_manifest(input_dir, season_pages, previous=previous_manifest)
+
+    for name, dto_cls, iter_dtos in (
+        ("franchises.csv", FranchiseDto, iter_franchises),
+        ("franchise_seasons.csv", TeamDto, iter_teams),
+    ):
+        if not same_content(manifest["csv_inputs"].get(name), previous_manifest["csv_inputs"].get(name)):
+            _write_csv_rows(get_output_path(output_dir, dto_cls), dto_cls, [to_csv_row(d) for d in iter_dtos(input_dir)])
+
+    changed_pages = {}
+    for season_id, pages in season_pages.items():
+        if is_season_changed(manifest, previous_manifest, season_id, score_overrides):
+            changed_pages[season_id] = pages
+        else:
+            manifest["seasons"][str(season_id)] = dict(
+                previous_manifest["seasons"][str(season_id)],
+                pages=manifest["seasons"][str(season_id)]["pages"],
+            )
+
+    removed_season_ids = set(previous_manifest["seasons"]) - set(manifest["seasons"])
+
+    log.info(
+        f"{len(changed_pages)} changed, {len(removed_season_ids)} removed "
+        f"and {len(season_pages) - len(changed_pages)} unchanged seasons"
+    )
+
+    if not changed_pages and not removed_season_ids:
+        return manifest
+
+    env = create_env(score_overrides, html_parser=html_parser, cache=cache, stats=stats)
+
+    new_season_rows: Dict[str, Dict[str, str]] = {}
+    new_game_rows: Dict[str, List[Dict[str, str]]] = {}
+    for season in check_season_ids(changed_pages, parse_season_pages(changed_pages, env=env, jobs=jobs)):
+        with env.stats.timer("build_dtos"):
+            game_dtos = list(iter_game_dtos(season))
+            new_season_rows[str(season.season_id)] = to_csv_row(create_season_dto(season))
+            new_game_rows[str(season.season_id)] = [to_csv_row(g) for g in game_dtos]
+        record_season(manifest, season.season_id, (g.id for g in game_dtos), score_overrides)
+
+    existing_game_rows: Dict[str, List[Dict[str, str]]] = collections.defaultdict(list)
+    for row in _read_csv_rows(get_output_path(output_dir, GameDto)):
+        existing_game_rows[row["season_id"]].append(row)
+
+    existing_season_rows = {row["id"]: row for row in _read_csv_rows(get_output_path(output_dir, SeasonDto))}
+
+    # Rows are written in the same order as a full extraction would write them.
+    game_rows = []
+    season_rows = []
+    for season_id in season_pages:
+        if season_id in changed_pages:
+            game_rows.extend(new_game_rows[str(season_id)])
+            season_rows.append(new_season_rows[str(season_id)])
+        else:
+            game_rows.extend(existing_game_rows[str(season_id)])
+            season_rows.append(existing_season_rows[str(season_id)])
+
+    # Adding or removing a season can shift sequence numbers of all seasons that started later.
+    for i, season_row in enumerate(sorted(season_rows, key=lambda s: s["first_week_date"])):
+        season_row["sequence_number"] = str(i + 1)
+
+    with env.stats.timer("write_output"):
+        _write_csv_rows(get_output_path(output_dir, GameDto), GameDto, game_rows)
+        _write_csv_rows(get_output_path(output_dir, SeasonDto), SeasonDto, season_rows)
+
+    return manifest
+
+
+def extract_all(
+    input_dir: Path, output_dir: Path, jobs: int = 1, html_parser: str = None, cache: ParseCache = None,
+    incremental: bool = False, stats: ExtractionStats = None,
+):
+    """
+    Extract everything from input_dir into gm*s.csv files in output_dir and record which
+    input files produced which rows in a manifest next to them.
+
+    With incremental=True and a manifest from a previous run present, only seasons whose
+    pages or score overrides have changed are extracted, see update_extraction.
+
+    Pass an enabled ExtractionStats as stats to collect timings and counters of the extraction.
+
+    A bundle of pages as input_dir is always extracted in full and gets no manifest,
+    the manifest and incremental extraction rely on fingerprints of files in a directory.
+    """
+    if is_bundle(input_dir):
+        if incremental:
+            log.warning(f"{input_dir} is a bundle, extracting everything")
+        write_extraction(
+            extraction=iter_extraction(input_dir=input_dir, jobs=jobs, html_parser=html_parser, cache=cache, stats=stats),
+            output_dir=output_dir,
+            stats=stats,
+        )
+        return
+
+    previous_manifest = load_manifest(output_dir) if incremental else None
+    if previous_manifest is not None and all(
+        get_output_path(output_dir, dto_cls).exists() for dto_cls in (SeasonDto, GameDto)
+    ):
+        manifest = update_extraction(
+            input_dir=input_dir, output_dir=output_dir, previous_manifest=previous_manifest,
+            jobs=jobs, html_parser=html_parser, cache=cache, stats=stats,
+        )
+        save_manifest(manifest, output_dir)
+        return
+
+    season_pages = group_season_pages(input_dir)
+    score_overrides = load_score_overrides(input_dir)
+    manifest = create_manifest(input_dir, season_pages)
+    game_ids: Dict[int, List[int]] = collections.defaultdict(list)
+
+    def record_game_ids(dtos: Iterable[DtoMixin]) -> Generator[DtoMixin, None, None]:
+        for dto in dtos:
+            if isinstance(dto, GameDto):
+                game_ids[dto.season_id].append(dto.id)
+            yield dto
 
+    # Same as iter_extraction, with seasons checked against the ids the manifest records them under
+    env = create_env(score_overrides, html_parser=html_parser, cache=cache, stats=stats)
+    seasons = check_season_ids(season_pages, parse_season_pages(season_pages, env=env, jobs=jobs))
+    write_extraction(
+        extraction=record_game_ids(itertools.chain(
+            iter_franchises(input_dir), iter_teams(input_dir), iter_season_dtos(seasons, env=env),
+        )),
+        output_dir=output_dir,
+        stats=stats,
+    )
 
-def extract_all(input_dir: Path, output_dir: Path):
-    extraction = create_extraction(input_dir=input_dir)
-    write_extraction(extraction=extraction, output_dir=output_dir)
+    for season_id in season_pages:
+        record_season(manifest, season_id, game_ids[season_id], score_overrides)
+    save_manifest(manifest, output_dir)
@@ -0,0 +1,176 @@
+"""
+Download GM standings and fixtures pages into the season-SEASONID-standings.html and
+season-SEASONID-fixtures.html files that extraction.parse_seasons reads.
+
+ETag and Last-Modified headers of downloaded pages are kept in a state file next to the pages
+so that later runs revalidate pages with conditional requests and GM only sends pages which
+have changed. Pages whose content has not changed are not rewritten so their mtimes, which
+incremental extraction looks at, are left alone.
+"""
+import dataclasses
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .env import get_logger
+
+log = get_logger(__name__)
+
+FETCH_STATE_NAME = "gmfetch.json"
+
+# Page name -> GM page
+PAGES = {
+    "standings": "Standings.aspx",
+    "fixtures": "Fixtures.aspx",
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclasses.dataclass
+class SeasonRef:
+    """
+    Ids that GM needs to find a season's pages.
+    """
+
+    season_id: int
+    league_id: int
+    division_id: int
+
+    @classmethod
+    def from_str(cls, value: str) -> "SeasonRef":
+        """
+        Parses SEASON_ID:LEAGUE_ID:DIVISION_ID
+        """
+        season_id, league_id, division_id = (int(part) for part in value.split(":"))
+        return cls(season_id=season_id, league_id=league_id, division_id=division_id)
+
+
+@dataclasses.dataclass
+class FetchResult:
+    season_id: int
+    page: str
+    path: Path
+    # "downloaded", "not_modified" (304 response), "unchanged" (same content downloaded again) or "failed"
+    status: str
+    error: Optional[str] = None
+
+
+def get_page_path(output_dir: Path, season_id: int, page: str) -> Path:
+    return output_dir / f"season-{season_id}-{page}.html"
+
+
+def get_page_url(base_url: str, season: SeasonRef, page: str) -> str:
+    return (
+        f"{base_url.rstrip('/')}/{PAGES[page]}?VenueId=0&LeagueId={season.league_id}"
+        f"&SeasonId={season.season_id}&DivisionId={season.division_id}"
+    )
+
+
+def create_session(pool_size: int = 4, retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """
+    Session with a connection pool of pool_size connections which retries failed requests
+    and responses with RETRY_STATUSES up to retries times with exponential backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def load_fetch_state(output_dir: Path) -> Dict[str, Dict]:
+    path = output_dir / FETCH_STATE_NAME
+    if not path.exists():
+        return {}
+    with path.open() as f:
+        return json.load(f)
+
+
+def save_fetch_state(state: Dict[str, Dict], output_dir: Path):
+    with (output_dir / FETCH_STATE_NAME).open("w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+def fetch_page(
+    session: requests.Session, url: str, path: Path, validators: Dict = None, timeout: float = 30,
+) -> Tuple[str, Dict]:
+    """
+    Download url to path unless the server says that it has not changed since validators
+    (ETag and Last-Modified of the previous download) were recorded.
+
+    Returns status of the page, see FetchResult, and validators to use next time.
+    """
+    headers = {}
+    if validators and validators.get("url") == url and path.exists():
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return "not_modified", validators
+    response.raise_for_status()
+
+    new_validators = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+    content = response.content
+    if path.exists() and path.read_bytes() == content:
+        return "unchanged", new_validators
+
+    # Write to a temporary file first so that a reader never sees a partial page.
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+    return "downloaded", new_validators
+
+
+def fetch_seasons(
+    seasons: Iterable[SeasonRef], output_dir: Path, base_url: str, jobs: int = 4,
+    session: requests.Session = None, timeout: float = 30,
+) -> List[FetchResult]:
+    """
+    Download standings and fixtures pages of seasons to output_dir using jobs threads.
+
+    A page which fails to download does not stop the others, check status of the returned results.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    session = session or create_session(pool_size=jobs)
+    state = load_fetch_state(output_dir)
+
+    def fetch(season: SeasonRef, page: str) -> FetchResult:
+        path = get_page_path(output_dir, season.season_id, page)
+        url = get_page_url(base_url, season, page)
+        try:
+            status, validators = fetch_page(session, url, path, validators=state.get(path.name), timeout=timeout)
+        except requests.RequestException as e:
+            log.error(f"Failed to fetch {url}: {e}")
+            return FetchResult(season_id=season.season_id, page=page, path=path, status="failed", error=str(e))
+        # Each page has its own key so threads never write the same one
+        state[path.name] = validators
+        log.info(f"{path.name}: {status}")
+        return FetchResult(season_id=season.season_id, page=page, path=path, status=status)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(fetch, season, page) for season in seasons for page in PAGES]
+        results = [future.result() for future in futures]
+
+    save_fetch_state(state, output_dir)
+    return results
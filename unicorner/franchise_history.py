@@ -0,0 +1,188 @@
+"""
+Head-to-head records and career totals of franchises across all seasons.
+
+Teams are per season and franchises are what links them across seasons, see franchise_seasons.csv.
+Games are mapped from their teams to franchises once, into arrays with one row per game and
+franchise playing it, and every query is then a few bincounts over those arrays.
+
+Forfeits count as won and lost games here, like GameOutcomes.was_won and was_lost say.
+Games without a score and games of teams that have no franchise are left out.
+
+Requires NumPy, install unicorner[numpy].
+"""
+from operator import attrgetter
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from .dtos import FranchiseDto, GameDto, TeamDto
+from .env import get_logger
+from .values import GameOutcomes
+
+log = get_logger(__name__)
+
+HEAD_TO_HEAD_COLUMNS = ("played", "won", "drawn", "lost", "score_difference")
+
+CAREER_COLUMNS = (
+    "seasons",
+    "played",
+    "won",
+    "drawn",
+    "lost",
+    "forfeit_for",
+    "forfeit_against",
+    "score_for",
+    "score_against",
+    "score_difference",
+)
+
+_game_columns = attrgetter(
+    "season_id", "season_stage", "home_team_id", "home_team_pts", "away_team_id", "away_team_pts",
+    "home_team_outcome",
+)
+
+# Outcome of the home team -> outcome codes of home and away team
+_WON, _DRAWN, _LOST, _FORFEIT_FOR, _FORFEIT_AGAINST = range(5)
+_OUTCOME_CODES = {
+    GameOutcomes.won: (_WON, _LOST),
+    GameOutcomes.lost: (_LOST, _WON),
+    GameOutcomes.drawn: (_DRAWN, _DRAWN),
+    GameOutcomes.forfeit_for: (_FORFEIT_FOR, _FORFEIT_AGAINST),
+    GameOutcomes.forfeit_against: (_FORFEIT_AGAINST, _FORFEIT_FOR),
+}
+
+
+class FranchiseTable:
+    """
+    Values of columns for each franchise, or for each pair of franchises in a head-to-head table,
+    in arrays indexed by position of franchise ids in franchise_ids.
+    """
+
+    def __init__(self, franchise_ids: List[int], columns: Dict[str, np.ndarray]):
+        self.franchise_ids = franchise_ids
+        self.columns = columns
+        self._index = {franchise_id: i for i, franchise_id in enumerate(franchise_ids)}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def get(self, franchise_id: int, opponent_id: int = None) -> Dict[str, int]:
+        """
+        Totals of a franchise, or of a franchise against opponent in a head-to-head table.
+        """
+        key = self._index[franchise_id]
+        if opponent_id is not None:
+            key = key, self._index[opponent_id]
+        return {column: int(values[key]) for column, values in self.columns.items()}
+
+
+class FranchiseHistory:
+    """
+    Games of franchises, which head_to_head and career aggregate for all games
+    or only for games of the given season stages.
+    """
+
+    def __init__(self, games: Iterable[GameDto], teams: Iterable[TeamDto], franchises: Iterable[FranchiseDto] = ()):
+        franchise_of_team = {team.id: int(team.franchise_id) for team in teams if team.franchise_id}
+        self.franchise_names: Dict[int, str] = {int(f.id): f.name for f in franchises}
+        self.franchise_ids: List[int] = sorted(set(franchise_of_team.values()) | self.franchise_names.keys())
+        franchise_index = {franchise_id: i for i, franchise_id in enumerate(self.franchise_ids)}
+        team_index = {team_id: franchise_index[franchise_id] for team_id, franchise_id in franchise_of_team.items()}
+
+        seasons, stages, franchise_rows, opponents, scores_for, scores_against, outcomes = [], [], [], [], [], [], []
+        skipped = 0
+        for season_id, stage, home_id, home_pts, away_id, away_pts, home_outcome in map(_game_columns, games):
+            if home_pts is None or away_pts is None:
+                continue
+            home = team_index.get(home_id)
+            away = team_index.get(away_id)
+            if home is None or away is None:
+                skipped += 1
+                continue
+            home_code, away_code = _OUTCOME_CODES[home_outcome]
+            seasons += (season_id, season_id)
+            stages += (stage, stage)
+            franchise_rows += (home, away)
+            opponents += (away, home)
+            scores_for += (home_pts, away_pts)
+            scores_against += (away_pts, home_pts)
+            outcomes += (home_code, away_code)
+
+        if skipped:
+            log.warning(f"Left out {skipped} games of teams without a franchise")
+
+        # One row per game and franchise playing it
+        self.season_ids = np.array(seasons, dtype=np.int64)
+        self.franchises = np.array(franchise_rows, dtype=np.int64)
+        self.opponents = np.array(opponents, dtype=np.int64)
+        self.scores_for = np.array(scores_for, dtype=np.int64)
+        self.scores_against = np.array(scores_against, dtype=np.int64)
+        self.outcomes = np.array(outcomes, dtype=np.int8)
+
+        # Stages are few so they are kept as codes into stage_names
+        self.stage_names, stage_codes = np.unique(np.array(stages, dtype=object).astype(str), return_inverse=True)
+        self.stages = stage_codes.astype(np.int8)
+
+    @classmethod
+    def from_extraction(cls, extraction) -> "FranchiseHistory":
+        return cls(games=extraction[GameDto], teams=extraction[TeamDto], franchises=extraction[FranchiseDto])
+
+    def _rows(self, stages: Iterable[str] = None) -> np.ndarray:
+        """
+        Mask of rows of games of stages, or of all rows if stages is None.
+        """
+        if stages is None:
+            return np.ones(len(self.franchises), dtype=bool)
+        codes = np.flatnonzero(np.isin(self.stage_names, list(stages)))
+        return np.isin(self.stages, codes)
+
+    def head_to_head(self, stages: Iterable[str] = None) -> FranchiseTable:
+        """
+        Square tables of each column in HEAD_TO_HEAD_COLUMNS where row i and column j is the total of
+        franchise_ids[i] in games against franchise_ids[j].
+        """
+        rows = self._rows(stages)
+        n = len(self.franchise_ids)
+        pairs = self.franchises[rows] * n + self.opponents[rows]
+        outcomes = self.outcomes[rows]
+
+        def total(weights=None) -> np.ndarray:
+            return np.bincount(pairs, weights=weights, minlength=n * n).astype(np.int64).reshape(n, n)
+
+        columns = {
+            "played": total(),
+            "won": total((outcomes == _WON) | (outcomes == _FORFEIT_FOR)),
+            "drawn": total(outcomes == _DRAWN),
+            "lost": total((outcomes == _LOST) | (outcomes == _FORFEIT_AGAINST)),
+            "score_difference": total(self.scores_for[rows] - self.scores_against[rows]),
+        }
+        return FranchiseTable(self.franchise_ids, columns)
+
+    def career(self, stages: Iterable[str] = None) -> FranchiseTable:
+        """
+        Totals of each franchise of each column in CAREER_COLUMNS.
+        """
+        rows = self._rows(stages)
+        n = len(self.franchise_ids)
+        franchises = self.franchises[rows]
+        outcomes = self.outcomes[rows]
+
+        def total(weights=None) -> np.ndarray:
+            return np.bincount(franchises, weights=weights, minlength=n).astype(np.int64)
+
+        # Each season of a franchise once, franchise and season packed in one key as unique is fastest in 1-d
+        franchise_seasons = np.unique((franchises << 32) | self.season_ids[rows]) >> 32
+
+        columns = {
+            "seasons": np.bincount(franchise_seasons, minlength=n),
+            "played": total(),
+            "won": total((outcomes == _WON) | (outcomes == _FORFEIT_FOR)),
+            "drawn": total(outcomes == _DRAWN),
+            "lost": total((outcomes == _LOST) | (outcomes == _FORFEIT_AGAINST)),
+            "forfeit_for": total(outcomes == _FORFEIT_FOR),
+            "forfeit_against": total(outcomes == _FORFEIT_AGAINST),
+            "score_for": total(self.scores_for[rows]),
+            "score_against": total(self.scores_against[rows]),
+        }
+        columns["score_difference"] = columns["score_for"] - columns["score_against"]
+        return FranchiseTable(self.franchise_ids, {column: columns[column] for column in CAREER_COLUMNS})
@@ -0,0 +1,129 @@
+"""
+Manifest of an extraction, written next to the gm*s.csv files.
+
+It records fingerprints (mtime, size and SHA-256) of the input files that the extraction was
+produced from and which games each season produced, so that a later run can tell which
+seasons have changed and re-extract only those.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from . import __version__
+from .env import get_logger
+from .parse_cache import score_overrides_digest
+
+log = get_logger(__name__)
+
+MANIFEST_NAME = "gmmanifest.json"
+
+CSV_INPUTS = ("franchises.csv", "franchise_seasons.csv", "score_overrides.csv")
+
+
+def fingerprint_file(path: Path, previous: Dict = None) -> Dict:
+    """
+    Returns a fingerprint of the file at path.
+    If the file's mtime and size match the previous fingerprint, its hash is not recomputed.
+    """
+    stat = path.stat()
+    if previous is not None and (previous["name"], previous["mtime_ns"], previous["size"]) == (
+        path.name, stat.st_mtime_ns, stat.st_size,
+    ):
+        return previous
+    return {
+        "name": path.name,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(path.read_bytes()).hexdigest(),
+    }
+
+
+def same_content(a: Optional[Dict], b: Optional[Dict]) -> bool:
+    if a is None or b is None:
+        return a is b
+    return (a["name"], a["sha256"]) == (b["name"], b["sha256"])
+
+
+def create_manifest(input_dir: Path, season_pages: Dict[int, Dict[str, Path]], previous: Dict = None) -> Dict:
+    """
+    Create a manifest with fingerprints of all input files.
+    Games of seasons are filled in by record_season.
+    """
+    previous = previous or {"csv_inputs": {}, "seasons": {}}
+
+    csv_inputs = {}
+    for name in CSV_INPUTS:
+        path = input_dir / name
+        if path.exists():
+            csv_inputs[name] = fingerprint_file(path, previous=previous["csv_inputs"].get(name))
+
+    seasons = {}
+    for season_id, pages in season_pages.items():
+        previous_pages = previous["seasons"].get(str(season_id), {}).get("pages", {})
+        seasons[str(season_id)] = {
+            "pages": {
+                page: fingerprint_file(path, previous=previous_pages.get(page))
+                for page, path in pages.items()
+            },
+            "game_ids": [],
+            "score_overrides": None,
+        }
+
+    return {
+        "version": __version__,
+        "csv_inputs": csv_inputs,
+        "seasons": seasons,
+    }
+
+
+def record_season(manifest: Dict, season_id: int, game_ids: Iterable[int], score_overrides: Dict[int, Dict]):
+    entry = manifest["seasons"][str(season_id)]
+    entry["game_ids"] = list(game_ids)
+    entry["score_overrides"] = score_overrides_digest(score_overrides, entry["game_ids"])
+
+
+def is_season_changed(manifest: Dict, previous: Dict, season_id: int, score_overrides: Dict[int, Dict]) -> bool:
+    """
+    A season has changed if any of its pages have different content or if the score overrides
+    that apply to its games have changed since the previous manifest was written.
+    """
+    entry = manifest["seasons"][str(season_id)]
+    previous_entry = previous["seasons"].get(str(season_id))
+    if previous_entry is None:
+        return True
+
+    if set(entry["pages"]) != set(previous_entry["pages"]):
+        return True
+
+    for page, fingerprint in entry["pages"].items():
+        if not same_content(fingerprint, previous_entry["pages"][page]):
+            return True
+
+    return previous_entry["score_overrides"] != score_overrides_digest(score_overrides, previous_entry["game_ids"])
+
+
+def load_manifest(output_dir: Path) -> Optional[Dict]:
+    """
+    Returns the manifest in output_dir or None if there isn't one or it was written by
+    a different version of the library.
+    """
+    path = output_dir / MANIFEST_NAME
+    if not path.exists():
+        return None
+
+    with path.open() as f:
+        manifest = json.load(f)
+
+    if manifest.get("version") != __version__:
+        log.info(f"Ignoring {path} written by unicorner {manifest.get('version')}")
+        return None
+
+    return manifest
+
+
+def save_manifest(manifest: Dict, output_dir: Path):
+    path = output_dir / MANIFEST_NAME
+    with path.open("w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    log.info(f"Manifest written to {path}")
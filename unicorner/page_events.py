@@ -0,0 +1,308 @@
+"""
+Event-driven reader of GM standings and fixtures pages built on html.parser.HTMLParser.
+
+Unlike BeautifulSoup it builds no tree. It follows only the elements that SeasonParse reads --
+the page title, the link in the first heading, rows of the STTable and FTable tables and
+the cells in them -- and emits one event per row as soon as the row is closed, so memory
+use does not grow with the size of the page.
+
+Elements are matched the way SeasonParse matches them in a BeautifulSoup tree (first title,
+first link of the first h3, first cell of each class in a row and so on) so that both engines
+produce the same Teams, GameDays and Games, see SeasonParse.parse_standings_page.
+
+read_page_header reads just the title and the heading link, which is all there is to know
+about a season without looking at its tables.
+"""
+import html as html_lib
+import re
+from html.parser import HTMLParser
+from typing import Dict, Generator, List, Optional, Tuple
+
+# Events emitted by iter_page_events
+TITLE = 'title'  # text of the first <title>
+HEADING_LINK = 'heading_link'  # href of the first link in the first <h3>
+TEAM_ROW = 'team_row'  # list of PageCells of a STRow row of the first STTable
+WEEK = 'week'  # text of the first cell of the FHeader row of a FTable, marks a new week
+GAME_ROW = 'game_row'  # dictionary of the first PageCell of each class of a FRow row of a FTable
+
+# Elements which never have an end tag, html.parser does not call handle_endtag for them.
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr',
+])
+
+TEAM_ROW_REGEX = re.compile('STRow.*')
+
+TITLE_REGEX = re.compile(r'<title\b[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+HEADING_REGEX = re.compile(r'<h3\b[^>]*>(.*?)</h3\s*>', re.IGNORECASE | re.DOTALL)
+LINK_HREF_REGEX = re.compile(
+    r'<a\s[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE | re.DOTALL,
+)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class PageCell:
+    """
+    What SeasonParse needs to know about a table cell.
+
+    link_href and link_text are of the first link in the cell. fixture_id is the data-fixture-id of
+    the first <nobr> in the cell, has_score_div tells whether that <nobr> contains a <div> and
+    score_text is the text of the first <nobr> in that <div> which is where GM puts game scores.
+    """
+
+    __slots__ = ('classes', 'text', 'link_href', 'link_text', 'fixture_id', 'has_score_div', 'score_text')
+
+    def __init__(self, classes: Tuple[str, ...]):
+        self.classes = classes
+        self.text: str = None
+        self.link_href: Optional[str] = None
+        self.link_text: Optional[str] = None
+        self.fixture_id: Optional[str] = None
+        self.has_score_div = False
+        self.score_text: Optional[str] = None
+
+    def __repr__(self):
+        return '<PageCell {} {!r}>'.format(' '.join(self.classes), self.text)
+
+
+class _Capture:
+    """
+    Text collected while an element is open.
+    """
+
+    __slots__ = ('parts', 'on_close')
+
+    def __init__(self, on_close):
+        self.parts = []
+        self.on_close = on_close
+
+    def close(self):
+        self.on_close(''.join(self.parts).strip())
+
+
+class GmPageParser(HTMLParser):
+    """
+    Collects events in self.events as the page is fed, see iter_page_events.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.events: List[Tuple[str, object]] = []
+
+        # Open elements as [tag, callbacks to call when the element is closed]
+        self._stack: List[list] = []
+        self._captures: List[_Capture] = []
+
+        self._title_seen = False
+        self._heading_seen = False
+        self._heading_open = False
+        self._heading_link_seen = False
+        self._standings_table_seen = False
+
+        self._table: Optional[str] = None
+        self._row_kind: Optional[str] = None
+        self._row_cells: List[PageCell] = None
+        self._week_seen = False
+        self._cell: Optional[PageCell] = None
+        self._cell_link_open = False
+        self._cell_nobr_open = False
+        self._cell_div_open = False
+
+    def _on_close(self, callback):
+        self._stack[-1][1].append(callback)
+
+    def _capture(self, on_close):
+        capture = _Capture(on_close)
+        self._captures.append(capture)
+
+        def close():
+            self._captures.remove(capture)
+            capture.close()
+
+        self._on_close(close)
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self._stack.append([tag, []])
+
+        if tag == 'title':
+            if not self._title_seen:
+                self._title_seen = True
+                self._capture(lambda text: self.events.append((TITLE, text)))
+        elif tag == 'h3':
+            if not self._heading_seen:
+                self._heading_seen = self._heading_open = True
+                self._on_close(self._close_heading)
+        elif tag == 'a':
+            if self._heading_open and not self._heading_link_seen:
+                self._heading_link_seen = True
+                self.events.append((HEADING_LINK, dict(attrs).get('href')))
+            cell = self._cell
+            if cell is not None and cell.link_href is None and not self._cell_link_open:
+                cell.link_href = dict(attrs).get('href')
+                self._cell_link_open = True
+                self._capture(self._close_cell_link)
+        elif tag == 'table':
+            if self._table is None:
+                classes = _get_classes(attrs)
+                if 'FTable' in classes:
+                    self._open_table('FTable')
+                elif 'STTable' in classes and not self._standings_table_seen:
+                    self._standings_table_seen = True
+                    self._open_table('STTable')
+        elif tag == 'tr':
+            if self._table is not None and self._row_kind is None:
+                self._open_row(_get_classes(attrs))
+        elif tag == 'td':
+            if self._row_kind is not None and self._cell is None:
+                self._cell = PageCell(_get_classes(attrs))
+                self._capture(self._close_cell)
+        elif tag == 'nobr':
+            cell = self._cell
+            if cell is None:
+                pass
+            elif cell.fixture_id is None and not self._cell_nobr_open:
+                cell.fixture_id = dict(attrs).get('data-fixture-id')
+                self._cell_nobr_open = True
+                self._on_close(self._close_cell_nobr)
+            elif self._cell_div_open and cell.score_text is None:
+                cell.score_text = ''
+                self._capture(self._close_cell_score)
+        elif tag == 'div':
+            if self._cell_nobr_open and not self._cell.has_score_div:
+                self._cell.has_score_div = self._cell_div_open = True
+                self._on_close(self._close_cell_div)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        # Like BeautifulSoup, an end tag closes all elements opened after the matching start tag
+        # and an end tag with no matching start tag is ignored.
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > i:
+            self._pop()
+
+    def handle_data(self, data):
+        for capture in self._captures:
+            capture.parts.append(data)
+
+    def close(self):
+        super().close()
+        while self._stack:
+            self._pop()
+
+    def _pop(self):
+        _, callbacks = self._stack.pop()
+        for callback in reversed(callbacks):
+            callback()
+
+    def _close_heading(self):
+        self._heading_open = False
+
+    def _open_table(self, table: str):
+        self._table = table
+        self._week_seen = False
+        self._on_close(self._close_table)
+
+    def _close_table(self):
+        self._table = None
+
+    def _open_row(self, classes: Tuple[str, ...]):
+        if self._table == 'STTable':
+            if not any(TEAM_ROW_REGEX.search(c) for c in classes + (' '.join(classes),)):
+                return
+            self._row_kind = TEAM_ROW
+        elif 'FRow' in classes:
+            self._row_kind = GAME_ROW
+        elif 'FHeader' in classes and not self._week_seen:
+            self._week_seen = True
+            self._row_kind = WEEK
+        else:
+            return
+        self._row_cells = []
+        self._on_close(self._close_row)
+
+    def _close_row(self):
+        kind, cells = self._row_kind, self._row_cells
+        self._row_kind = self._row_cells = None
+
+        if kind == TEAM_ROW:
+            self.events.append((TEAM_ROW, cells))
+        elif kind == GAME_ROW:
+            cells_by_class: Dict[str, PageCell] = {}
+            for cell in cells:
+                for c in cell.classes:
+                    cells_by_class.setdefault(c, cell)
+            self.events.append((GAME_ROW, cells_by_class))
+        elif kind == WEEK and cells:
+            self.events.append((WEEK, cells[0].text))
+
+    def _close_cell(self, text: str):
+        self._cell.text = text
+        self._row_cells.append(self._cell)
+        self._cell = None
+        self._cell_link_open = self._cell_nobr_open = self._cell_div_open = False
+
+    def _close_cell_link(self, text: str):
+        self._cell_link_open = False
+        if self._cell is not None:
+            self._cell.link_text = text
+
+    def _close_cell_nobr(self):
+        self._cell_nobr_open = False
+
+    def _close_cell_div(self):
+        self._cell_div_open = False
+
+    def _close_cell_score(self, text: str):
+        if self._cell is not None:
+            self._cell.score_text = text
+
+
+def _get_classes(attrs) -> Tuple[str, ...]:
+    for name, value in attrs:
+        if name == 'class':
+            return tuple((value or '').split())
+    return ()
+
+
+def iter_page_events(html: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Generator[Tuple[str, object], None, None]:
+    """
+    Feed html to GmPageParser chunk by chunk and yield events of each chunk as (event, value) pairs.
+    """
+    parser = GmPageParser()
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        events, parser.events = parser.events, []
+        yield from events
+    parser.close()
+    yield from parser.events
+
+
+def read_page_header(html: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns text of the first <title> and href of the first link in the first <h3> of a page,
+    the same as TITLE and HEADING_LINK events would, without feeding the whole page to a parser.
+    """
+    title = None
+    title_match = TITLE_REGEX.search(html)
+    if title_match is not None:
+        title = html_lib.unescape(title_match.group(1)).strip()
+
+    heading_link = None
+    heading_match = HEADING_REGEX.search(html)
+    if heading_match is not None:
+        link_match = LINK_HREF_REGEX.search(heading_match.group(1))
+        if link_match is not None:
+            heading_link = html_lib.unescape(next(g for g in link_match.groups() if g is not None))
+
+    return title, heading_link
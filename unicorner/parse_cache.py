@@ -0,0 +1,210 @@
+"""
+On-disk cache of parsed seasons.
+
+Historical seasons never change so there is no point in parsing their pages on every run.
+Cache entries are keyed by the contents of the season's standings and fixtures pages, the library
+version, CACHE_FORMAT and the fields of Team and Game. Each entry also records a digest of the score
+overrides that applied to the season's games and is discarded if those overrides have changed since.
+Entries that can't be read are discarded too.
+"""
+import dataclasses
+import hashlib
+import os
+import pickle
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import __version__
+from .env import UnicornerEnv, get_logger
+from .season_page import Game, GameDay, SeasonParse, Team
+
+log = get_logger(__name__)
+
+# Bump whenever parsing produces different seasons from the same pages, so that entries
+# parsed by previous code are not used. Changes of fields of Team and Game are part of keys anyway.
+CACHE_FORMAT = 2
+
+_team_fields = [f.name for f in dataclasses.fields(Team)]
+_game_fields = [f.name for f in dataclasses.fields(Game)]
+
+
+def get_default_cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "unicorner"
+
+
+def score_overrides_digest(score_overrides: Dict[int, Dict], game_ids: Iterable[int]) -> str:
+    """
+    Digest of the score overrides that apply to the games with the given ids.
+    """
+    applicable = [score_overrides[game_id] for game_id in sorted(set(game_ids)) if game_id in score_overrides]
+    return hashlib.sha1(repr(applicable).encode()).hexdigest()
+
+
+def dump_season(season: SeasonParse) -> bytes:
+    state = (
+        season.season_id,
+        season.season_name,
+        season.division_id,
+        season.league_id,
+        [tuple(getattr(t, f) for f in _team_fields) for t in season.teams.values()] if season.teams else None,
+        [
+            (gd.date, gd.week_number, [tuple(getattr(g, f) for f in _game_fields) for g in gd.games])
+            for gd in season.game_days
+        ] if season.game_days is not None else None,
+    )
+    return zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_season(data: bytes, env: UnicornerEnv = None) -> SeasonParse:
+    season_id, season_name, division_id, league_id, teams, game_days = pickle.loads(zlib.decompress(data))
+
+    season = SeasonParse(env=env)
+    season.season_id = season_id
+    season.season_name = season_name
+    season.division_id = division_id
+    season.league_id = league_id
+
+    if teams is not None:
+        season.teams = {}
+        for values in teams:
+            team = Team(**dict(zip(_team_fields, values)))
+            season.teams[team.id] = team
+
+    if game_days is not None:
+        season.game_days = []
+        for date, week_number, games in game_days:
+            game_day = GameDay(date=date, week_number=week_number)
+            for values in games:
+                game_day.games.append(Game(*values))
+            season.add_game_day(game_day)
+
+    return season
+
+
+class ParseCache:
+    """
+    Directory of cached SeasonParse results.
+
+    Once the total size of the cache exceeds max_size bytes, the least recently used entries are evicted
+    until it is down to three quarters of max_size. The total is kept up to date as entries are stored
+    so that the directory is only scanned on the first store and on eviction. Each process keeps its own
+    total, so the cache can grow past max_size by what other processes have stored in the meantime.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = 64 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        # Total size of entries in bytes, None until the directory is first scanned
+        self._size: Optional[int] = None
+
+    def get_key(self, standings_html: str = None, fixtures_html: str = None) -> str:
+        h = hashlib.sha256()
+        h.update(f"{__version__}\0{CACHE_FORMAT}\0{','.join(_team_fields)}\0{','.join(_game_fields)}".encode())
+        for html in (standings_html, fixtures_html):
+            h.update(b"\0")
+            if html is not None:
+                h.update(html.encode())
+        return h.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.season"
+
+    def load(self, key: str, env: UnicornerEnv) -> Optional[SeasonParse]:
+        path = self._entry_path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            overrides_digest, season_data = pickle.loads(data)
+            season = load_season(season_data, env=env)
+        except Exception:
+            # Corrupt, or written by code whose classes no longer match
+            log.warning(f"Discarding unreadable parse cache entry {path}", exc_info=True)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            return None
+
+        if overrides_digest != score_overrides_digest(env.score_overrides, iter_game_ids(season)):
+            log.debug(f"Score overrides of season {season.season_id} have changed, discarding {path}")
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return season
+
+    def store(self, key: str, season: SeasonParse):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(key)
+        data = pickle.dumps(
+            (score_overrides_digest(season.env.score_overrides, iter_game_ids(season)), dump_season(season)),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._scan())
+        try:
+            # Size of the entry being replaced
+            self._size -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+
+        # Write to a temporary file first so that concurrent workers never read a partial entry.
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._size += len(data)
+
+        if self._size > self.max_size:
+            self.evict(target_size=self.max_size * 3 // 4)
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for path in self.cache_dir.glob("*.season"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self, target_size: int = None):
+        """
+        Evict the least recently used entries until the cache is no larger than target_size,
+        which defaults to max_size.
+        """
+        if target_size is None:
+            target_size = self.max_size
+
+        entries = self._scan()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= target_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            log.debug(f"Evicted {path} from parse cache")
+
+        self._size = total_size
+
+    def clear(self):
+        for path in self.cache_dir.glob("*.season"):
+            path.unlink()
+        self._size = 0
+
+
+def iter_game_ids(season: SeasonParse):
+    for game_day in season.game_days or ():
+        for game in game_day.games:
+            yield game.id
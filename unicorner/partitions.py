@@ -0,0 +1,167 @@
+"""
+Extraction partitioned by GM league and division.
+
+Season ids are grouped by the league and division in their standings page titles, which are read
+without parsing the tables. Pages of seasons are then read and parsed one partition after another,
+in one pool of worker processes when jobs is greater than 1, and each partition is written into its
+own directory of gm*s.csv files as soon as its seasons are parsed while the workers go on with the
+next partition's seasons. Pages in a bundle are read in one more pass over the bundle per partition,
+so that only pages of seasons being parsed are held in memory:
+
+    OUTPUT_DIR/league-LEAGUEID/division-DIVISIONID/gmgames.csv
+    ...
+    OUTPUT_DIR/gmpartitions.json
+
+A partition has the teams of its seasons, the franchises of those teams and the games
+of its seasons. Sequence numbers of seasons count the seasons of the partition only.
+gmpartitions.json lists the partitions with their directories, season ids and row counts
+so that consumers of one division can find its files without reading any others.
+"""
+import collections
+import contextlib
+import dataclasses
+import itertools
+import json
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, Tuple
+
+from .bundle import is_bundle, iter_bundle_season_pages
+from .dtos import DtoMixin, FranchiseDto, TeamDto
+from .env import UnicornerEnv, get_logger
+from .extraction import (
+    create_env, group_season_pages, iter_franchises, iter_season_dtos, iter_season_pages, iter_teams,
+    load_score_overrides, parse_season_pages, write_extraction,
+)
+from .parse_cache import ParseCache
+from .season_page import SeasonParse
+from .stats import ExtractionStats
+
+log = get_logger(__name__)
+
+PARTITION_INDEX_NAME = "gmpartitions.json"
+
+
+@dataclasses.dataclass
+class Partition:
+    league_id: int
+    division_id: int
+    # Directory of the partition's files relative to the output directory
+    path: str
+    season_ids: List[int]
+    # Export name of DTO class -> number of rows, for example {"gmgames": 120, ...}
+    counts: Dict[str, int] = dataclasses.field(default_factory=dict)
+
+
+def get_partition_path(league_id: int, division_id: int) -> str:
+    return f"league-{league_id}/division-{division_id}"
+
+
+def group_partitions(input_dir: Path) -> Dict[Tuple[int, int], List[int]]:
+    """
+    Ids of seasons of input_dir grouped by (league id, division id), in the order of iter_season_pages.
+    """
+    partitions: Dict[Tuple[int, int], List[int]] = {}
+    for season_id, pages in iter_season_pages(input_dir):
+        if "standings_path" not in pages:
+            log.warning(f"Season {season_id} has no standings page, skipping it")
+            continue
+        # Only the title is read here, tables are parsed lazily
+        season = SeasonParse()
+        season.parse_standings_page(html=pages["standings_path"].read_text())
+        partitions.setdefault((season.league_id, season.division_id), []).append(season_id)
+    return partitions
+
+
+def iter_partition_pages(
+    input_dir: Path, grouped: Iterable[Tuple[Tuple[int, int], List[int]]],
+) -> Generator[Dict[str, Path], None, None]:
+    """
+    Pages of seasons of grouped partitions, one partition after another, read only when they are consumed.
+    """
+    season_pages = None if is_bundle(input_dir) else group_season_pages(input_dir)
+    for _, season_ids in grouped:
+        if season_pages is None:
+            # Seasons come in the order of the bundle, which is the order group_partitions found them in
+            for _, pages in iter_bundle_season_pages(input_dir, season_ids=set(season_ids)):
+                yield pages
+        else:
+            for season_id in season_ids:
+                yield season_pages[season_id]
+
+
+def _count_rows(dtos: Iterable[DtoMixin], counts: Dict[str, int]) -> Generator[DtoMixin, None, None]:
+    for dto in dtos:
+        counts[type(dto).get_export_name()] += 1
+        yield dto
+
+
+def extract_partition(
+    partition: Partition, seasons: Iterable[SeasonParse], teams: List[TeamDto],
+    franchises: List[FranchiseDto], output_dir: Path, env: UnicornerEnv,
+) -> Partition:
+    """
+    Write parsed seasons of one partition into its directory under output_dir.
+    """
+    partition_dir = output_dir / partition.path
+    partition_dir.mkdir(parents=True, exist_ok=True)
+
+    def iter_partition_dtos():
+        yield from franchises
+        yield from teams
+        yield from iter_season_dtos(seasons, env=env)
+
+    counts = collections.Counter()
+    write_extraction(_count_rows(iter_partition_dtos(), counts), output_dir=partition_dir, stats=env.stats)
+    return dataclasses.replace(partition, counts=dict(counts))
+
+
+def extract_partitioned(
+    input_dir: Path, output_dir: Path, jobs: int = 1, html_parser: str = None, cache: ParseCache = None,
+    stats: ExtractionStats = None,
+) -> List[Partition]:
+    """
+    Extract input_dir into one directory per league and division under output_dir
+    and write the index of partitions. Returns the partitions.
+    """
+    env = create_env(load_score_overrides(input_dir), html_parser=html_parser, cache=cache, stats=stats)
+
+    teams_by_season: Dict[int, List[TeamDto]] = collections.defaultdict(list)
+    for team in iter_teams(input_dir):
+        teams_by_season[int(team.season_id)].append(team)
+    franchises = {int(f.id): f for f in iter_franchises(input_dir)}
+
+    grouped = sorted(group_partitions(input_dir).items())
+    log.info(f"Extracting {len(grouped)} partitions")
+
+    # Seasons of all partitions in one stream, so that all jobs are busy however seasons are partitioned.
+    # Seasons come back in the order their pages went in, each partition takes as many as it has.
+    seasons = parse_season_pages(iter_partition_pages(input_dir, grouped), env=env, jobs=jobs)
+
+    # Closing the generator shuts down its pool of workers
+    with contextlib.closing(seasons):
+        partitions = []
+        for (league_id, division_id), season_ids in grouped:
+            teams = [team for season_id in season_ids for team in teams_by_season[season_id]]
+            franchise_ids = {int(team.franchise_id) for team in teams if team.franchise_id}
+            partition = Partition(
+                league_id=league_id, division_id=division_id,
+                path=get_partition_path(league_id, division_id), season_ids=sorted(season_ids),
+            )
+            partitions.append(extract_partition(
+                partition, itertools.islice(seasons, len(season_ids)), teams,
+                [franchise for franchise_id, franchise in franchises.items() if franchise_id in franchise_ids],
+                output_dir, env=env,
+            ))
+
+    save_partition_index(partitions, output_dir)
+    return partitions
+
+
+def save_partition_index(partitions: List[Partition], output_dir: Path):
+    with (output_dir / PARTITION_INDEX_NAME).open("w") as f:
+        json.dump({"partitions": [dataclasses.asdict(p) for p in partitions]}, f, indent=1, sort_keys=True)
+
+
+def load_partition_index(output_dir: Path) -> List[Partition]:
+    with (output_dir / PARTITION_INDEX_NAME).open() as f:
+        return [Partition(**p) for p in json.load(f)["partitions"]]
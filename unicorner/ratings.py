@@ -0,0 +1,184 @@
+"""
+Elo ratings of franchises, updated game by game in the order the games were scheduled.
+
+Ratings follow franchises across seasons (see franchise_seasons.csv), teams which have no
+franchise are rated on their own by team id. Finals count more than regular season games,
+by FINALS_K_MULTIPLIER. Forfeits are not rated at all, a forfeited game says nothing about
+how well either team plays, but they are counted in forfeits.
+
+The state is saved to a JSON checkpoint which records the last game applied so that a later
+update only applies games scheduled after it. Games that were already played at the
+checkpoint but had no score yet are remembered and applied when their score turns up.
+Changes to scores of games which have already been applied are not picked up,
+start from empty ratings to replay the whole history instead.
+"""
+import dataclasses
+import datetime as dt
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .dtos import GameDto, TeamDto
+from .env import get_logger
+from .values import GameOutcomes, SeasonStages
+
+log = get_logger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+FINALS_K_MULTIPLIER = 1.5
+
+# Outcome of the home team -> score of the home team in the Elo formula
+_RESULTS = {
+    GameOutcomes.won: 1.0,
+    GameOutcomes.drawn: 0.5,
+    GameOutcomes.lost: 0.0,
+}
+
+
+def get_franchise_of_team(teams: Iterable[TeamDto]) -> Dict[str, int]:
+    return {team.id: int(team.franchise_id) for team in teams if team.franchise_id}
+
+
+@dataclasses.dataclass
+class EloConfig:
+    initial_rating: float = INITIAL_RATING
+    k_factor: float = K_FACTOR
+    finals_k_multiplier: float = FINALS_K_MULTIPLIER
+
+
+class EloRatings:
+    """
+    Ratings keyed by rating key: franchise id as a string, or team id for teams without a franchise.
+    """
+
+    def __init__(self, franchise_of_team: Dict[str, int] = None, config: EloConfig = None):
+        self.franchise_of_team = franchise_of_team or {}
+        self.config = config or EloConfig()
+        self.ratings: Dict[str, float] = {}
+        self.played: Counter = Counter()
+        self.forfeits: Counter = Counter()
+        # (scheduled_time, game id) of the last game applied in order
+        self.checkpoint: Optional[Tuple[dt.datetime, int]] = None
+        # Ids of games scheduled before the checkpoint which had no score yet
+        self.pending_game_ids: Set[int] = set()
+
+    def get_rating_key(self, team_id: str) -> str:
+        franchise_id = self.franchise_of_team.get(team_id)
+        return team_id if franchise_id is None else str(franchise_id)
+
+    def get_rating(self, key: str) -> float:
+        return self.ratings.get(key, self.config.initial_rating)
+
+    def expected_result(self, key: str, opponent_key: str) -> float:
+        return 1.0 / (1.0 + 10.0 ** ((self.get_rating(opponent_key) - self.get_rating(key)) / 400.0))
+
+    def apply(self, game: GameDto):
+        """
+        Rate a game with a score, regardless of the checkpoint.
+        """
+        home = self.get_rating_key(game.home_team_id)
+        away = self.get_rating_key(game.away_team_id)
+
+        if game.home_team_outcome in (GameOutcomes.forfeit_for, GameOutcomes.forfeit_against):
+            self.forfeits[home] += 1
+            self.forfeits[away] += 1
+            return
+
+        k = self.config.k_factor
+        if SeasonStages.is_finals(game.season_stage):
+            k *= self.config.finals_k_multiplier
+
+        change = k * (_RESULTS[game.home_team_outcome] - self.expected_result(home, away))
+        self.ratings[home] = self.get_rating(home) + change
+        self.ratings[away] = self.get_rating(away) - change
+        self.played[home] += 1
+        self.played[away] += 1
+
+    def update(self, games: Iterable[GameDto]) -> int:
+        """
+        Apply games scheduled after the checkpoint, and pending games which now have a score,
+        in order of scheduled time. Returns the number of games applied.
+
+        Games can be given in any order and may include games applied before, which are skipped.
+        """
+        new_games = []
+        for game in games:
+            if game.scheduled_time is None:
+                continue
+            if self.checkpoint is not None and (game.scheduled_time, game.id) <= self.checkpoint:
+                if game.id in self.pending_game_ids and game.home_team_pts is not None:
+                    new_games.append(game)
+                continue
+            new_games.append(game)
+
+        new_games.sort(key=lambda g: (g.scheduled_time, g.id))
+
+        # Games without a score are only pending if a later game has been played already
+        last_scored = None
+        for game in new_games:
+            if game.home_team_pts is not None:
+                last_scored = game
+
+        applied = 0
+        for game in new_games:
+            key = (game.scheduled_time, game.id)
+            if game.home_team_pts is None:
+                if last_scored is not None and key < (last_scored.scheduled_time, last_scored.id):
+                    self.pending_game_ids.add(game.id)
+                continue
+            self.apply(game)
+            self.pending_game_ids.discard(game.id)
+            applied += 1
+            if self.checkpoint is None or key > self.checkpoint:
+                self.checkpoint = key
+
+        return applied
+
+    def get_ranking(self) -> List[Tuple[str, float]]:
+        """
+        Rating keys and ratings from the highest rating down.
+        """
+        return sorted(self.ratings.items(), key=lambda item: (-item[1], item[0]))
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "config": dataclasses.asdict(self.config),
+            "checkpoint": None if self.checkpoint is None else {
+                "scheduled_time": self.checkpoint[0].isoformat(),
+                "game_id": self.checkpoint[1],
+            },
+            "ratings": self.ratings,
+            "played": dict(self.played),
+            "forfeits": dict(self.forfeits),
+            "pending_game_ids": sorted(self.pending_game_ids),
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict, franchise_of_team: Dict[str, int] = None) -> "EloRatings":
+        if d.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported ratings checkpoint version {d.get('version')}")
+        ratings = cls(franchise_of_team=franchise_of_team, config=EloConfig(**d["config"]))
+        ratings.ratings = d["ratings"]
+        ratings.played = Counter(d["played"])
+        ratings.forfeits = Counter(d["forfeits"])
+        if d["checkpoint"] is not None:
+            ratings.checkpoint = (
+                dt.datetime.fromisoformat(d["checkpoint"]["scheduled_time"]), d["checkpoint"]["game_id"],
+            )
+        ratings.pending_game_ids = set(d["pending_game_ids"])
+        return ratings
+
+    def save(self, path: Path):
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=1, sort_keys=True))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, franchise_of_team: Dict[str, int] = None) -> "EloRatings":
+        return cls.from_dict(json.loads(path.read_text()), franchise_of_team=franchise_of_team)
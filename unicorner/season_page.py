@@ -1,19 +1,75 @@
 import dataclasses
 import datetime as dt
+import functools
 import logging
 import re
+import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
 from urllib.parse import parse_qs
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from cached_property import cached_property
 
+from . import page_events
 from .env import UnicornerEnv
+from .page_events import iter_page_events, read_page_header
+from .slots import add_slots
 from .values import GameOutcomes, ScoreStatuses, SeasonStages
 
 log = logging.getLogger(__name__)
 
+HTML_PARSER = 'html.parser'
+LXML_PARSER = 'lxml'
 
+# Not a BeautifulSoup tree builder but the tree-less reader in unicorner.page_events
+EVENTS_PARSER = 'events'
+
+# Only the elements we read from the pages. The rest of the page (navigation, scripts, ads)
+# is not built into the tree at all. Title and heading are read by read_page_header.
+STANDINGS_PAGE_ELEMENTS = SoupStrainer('table')
+FIXTURES_PAGE_ELEMENTS = SoupStrainer('table')
+
+
+def resolve_html_parser(name=None):
+    """
+    Returns name of the BeautifulSoup tree builder to use, or EVENTS_PARSER.
+    Falls back to the pure-Python html.parser if lxml is requested but not installed.
+    """
+    if name is None or name == HTML_PARSER:
+        return HTML_PARSER
+    if name == EVENTS_PARSER:
+        return EVENTS_PARSER
+    if name == LXML_PARSER:
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            log.warning('lxml is not installed, falling back to {}'.format(HTML_PARSER))
+            return HTML_PARSER
+        return LXML_PARSER
+    raise ValueError('Unsupported HTML parser {!r}'.format(name))
+
+
+# Team id in a link to a team's page, read without parsing the whole query string
+TEAM_ID_REGEX = re.compile(r'[?&]TeamId=([^&#]*)')
+
+# TODO This is very specific to our league
+CUSTOM_SEASON_STAGES = {
+    105: {
+        SeasonStages.semifinal1: SeasonStages.final7th,
+        SeasonStages.semifinal2: SeasonStages.final5th,
+        SeasonStages.semifinal5th1: SeasonStages.final3rd,
+    },
+    108: {
+        SeasonStages.semifinal2: SeasonStages.final5th,
+        SeasonStages.semifinal5th1: SeasonStages.final3rd,
+    },
+}
+
+
+# Pages repeat the same few dates and times over and over and strptime is slow,
+# results are immutable so they can be shared.
+@functools.lru_cache(maxsize=1024)
 def parse_gm_date(date_str):
     """
     Parses date in the format "Thursday 06 Nov 2014"
@@ -22,14 +78,20 @@ def parse_gm_date(date_str):
     return dt.datetime.strptime(date_str, '%A %d %b %Y')
 
 
+@functools.lru_cache(maxsize=256)
 def parse_gm_time(time_str):
     return dt.datetime.strptime(time_str, '%H:%M')
 
 
+def _as_date(value):
+    return value.date() if isinstance(value, dt.datetime) else value
+
+
 def extract_from_link(link, field):
     return parse_qs(link['href'])[field][0]
 
 
+@add_slots
 @dataclasses.dataclass
 class Game:
     id: int = None
@@ -44,8 +106,11 @@ class Game:
     away_team_outcome: str = None
     score_status: str = None
     score_status_comments: str = None
+    home_team_points: int = None
+    away_team_points: int = None
 
 
+@add_slots
 @dataclasses.dataclass
 class GameDay:
     date: dt.datetime = None
@@ -53,6 +118,7 @@ class GameDay:
     games: List[Game] = dataclasses.field(default_factory=list)
 
 
+@add_slots
 @dataclasses.dataclass
 class Team:
     id: str = None
@@ -74,20 +140,131 @@ class Team:
 
 
 class SeasonParse:
+    """
+    Season parsed from its GM standings and fixtures pages.
+
+    Parsing a page only reads the season's metadata (id, name, league and division) from the page's
+    title and heading straight away. The team and game tables are parsed when teams, game_days or
+    any of the game lookups are first accessed, so errors in the tables are raised from there.
+    """
+
     def __init__(self, env: UnicornerEnv = None):
         self.env = env or UnicornerEnv()
-        self.game_days: List[GameDay] = None
         self.season_id: int = None
         self.season_name: str = None
         self.division_id: int = None
         self.league_id: int = None
-        self.teams: Dict[str, Team] = None
+
+        # Pages whose tables have not been parsed yet, see _parse_pending_pages
+        self._pending_standings_html: Optional[str] = None
+        self._pending_fixtures_html: List[str] = []
+
+        # GM team id -> unicorn team id, see unicorn_team_id
+        self._unicorn_team_ids: Dict[Union[int, str], str] = {}
+
+        # Indexes of game_days, maintained by add_game_day and add_game
+        self._game_days_by_date: Dict[dt.date, GameDay] = {}
+        self._games_by_id: Dict[int, Game] = {}
+        self._games_by_team_id: Dict[str, List[Game]] = {}
+
+    @cached_property
+    def teams(self) -> Dict[str, Team]:
+        self._parse_pending_pages()
+        # Set by the standings page parsing, which shadows this property, or None if there was no page
+        return self.__dict__.get('teams')
+
+    @cached_property
+    def game_days(self) -> List[GameDay]:
+        self._parse_pending_pages()
+        return self.__dict__.get('game_days')
+
+    def _parse_pending_pages(self):
+        if self._pending_standings_html is None and not self._pending_fixtures_html:
+            return
+
+        standings_html, self._pending_standings_html = self._pending_standings_html, None
+        fixtures_htmls, self._pending_fixtures_html = self._pending_fixtures_html, []
+
+        if standings_html is not None:
+            self._parse_standings_tables(standings_html)
+        for fixtures_html in fixtures_htmls:
+            self._parse_fixtures_tables(fixtures_html)
+
+    def __getstate__(self):
+        # Parse the tables where the pages are, not where the season is sent to.
+        self._parse_pending_pages()
+
+        # Env holds all score overrides of all seasons, don't drag it along
+        # when a parsed season is sent back from a worker process.
+        state = self.__dict__.copy()
+        state['env'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.env is None:
+            self.env = UnicornerEnv()
 
     def unicorn_team_id(self, gm_team_id):
         """
         Build unicorn team id which consists of GM SeasonId concatenated with GM TeamId
         """
-        return '{:0>4}.{}'.format(int(self.season_id), int(gm_team_id))
+        try:
+            return self._unicorn_team_ids[gm_team_id]
+        except KeyError:
+            pass
+        # Interned because the same team ids are repeated in every game of the season
+        team_id = sys.intern('{:0>4}.{}'.format(int(self.season_id), int(gm_team_id)))
+        self._unicorn_team_ids[gm_team_id] = team_id
+        return team_id
+
+    def add_game_day(self, game_day: GameDay):
+        """
+        Append game_day to game_days and index it together with its games.
+        """
+        if self.game_days is None:
+            self.game_days = []
+        self.game_days.append(game_day)
+        self._game_days_by_date.setdefault(_as_date(game_day.date), game_day)
+        for game in game_day.games:
+            self._index_game(game)
+
+    def add_game(self, game: Game, game_day: GameDay):
+        """
+        Append game to games of game_day and index it.
+        """
+        game_day.games.append(game)
+        self._index_game(game)
+
+    def _index_game(self, game: Game):
+        self._games_by_id.setdefault(game.id, game)
+        self._games_by_team_id.setdefault(game.home_team_id, []).append(game)
+        if game.away_team_id != game.home_team_id:
+            self._games_by_team_id.setdefault(game.away_team_id, []).append(game)
+
+    def get_game(self, game_id: int) -> Optional[Game]:
+        self._parse_pending_pages()
+        return self._games_by_id.get(game_id)
+
+    def games_for_team(self, team_id: str) -> List[Game]:
+        """
+        Games in which team with unicorn team id team_id plays either home or away.
+        """
+        self._parse_pending_pages()
+        return list(self._games_by_team_id.get(team_id, ()))
+
+    def game_day_for(self, date: Union[dt.date, dt.datetime]) -> Optional[GameDay]:
+        self._parse_pending_pages()
+        return self._game_days_by_date.get(_as_date(date))
+
+    def make_soup(self, html, parse_only: SoupStrainer = None) -> BeautifulSoup:
+        parser = resolve_html_parser(self.env.html_parser)
+        if parser != LXML_PARSER:
+            # Straining makes html.parser slower rather than faster because all the
+            # tokenizing is still done in Python, so only lxml gets to skip elements.
+            parse_only = None
+        with self.env.stats.timer('build_tree'):
+            return BeautifulSoup(html, parser, parse_only=parse_only)
 
     def parse_standings_page(self, *, html=None, path: Path = None):
         # Do not extract team names because we are assigning them manually --
@@ -96,256 +273,389 @@ class SeasonParse:
         if html is None:
             html = Path(path).read_text()
 
-        soup = BeautifulSoup(html, 'html.parser')
+        title, heading_link = read_page_header(html)
+        self.season_name = title.split(' - ')[4]
+        if self.season_id is None:
+            self._set_season_from_link(heading_link)
 
-        self.season_name = soup.find('head').find('title').text.strip().split(' - ')[4]
+        # Tables of a previous standings page, if any, are replaced
+        self.__dict__.pop('teams', None)
+        self.__dict__.pop('game_days', None)
+        self._pending_standings_html = html
+        self._pending_fixtures_html = []
 
-        if self.season_id is None:
-            fixtures_link = soup.find('h3').find('a')
-            self.season_id = int(extract_from_link(fixtures_link, 'SeasonId'))
-            self.division_id = int(extract_from_link(fixtures_link, 'DivisionId'))
-            self.league_id = int(extract_from_link(fixtures_link, 'LeagueId'))
+    def _parse_standings_tables(self, html: str):
+        if resolve_html_parser(self.env.html_parser) == EVENTS_PARSER:
+            with self.env.stats.timer('standings_table'):
+                self._parse_standings_events(html)
+            return
+
+        soup = self.make_soup(html, parse_only=STANDINGS_PAGE_ELEMENTS)
+
+        with self.env.stats.timer('standings_table'):
+            self._parse_standings_soup(soup)
+
+    def _reset_game_days(self):
+        self.game_days = []
+        self._game_days_by_date = {}
+        self._games_by_id = {}
+        self._games_by_team_id = {}
+
+    def _set_season_from_link(self, href: str):
+        query = parse_qs(href)
+        self.season_id = int(query['SeasonId'][0])
+        self.division_id = int(query['DivisionId'][0])
+        self.league_id = int(query['LeagueId'][0])
+
+    def _add_team(self, position: int, gm_team_id: int, cell_texts: List[str], points_text: Optional[str]):
+        team_id = self.unicorn_team_id(gm_team_id)
+        self.teams[team_id] = Team(
+            id=team_id,
+            name=cell_texts[1],
+            gm_id=gm_team_id,
+            position=position,
+            played=int(cell_texts[2]),
+            won=int(cell_texts[3]),
+            lost=int(cell_texts[4]),
+            drawn=int(cell_texts[5]),
+            forfeit_for=int(cell_texts[6]),
+            forfeit_against=int(cell_texts[7]),
+            score_for=int(cell_texts[8]),
+            score_against=int(cell_texts[9]),
+            score_difference=int(cell_texts[10]),
+            bonus_points=int(cell_texts[11]),
+            points=int(points_text if points_text is not None else 0),
+        )
+
+    def _parse_standings_soup(self, soup: BeautifulSoup):
+        stats = self.env.stats
 
         self.teams = {}
         team_row_regex = re.compile("STRow.*")
         for i, st_tr in enumerate(soup.find('table', class_='STTable').find_all('tr', class_=team_row_regex)):
-            gm_team_id = int(extract_from_link(st_tr.find('td', class_='STTeamCell').find('a'), 'TeamId'))
-            team_id = self.unicorn_team_id(gm_team_id)
             tds = st_tr.find_all('td')
-            self.teams[team_id] = Team(
-                id=team_id,
-                name=tds[1].text.strip(),
-                gm_id=gm_team_id,
+            self._add_team(
                 position=i + 1,
-                played=int(tds[2].text.strip()),
-                won=int(tds[3].text.strip()),
-                lost=int(tds[4].text.strip()),
-                drawn=int(tds[5].text.strip()),
-                forfeit_for=int(tds[6].text.strip()),
-                forfeit_against=int(tds[7].text.strip()),
-                score_for=int(tds[8].text.strip()),
-                score_against=int(tds[9].text.strip()),
-                score_difference=int(tds[10].text.strip()),
-                bonus_points=int(tds[11].text.strip()),
-                points=int(tds[12].find('a').text.strip() if tds[12].find('a') else 0),
+                gm_team_id=int(_get_team_id(st_tr.find('td', class_='STTeamCell').find('a')['href'])),
+                cell_texts=[td.text.strip() for td in tds],
+                points_text=tds[12].find('a').text.strip() if tds[12].find('a') else None,
             )
 
-        self.game_days = []
+        self._reset_game_days()
         season_stage = SeasonStages.regular
 
         for week_number, t in enumerate(soup.find_all('table', class_='FTable')):
             week_date = parse_gm_date(t.find('tr', class_='FHeader').find('td').text.strip())
-            week_games = []
+            game_day = GameDay(date=week_date, week_number=week_number)
+            self.add_game_day(game_day)
             for g in t.find_all('tr', class_='FRow'):
                 sc = g.find('td', class_='FTitle')
                 if sc:
-                    decoded_ss = SeasonStages.decode_gm_season_stage(sc.text.strip())
-                    if decoded_ss is not None:
-                        season_stage = decoded_ss
-
-                game_season_stage = season_stage
+                    season_stage = SeasonStages.decode_gm_season_stage(sc.text.strip()) or season_stage
 
                 tc = g.find('td', class_='FDate')
                 if not tc:
                     continue
                 game_time_str = tc.text.strip()
                 if game_time_str == 'Bye':
+                    stats.count('byes_skipped')
                     continue
-                game_time = parse_gm_time(game_time_str)
 
                 ic = g.find('td', class_='FScore')
                 if not ic:
                     continue
-                game_id = int(ic.find('nobr')['data-fixture-id'])
-
-                game_score_status = ScoreStatuses.winner_and_score_ok
-                game_score_status_comments = None
-                game_home_team_id = None
-                game_away_team_id = None
-
-                if game_id in self.env.score_overrides:
-                    fs = self.env.score_overrides[game_id]
-                    game_home_team_id = fs['home_team_id']
-                    game_away_team_id = fs['away_team_id']
-                    game_score = (fs['home_team_score'], fs['away_team_score'])
-                    game_score_status = fs['score_status']
-                    game_score_status_comments = fs['score_status_comments']
-                    if fs['season_stage']:
-                        game_season_stage = fs['season_stage']
-                else:
-                    if ic.find('nobr').find('div'):
-                        game_score = (
-                            ic.find('nobr').find('div').find('nobr').text.strip().split(' - ')
-                        )
-                    else:
-                        log.warning((
-                            'Encountered a game with no score and no manual score provided: '
-                            'week_date={} game_time={} game_id={}'
-                        ).format(week_date, game_time, game_id))
-                        game_score = (None, None)
-                        game_score_status = ScoreStatuses.unknown
-                        game_score_status_comments = 'Unresolved'
-
-                game_venue = g.find('td', class_='FPlayingArea').text.strip()
-
-                htc = g.find('td', class_='FHomeTeam')
-                atc = g.find('td', class_='FAwayTeam')
-
-                game = Game(
-                    id=game_id,
-                    starts_at=game_time.replace(
-                        year=week_date.year, month=week_date.month, day=week_date.day
-                    ),
-                    season_stage=game_season_stage,
-                    venue=game_venue,
-                    home_team_id=self.unicorn_team_id(game_home_team_id or extract_from_link(htc.find('a'), 'TeamId')),
-                    home_team_score=int(game_score[0]) if game_score[0] is not None else None,
-                    away_team_id=self.unicorn_team_id(game_away_team_id or extract_from_link(atc.find('a'), 'TeamId')),
-                    away_team_score=int(game_score[1]) if game_score[1] is not None else None,
-                    score_status=game_score_status,
-                    score_status_comments=game_score_status_comments,
+                score_nobr = ic.find('nobr')
+                score_div = score_nobr.find('div')
+
+                self._add_standings_game(
+                    game_day=game_day,
+                    season_stage=season_stage,
+                    game_time_str=game_time_str,
+                    game_id=int(score_nobr['data-fixture-id']),
+                    score_text=score_div.find('nobr').text.strip() if score_div else None,
+                    venue=g.find('td', class_='FPlayingArea').text.strip(),
+                    home_team_link=_get_link_href(g.find('td', class_='FHomeTeam')),
+                    away_team_link=_get_link_href(g.find('td', class_='FAwayTeam')),
                 )
 
-                game.home_team_outcome, game.away_team_outcome = GameOutcomes.from_scores(
-                    game.home_team_score,
-                    game.away_team_score,
+    def _parse_standings_events(self, html: str):
+        stats = self.env.stats
+
+        self.teams = {}
+        self._reset_game_days()
+        season_stage = SeasonStages.regular
+        game_day = None
+        position = 0
+
+        for event, value in iter_page_events(html):
+            if event == page_events.GAME_ROW:
+                if game_day is None:
+                    continue
+
+                sc = value.get('FTitle')
+                if sc:
+                    season_stage = SeasonStages.decode_gm_season_stage(sc.text) or season_stage
+
+                tc = value.get('FDate')
+                if not tc:
+                    continue
+                if tc.text == 'Bye':
+                    stats.count('byes_skipped')
+                    continue
+
+                ic = value.get('FScore')
+                if not ic:
+                    continue
+
+                self._add_standings_game(
+                    game_day=game_day,
+                    season_stage=season_stage,
+                    game_time_str=tc.text,
+                    game_id=int(ic.fixture_id),
+                    score_text=ic.score_text if ic.has_score_div else None,
+                    venue=value['FPlayingArea'].text,
+                    home_team_link=value['FHomeTeam'].link_href,
+                    away_team_link=value['FAwayTeam'].link_href,
                 )
-                game.home_team_points = GameOutcomes.get_points_for(game.home_team_outcome, game.season_stage)
-                game.away_team_points = GameOutcomes.get_points_for(game.away_team_outcome, game.season_stage)
-
-                week_games.append(game)
-
-                # TODO This is very specific to our league
-                custom_season_stages = {
-                    105: {
-                        SeasonStages.semifinal1: SeasonStages.final7th,
-                        SeasonStages.semifinal2: SeasonStages.final5th,
-                        SeasonStages.semifinal5th1: SeasonStages.final3rd,
-                    },
-                    108: {
-                        SeasonStages.semifinal2: SeasonStages.final5th,
-                        SeasonStages.semifinal5th1: SeasonStages.final3rd,
-                    },
-                }
-
-                if self.season_id in custom_season_stages:
-                    game.season_stage = custom_season_stages[self.season_id].get(
-                        game_season_stage,
-                        game_season_stage,
-                    )
-
-                if game.season_stage == SeasonStages.final1st:
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.home_team_id].finals_rank = 1
-                        self.teams[game.away_team_id].finals_rank = 2
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 2
-                        self.teams[game.away_team_id].finals_rank = 1
-                elif game.season_stage == SeasonStages.final3rd:
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.home_team_id].finals_rank = 3
-                        self.teams[game.away_team_id].finals_rank = 4
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 4
-                        self.teams[game.away_team_id].finals_rank = 3
-                elif game.season_stage == SeasonStages.final5th:
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.home_team_id].finals_rank = 5
-                        self.teams[game.away_team_id].finals_rank = 6
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 6
-                        self.teams[game.away_team_id].finals_rank = 5
-                elif game.season_stage == SeasonStages.final7th:
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.home_team_id].finals_rank = 7
-                        self.teams[game.away_team_id].finals_rank = 8
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 8
-                        self.teams[game.away_team_id].finals_rank = 7
-                elif game.season_stage == SeasonStages.semifinal5th1:
-                    # In a 7 team league losing 5th place semifinal means you finish last (7th)
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.away_team_id].finals_rank = 7
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 7
-
-            self.game_days.append(GameDay(
-                date=week_date,
-                week_number=week_number,
-                games=week_games,
-            ))
+
+            elif event == page_events.WEEK:
+                game_day = GameDay(date=parse_gm_date(value), week_number=len(self.game_days))
+                self.add_game_day(game_day)
+
+            elif event == page_events.TEAM_ROW:
+                team_cell = next(cell for cell in value if 'STTeamCell' in cell.classes)
+                position += 1
+                self._add_team(
+                    position=position,
+                    gm_team_id=int(_get_team_id(team_cell.link_href)),
+                    cell_texts=[cell.text for cell in value],
+                    points_text=value[12].link_text,
+                )
+
+    def _add_standings_game(
+        self, game_day: GameDay, season_stage: str, game_time_str: str, game_id: int, score_text: Optional[str],
+        venue: str, home_team_link: Optional[str], away_team_link: Optional[str],
+    ):
+        """
+        Create a game from a result row of the standings page and add it to game_day.
+        score_text is None if GM has no score for the game.
+        """
+        stats = self.env.stats
+        week_date = game_day.date
+        game_time = parse_gm_time(game_time_str)
+        game_season_stage = season_stage
+
+        game_score_status = ScoreStatuses.winner_and_score_ok
+        game_score_status_comments = None
+        game_home_team_id = None
+        game_away_team_id = None
+
+        if game_id in self.env.score_overrides:
+            with stats.timer('apply_overrides'):
+                fs = self.env.score_overrides[game_id]
+                game_home_team_id = fs['home_team_id']
+                game_away_team_id = fs['away_team_id']
+                game_score = (fs['home_team_score'], fs['away_team_score'])
+                game_score_status = fs['score_status']
+                game_score_status_comments = fs['score_status_comments']
+                if fs['season_stage']:
+                    game_season_stage = fs['season_stage']
+            stats.count('overrides_applied')
+        else:
+            if score_text is not None:
+                game_score = score_text.split(' - ')
+            else:
+                log.warning((
+                    'Encountered a game with no score and no manual score provided: '
+                    'week_date={} game_time={} game_id={}'
+                ).format(week_date, game_time, game_id))
+                game_score = (None, None)
+                game_score_status = ScoreStatuses.unknown
+                game_score_status_comments = 'Unresolved'
+                stats.count('unresolved_scores')
+
+        game = Game(
+            id=game_id,
+            starts_at=dt.datetime.combine(week_date, game_time.time()),
+            season_stage=game_season_stage,
+            venue=sys.intern(venue),
+            home_team_id=self.unicorn_team_id(game_home_team_id or _get_team_id(home_team_link)),
+            home_team_score=int(game_score[0]) if game_score[0] is not None else None,
+            away_team_id=self.unicorn_team_id(game_away_team_id or _get_team_id(away_team_link)),
+            away_team_score=int(game_score[1]) if game_score[1] is not None else None,
+            score_status=game_score_status,
+            score_status_comments=game_score_status_comments,
+        )
+
+        game.home_team_outcome, game.away_team_outcome = GameOutcomes.from_scores(
+            game.home_team_score,
+            game.away_team_score,
+        )
+        game.home_team_points = GameOutcomes.get_points_for(game.home_team_outcome, game.season_stage)
+        game.away_team_points = GameOutcomes.get_points_for(game.away_team_outcome, game.season_stage)
+
+        self.add_game(game, game_day)
+        stats.count('games_parsed')
+
+        if self.season_id in CUSTOM_SEASON_STAGES:
+            game.season_stage = CUSTOM_SEASON_STAGES[self.season_id].get(
+                game_season_stage,
+                game_season_stage,
+            )
+
+        finals_ranks = SeasonStages.finals_ranks.get(game.season_stage)
+        if finals_ranks is not None:
+            if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
+                winner_id, loser_id = game.home_team_id, game.away_team_id
+            elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
+                winner_id, loser_id = game.away_team_id, game.home_team_id
+            else:
+                return
+            winner_rank, loser_rank = finals_ranks
+            if winner_rank is not None:
+                self.teams[winner_id].finals_rank = winner_rank
+            self.teams[loser_id].finals_rank = loser_rank
 
     def parse_fixtures_page(self, *, html=None, path: Path = None):
-        assert self.teams, 'Teams should be already loaded before parsing fixtures page'
+        # Checked without accessing teams, which would parse the pending tables
+        tables_parsed = self._pending_standings_html is None and 'teams' in self.__dict__
+        assert self._pending_standings_html is not None or self.__dict__.get('teams'), (
+            'Teams should be already loaded before parsing fixtures page'
+        )
 
         if html is None:
             html = Path(path).read_text()
 
-        soup = BeautifulSoup(html, 'html.parser')
+        if tables_parsed:
+            # teams and game_days are already cached, a pending page would never be parsed
+            self._parse_fixtures_tables(html)
+        else:
+            self._pending_fixtures_html.append(html)
 
-        for ft in soup.find_all('table', class_='FTable'):
-            week_date = parse_gm_date(ft.find('tr', class_='FHeader').find('td').text.strip())
-            week_games = []
+    def _parse_fixtures_tables(self, html: str):
+        if resolve_html_parser(self.env.html_parser) == EVENTS_PARSER:
+            with self.env.stats.timer('fixtures_table'):
+                self._parse_fixtures_events(html)
+            return
+
+        soup = self.make_soup(html, parse_only=FIXTURES_PAGE_ELEMENTS)
 
-            game_day = None
-            matching_game_days = [gd for gd in self.game_days if gd.date == week_date]
-            if matching_game_days:
-                game_day = matching_game_days[0]
+        with self.env.stats.timer('fixtures_table'):
+            self._parse_fixtures_soup(soup)
+
+    def _get_or_add_game_day(self, week_date: dt.datetime) -> GameDay:
+        game_day = self.game_day_for(week_date)
+        if game_day is None:
+            game_day = GameDay(date=week_date)
+            self.add_game_day(game_day)
+        return game_day
+
+    def _parse_fixtures_soup(self, soup: BeautifulSoup):
+        for ft in soup.find_all('table', class_='FTable'):
+            game_day = self._get_or_add_game_day(
+                parse_gm_date(ft.find('tr', class_='FHeader').find('td').text.strip())
+            )
 
             for fr in ft.find_all('tr', class_='FRow'):
                 game_time_cell = fr.find('td', class_='FDate')
                 if not game_time_cell:
                     continue
-                game_time_str = game_time_cell.text.strip()
-                game_time = parse_gm_time(game_time_str).replace(
-                    year=week_date.year, month=week_date.month, day=week_date.day
-                )
 
                 game_id_cell = fr.find('td', class_='FScore')
                 if not game_id_cell:
                     continue
-                game_id = int(game_id_cell.find('nobr')['data-fixture-id'])
-
-                game_venue = fr.find('td', class_='FPlayingArea').text.strip()
 
                 htc = fr.find('td', class_='FHomeTeam')
                 atc = fr.find('td', class_='FAwayTeam')
 
-                if not htc or not atc:
+                self._add_fixtures_game(
+                    game_day=game_day,
+                    game_time_str=game_time_cell.text.strip(),
+                    game_id=int(game_id_cell.find('nobr')['data-fixture-id']),
+                    venue=fr.find('td', class_='FPlayingArea').text.strip(),
+                    home_team_link=_get_link_href(htc) if htc else None,
+                    away_team_link=_get_link_href(atc) if atc else None,
+                )
+
+    def _parse_fixtures_events(self, html: str):
+        game_day = None
+
+        for event, value in iter_page_events(html):
+            if event == page_events.GAME_ROW:
+                if game_day is None:
                     continue
 
-                if not htc.find('a') or not atc.find('a'):
+                game_time_cell = value.get('FDate')
+                if not game_time_cell:
+                    continue
+
+                game_id_cell = value.get('FScore')
+                if not game_id_cell:
                     continue
 
-                game_home_team_id = None
-                game_away_team_id = None
-
-                game = None
-                if game_day:
-                    matching_games = [g for g in game_day.games if g.id == game_id]
-                    if matching_games:
-                        # Do not register a duplicate, the game is already known probably due to the standings page.
-                        log.warning(
-                            f"Discarding game {game_id} ({game_time}) from fixtures page, "
-                            f"the game is already present in the GameDay (probably from standings page)."
-                        )
-                        continue
-                    game = matching_games[0]
-
-                if not game:
-                    game = Game(
-                        id=game_id,
-                        starts_at=game_time,
-                        season_stage=SeasonStages.regular,
-                        venue=game_venue,
-                        home_team_id=self.unicorn_team_id(game_home_team_id or extract_from_link(htc.find('a'), 'TeamId')),
-                        away_team_id=self.unicorn_team_id(game_away_team_id or extract_from_link(atc.find('a'), 'TeamId')),
-                    )
-
-                week_games.append(game)
-
-            if not game_day:
-                self.game_days.append(GameDay(
-                    date=week_date,
-                    games=week_games,
-                ))
+                htc = value.get('FHomeTeam')
+                atc = value.get('FAwayTeam')
+
+                self._add_fixtures_game(
+                    game_day=game_day,
+                    game_time_str=game_time_cell.text,
+                    game_id=int(game_id_cell.fixture_id),
+                    venue=value['FPlayingArea'].text,
+                    home_team_link=htc.link_href if htc else None,
+                    away_team_link=atc.link_href if atc else None,
+                )
+
+            elif event == page_events.WEEK:
+                game_day = self._get_or_add_game_day(parse_gm_date(value))
+
+    def _add_fixtures_game(
+        self, game_day: GameDay, game_time_str: str, game_id: int, venue: str,
+        home_team_link: Optional[str], away_team_link: Optional[str],
+    ):
+        """
+        Create a game from a row of the fixtures page and add it to game_day
+        unless the row has no links to teams or the game is already known.
+        """
+        game_time = dt.datetime.combine(game_day.date, parse_gm_time(game_time_str).time())
+
+        if home_team_link is None or away_team_link is None:
+            return
+
+        if self.get_game(game_id) is not None:
+            # Do not register a duplicate, the game is already known probably due to the standings page.
+            log.warning(
+                f"Discarding game {game_id} ({game_time}) from fixtures page, "
+                f"the game is already known (probably from standings page)."
+            )
+            self.env.stats.count('duplicate_fixtures_discarded')
+            return
+
+        game = Game(
+            id=game_id,
+            starts_at=game_time,
+            season_stage=SeasonStages.regular,
+            venue=sys.intern(venue),
+            home_team_id=self.unicorn_team_id(_get_team_id(home_team_link)),
+            away_team_id=self.unicorn_team_id(_get_team_id(away_team_link)),
+        )
+
+        self.add_game(game, game_day)
+        self.env.stats.count('games_parsed')
+
+
+def _get_link_href(cell) -> Optional[str]:
+    """
+    Returns href of the first link in a BeautifulSoup cell, if any.
+    """
+    link = cell.find('a')
+    return link['href'] if link else None
+
+
+def _get_team_id(href: str) -> str:
+    """
+    Returns value of the TeamId parameter of href, same as parse_qs(href)['TeamId'][0] would.
+    """
+    match = TEAM_ID_REGEX.search(href)
+    if match is None:
+        raise KeyError('TeamId')
+    return match.group(1)
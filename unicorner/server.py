@@ -0,0 +1,387 @@
+"""
+Read-only HTTP server of an extraction, so that dashboards query one process instead of each
+loading gm*s.csv files themselves.
+
+The extraction, a directory of gm*s.csv files or a snapshot file, is loaded once into a SeasonArchive,
+which has the indexes by season, team, franchise and date, and head-to-head tables of all franchises
+are computed once. Each response body is cached by request path and query together with its ETag,
+so a repeated request is a dictionary lookup and clients that send If-None-Match get 304 Not Modified.
+
+The extraction is polled for changes of mtime and size of its files. Once it has changed and then
+stayed the same for one more poll, so that files are not read while they are still being written,
+it is loaded again in a thread and swapped in between requests together with an empty response cache.
+If loading fails, the previous extraction is served on and loading is tried again on the next poll.
+
+All endpoints are GET (or HEAD) and return JSON:
+
+    /seasons
+    /seasons/SEASONID/standings
+    /seasons/SEASONID/fixtures
+    /seasons/SEASONID/results
+    /teams/TEAMID/games
+    /franchises/FRANCHISEID/games?start=DATE&end=DATE
+    /games?date=DATE
+    /head-to-head/FRANCHISEID/OPPONENTID
+
+Standings are computed from games so they have no bonus points, see unicorner.standings.
+
+Requires NumPy, install unicorner[numpy].
+"""
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .archive import SeasonArchive
+from .dtos import FranchiseDto, GameDto, SeasonDto, TeamDto
+from .env import get_logger
+from .extraction import Extraction, get_output_path, read_extraction
+from .franchise_history import FranchiseHistory
+from .standings import COLUMNS, compute_standings
+
+log = get_logger(__name__)
+
+# Responses cached at most, the cache is emptied when it is full
+MAX_CACHED_RESPONSES = 10000
+
+_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def load_extraction(source: Path) -> Extraction:
+    """
+    Extraction from a directory of gm*s.csv files or from a snapshot file.
+    """
+    if source.is_dir():
+        return read_extraction(source)
+
+    from .snapshot import open_snapshot
+
+    with open_snapshot(source) as snapshot:
+        return snapshot.to_extraction()
+
+
+def get_fingerprints(source: Path) -> Dict[str, Tuple[int, int]]:
+    """
+    Name -> (mtime_ns, size) of files of the extraction, files that don't exist are left out.
+    """
+    if source.is_dir():
+        paths = [get_output_path(source, dto_cls) for dto_cls in (FranchiseDto, SeasonDto, TeamDto, GameDto)]
+    else:
+        paths = [source]
+    fingerprints = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        fingerprints[path.name] = (stat.st_mtime_ns, stat.st_size)
+    return fingerprints
+
+
+def _parse_time(query: Dict[str, List[str]], name: str) -> Optional[dt.datetime]:
+    if name not in query:
+        return None
+    try:
+        value = dt.datetime.fromisoformat(query[name][0])
+    except ValueError:
+        raise HttpError(400, f"{name} should be an ISO date or datetime, not {query[name][0]!r}")
+    if value.tzinfo is not None:
+        # Scheduled times of games are GM's local times without a time zone
+        raise HttpError(400, f"{name} should not have a time zone, not {query[name][0]!r}")
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class LoadedExtraction:
+    """
+    Extraction with its indexes and the answers to all endpoints.
+    """
+
+    def __init__(self, extraction: Extraction):
+        self.archive = SeasonArchive.from_extraction(extraction)
+        self.history = FranchiseHistory.from_extraction(extraction)
+        self.head_to_head = self.history.head_to_head()
+        self._teams_by_season: Dict[int, List[TeamDto]] = {}
+        self._franchise_of_team: Dict[str, int] = {}
+        for team in self.archive.teams.values():
+            self._teams_by_season.setdefault(int(team.season_id), []).append(team)
+            if team.franchise_id:
+                self._franchise_of_team[team.id] = int(team.franchise_id)
+
+    def _get_season(self, season_id: str) -> SeasonDto:
+        season = self.archive.seasons.get(int(season_id))
+        if season is None:
+            raise HttpError(404, f"Season {season_id} not found")
+        return season
+
+    def _get_franchise(self, franchise_id: str) -> FranchiseDto:
+        franchise = self.archive.franchises.get(int(franchise_id))
+        if franchise is None:
+            raise HttpError(404, f"Franchise {franchise_id} not found")
+        return franchise
+
+    def seasons(self, query):
+        return [season.to_dict() for _, season in sorted(self.archive.seasons.items())]
+
+    def standings(self, query, season_id):
+        season = self._get_season(season_id)
+        standings = compute_standings(self.archive.games_of_season(season.id))
+        rows = []
+        for team in self._teams_by_season.get(season.id, []):
+            try:
+                values = standings.get(team.id)
+            except KeyError:
+                # The team has played no games yet
+                values = dict.fromkeys(COLUMNS, 0)
+            rows.append({"team_id": team.id, "name": team.name, "franchise_id": team.franchise_id, **values})
+        rows.sort(key=lambda r: (-r["points"], -r["score_difference"], -r["score_for"], r["name"] or ""))
+        return {"season": season.to_dict(), "standings": rows}
+
+    def fixtures(self, query, season_id):
+        season = self._get_season(season_id)
+        return [g.to_dict() for g in self.archive.games_of_season(season.id) if g.home_team_pts is None]
+
+    def results(self, query, season_id):
+        season = self._get_season(season_id)
+        return [g.to_dict() for g in self.archive.games_of_season(season.id) if g.home_team_pts is not None]
+
+    def team_games(self, query, team_id):
+        if team_id not in self.archive.teams:
+            raise HttpError(404, f"Team {team_id} not found")
+        return [g.to_dict() for g in self.archive.games_of_team(team_id)]
+
+    def franchise_games(self, query, franchise_id):
+        franchise = self._get_franchise(franchise_id)
+        games = self.archive.games_of_franchise(
+            int(franchise.id), start=_parse_time(query, "start"), end=_parse_time(query, "end"),
+        )
+        return [g.to_dict() for g in games]
+
+    def games(self, query):
+        date = _parse_time(query, "date")
+        if date is None:
+            raise HttpError(400, "date is required")
+        return [g.to_dict() for g in self.archive.games_on(date.date())]
+
+    def head_to_head_games(self, query, franchise_id, opponent_id):
+        franchise = self._get_franchise(franchise_id)
+        opponent = self._get_franchise(opponent_id)
+        pair = {int(franchise.id), int(opponent.id)}
+        get_franchise_id = self._franchise_of_team.get
+        games = [
+            g for g in self.archive.games_of_franchise(int(franchise.id))
+            if {get_franchise_id(g.home_team_id), get_franchise_id(g.away_team_id)} == pair
+        ]
+        try:
+            record = self.head_to_head.get(int(franchise.id), int(opponent.id))
+        except KeyError:
+            # One of the franchises has no teams
+            record = dict.fromkeys(self.head_to_head.columns, 0)
+        return {
+            "franchise": franchise.to_dict(),
+            "opponent": opponent.to_dict(),
+            "record": record,
+            "games": [g.to_dict() for g in games],
+        }
+
+
+# Path pattern -> name of the LoadedExtraction method which answers it
+ROUTES = (
+    (re.compile(r"/seasons"), "seasons"),
+    (re.compile(r"/seasons/(\d+)/standings"), "standings"),
+    (re.compile(r"/seasons/(\d+)/fixtures"), "fixtures"),
+    (re.compile(r"/seasons/(\d+)/results"), "results"),
+    (re.compile(r"/teams/([\w.]+)/games"), "team_games"),
+    (re.compile(r"/franchises/(\d+)/games"), "franchise_games"),
+    (re.compile(r"/games"), "games"),
+    (re.compile(r"/head-to-head/(\d+)/(\d+)"), "head_to_head_games"),
+)
+
+
+class ExtractionServer:
+    """
+    Call start to listen on a host and port, or use serve to run until cancelled.
+    handle_request answers a request without any I/O.
+    """
+
+    def __init__(self, source: Path, interval: float = 2.0, load: Callable[[Path], Extraction] = load_extraction):
+        self.source = Path(source)
+        self.interval = interval
+        self._load = load
+        self._fingerprints = get_fingerprints(self.source)
+        self.loaded = LoadedExtraction(self._load(self.source))
+        # Request target -> (ETag, body)
+        self._responses: Dict[str, Tuple[str, bytes]] = {}
+        self.reloads = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._watch_task: Optional[asyncio.Task] = None
+
+    def _respond(self, target: str) -> Tuple[str, bytes]:
+        cached = self._responses.get(target)
+        if cached is not None:
+            return cached
+
+        url = urlsplit(target)
+        for pattern, name in ROUTES:
+            match = pattern.fullmatch(url.path.rstrip("/") or "/")
+            if match:
+                break
+        else:
+            raise HttpError(404, f"No such endpoint {url.path}")
+
+        data = getattr(self.loaded, name)(parse_qs(url.query), *match.groups())
+        body = json.dumps(data, default=_json_default, sort_keys=True).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+        if len(self._responses) >= MAX_CACHED_RESPONSES:
+            self._responses.clear()
+        self._responses[target] = etag, body
+        return etag, body
+
+    def handle_request(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Status, headers and body of the response to a request, header names in headers are lower case.
+        """
+        if method not in ("GET", "HEAD"):
+            status, response_headers, body = self._error(HttpError(405, f"{method} is not allowed"))
+            response_headers["Allow"] = "GET, HEAD"
+            return status, response_headers, body
+
+        try:
+            etag, body = self._respond(target)
+        except HttpError as e:
+            return self._error(e)
+        except Exception:
+            log.exception(f"Failed to answer {method} {target}")
+            return self._error(HttpError(500, f"Failed to answer {target}"))
+
+        response_headers = {"Content-Type": "application/json", "ETag": etag, "Cache-Control": "no-cache"}
+        if etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+            return 304, response_headers, b""
+        return 200, response_headers, body
+
+    def _error(self, error: HttpError) -> Tuple[int, Dict[str, str], bytes]:
+        return error.status, {"Content-Type": "application/json"}, json.dumps({"error": str(error)}).encode()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if "content-length" in headers:
+                    await reader.readexactly(int(headers["content-length"]))
+
+                status, response_headers, body = self.handle_request(method, target, headers)
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                response_headers["Content-Length"] = str(len(body))
+                response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+                head = f"HTTP/1.1 {status} {_REASONS[status]}\r\n" + "".join(
+                    f"{name}: {value}\r\n" for name, value in response_headers.items()
+                ) + "\r\n"
+                writer.write(head.encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Disconnected, or a line longer than the stream limit or a bad Content-Length
+            pass
+        finally:
+            writer.close()
+
+    async def reload_if_changed(
+        self, pending: Dict[str, Tuple[int, int]] = None,
+    ) -> Optional[Dict[str, Tuple[int, int]]]:
+        """
+        Reload the extraction if its files are pending, as returned by the previous call, and haven't changed since.
+        Returns the new pending fingerprints, None if there is nothing pending.
+        """
+        fingerprints = get_fingerprints(self.source)
+        if fingerprints == self._fingerprints:
+            return None
+        if fingerprints != pending:
+            # Changed since the previous poll, files may still be being written
+            return fingerprints
+
+        loop = asyncio.get_running_loop()
+        try:
+            loaded = await loop.run_in_executor(None, lambda: LoadedExtraction(self._load(self.source)))
+        except Exception:
+            # Still pending, so the next poll tries again if the files stay the same
+            log.exception(f"Failed to reload {self.source}, serving the previously loaded extraction")
+            return fingerprints
+
+        self._fingerprints = fingerprints
+        self.loaded = loaded
+        self._responses = {}
+        self.reloads += 1
+        log.info(f"Reloaded {self.source}")
+        return None
+
+    async def _watch(self):
+        pending = None
+        while True:
+            await asyncio.sleep(self.interval)
+            pending = await self.reload_if_changed(pending)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> int:
+        """
+        Start listening and watching the extraction for changes until close is called.
+        Pass port 0 to listen on any free port. Returns the port.
+        """
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._watch_task = asyncio.ensure_future(self._watch())
+        port = self._server.sockets[0].getsockname()[1]
+        log.info(f"Serving {self.source} on http://{host}:{port}")
+        return port
+
+    async def close(self):
+        self._watch_task.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000):
+        await self.start(host, port)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
@@ -0,0 +1,24 @@
+import dataclasses
+
+
+def add_slots(cls):
+    """
+    Class decorator to apply on top of @dataclasses.dataclass to give instances
+    __slots__ for all fields instead of a per-instance __dict__.
+
+    dataclasses.dataclass(slots=True) would do the same but is only available in Python 3.10+.
+    """
+    field_names = tuple(f.name for f in dataclasses.fields(cls))
+
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    for name in field_names:
+        # Field defaults are class attributes which would clash with slots of the same name,
+        # the generated __init__ already has the defaults.
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
@@ -0,0 +1,300 @@
+"""
+Binary snapshots of extractions which open in milliseconds.
+
+A snapshot file holds one table per DTO class with one fixed-width column per DTO field:
+
+* integers as int64,
+* datetimes as int64 microseconds since 1970-01-01 and dates as int64 days since 1970-01-01,
+* strings as int32 indexes into a string table shared by all columns, so repeated values
+  such as season stages, outcomes and venues are stored once.
+
+Missing values are NULL in integer columns and -1 in string columns.
+
+Files are opened with mmap and columns are read through memoryviews of the mapped file, nothing
+is copied or parsed until values are asked for. Processes that open the same snapshot share
+its pages. With NumPy, np.frombuffer(table.column(name), dtype=np.int64) is a zero-copy array.
+
+Layout: MAGIC, header length as little-endian uint64, JSON header, then column data,
+each column starting at a multiple of 8 bytes. Columns are in the byte order of the machine
+that wrote the snapshot, which has to be the byte order of the machine that reads it.
+"""
+import dataclasses
+import datetime as dt
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Type, Union
+
+from .dtos import DtoMixin, FranchiseDto, GameDto, SeasonDto, TeamDto
+from .env import get_logger
+from .extraction import Extraction
+
+log = get_logger(__name__)
+
+MAGIC = b"UNISNAP1"
+VERSION = 1
+
+SNAPSHOT_DTO_CLASSES = (FranchiseDto, SeasonDto, TeamDto, GameDto)
+
+# Number of rows decoded at a time when iterating over DTOs
+DEFAULT_CHUNK_SIZE = 10000
+
+# Value of missing integers, dates and datetimes
+NULL = -(2 ** 63)
+
+INT = "int"
+STR = "str"
+DATE = "date"
+DATETIME = "datetime"
+
+_formats = {INT: "q", DATE: "q", DATETIME: "q", STR: "i"}
+
+_EPOCH = dt.datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_MICROSECOND = dt.timedelta(microseconds=1)
+
+_header_length = struct.Struct("<Q")
+
+
+def _get_kind(values: List) -> str:
+    """
+    Kind of column of values, worked out from the values because DTO fields read from CSV files
+    hold strings regardless of their annotations.
+    """
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, dt.datetime):
+            kinds.add(DATETIME)
+        elif isinstance(value, dt.date):
+            kinds.add(DATE)
+        elif isinstance(value, int) and not isinstance(value, bool):
+            kinds.add(INT)
+        elif isinstance(value, str):
+            kinds.add(STR)
+        else:
+            raise TypeError(f"Unsupported value {value!r} in snapshot")
+    if not kinds:
+        return INT
+    if len(kinds) > 1:
+        raise TypeError(f"Mixed values of kinds {sorted(kinds)} in one column")
+    return kinds.pop()
+
+
+def _encode(kind: str, values: List, strings: Dict[str, int]) -> List[int]:
+    if kind == INT:
+        return [NULL if v is None else v for v in values]
+    if kind == DATETIME:
+        return [NULL if v is None else (v - _EPOCH) // _MICROSECOND for v in values]
+    if kind == DATE:
+        return [NULL if v is None else v.toordinal() - _EPOCH_ORDINAL for v in values]
+    return [-1 if v is None else strings.setdefault(v, len(strings)) for v in values]
+
+
+def _decode(kind: str, codes: Iterable[int], strings: List[str]) -> List:
+    if kind == INT:
+        return [None if c == NULL else c for c in codes]
+    if kind == DATETIME:
+        return [None if c == NULL else _EPOCH + c * _MICROSECOND for c in codes]
+    if kind == DATE:
+        return [None if c == NULL else dt.date.fromordinal(c + _EPOCH_ORDINAL) for c in codes]
+    return [None if c < 0 else strings[c] for c in codes]
+
+
+def _to_bytes(fmt: str, codes: List[int]) -> bytes:
+    return array(fmt, codes).tobytes()
+
+
+def write_snapshot(extraction: Union[Dict[Type[DtoMixin], List[DtoMixin]], Iterable[DtoMixin]], path: Path):
+    """
+    Write DTOs to a snapshot at path, replacing the file atomically.
+
+    extraction can be either a dictionary as returned by create_extraction or any iterable of DTOs.
+    """
+    if isinstance(extraction, dict):
+        extraction = itertools.chain.from_iterable(extraction.values())
+
+    dtos_by_cls: Dict[Type[DtoMixin], List[DtoMixin]] = {}
+    for dto in extraction:
+        dtos_by_cls.setdefault(type(dto), []).append(dto)
+
+    strings: Dict[str, int] = {}
+    tables = {}
+    chunks = []
+    offset = 0
+
+    def add_chunk(data: bytes) -> Dict:
+        nonlocal offset
+        chunk = {"offset": offset, "size": len(data)}
+        padding = -len(data) % 8
+        chunks.append(data + b"\0" * padding)
+        offset += len(data) + padding
+        return chunk
+
+    for dto_cls in SNAPSHOT_DTO_CLASSES:
+        dtos = dtos_by_cls.pop(dto_cls, [])
+        rows = [dto.to_row() for dto in dtos]
+        columns = {}
+        for i, name in enumerate(dto_cls.get_field_names()):
+            values = [row[i] for row in rows]
+            kind = _get_kind(values)
+            columns[name] = dict(kind=kind, **add_chunk(_to_bytes(_formats[kind], _encode(kind, values, strings))))
+        tables[dto_cls.get_export_name()] = {"rows": len(rows), "columns": columns}
+
+    if dtos_by_cls:
+        raise TypeError(f"Unsupported DTO classes {sorted(c.__name__ for c in dtos_by_cls)} in snapshot")
+
+    string_data = [s.encode() for s in strings]
+    string_offsets = [0]
+    for s in string_data:
+        string_offsets.append(string_offsets[-1] + len(s))
+    header = {
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "tables": tables,
+        "strings": {
+            "count": len(string_data),
+            "offsets": add_chunk(_to_bytes("q", string_offsets)),
+            "data": add_chunk(b"".join(string_data)),
+        },
+    }
+
+    header_data = json.dumps(header, sort_keys=True).encode()
+    header_data += b" " * (-(len(MAGIC) + _header_length.size + len(header_data)) % 8)
+
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with tmp_path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(_header_length.pack(len(header_data)))
+        f.write(header_data)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+    log.info(f"{sum(t['rows'] for t in tables.values())} rows and {len(strings)} strings written to {path}")
+
+
+class SnapshotTable:
+    """
+    Rows of one DTO class in a snapshot.
+    """
+
+    def __init__(self, snapshot: "Snapshot", dto_cls: Type[DtoMixin], rows: int, columns: Dict[str, Dict]):
+        self.snapshot = snapshot
+        self.dto_cls = dto_cls
+        self.rows = rows
+        self.kinds = {name: column["kind"] for name, column in columns.items()}
+        self._columns = columns
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name: str) -> memoryview:
+        """
+        Zero-copy view of codes of a column, int64 except for string columns which are int32
+        indexes into Snapshot.strings.
+        """
+        column = self._columns[name]
+        return self.snapshot._view(column["offset"], column["size"]).cast(_formats[column["kind"]])
+
+    def values(self, name: str, start: int = 0, stop: int = None) -> List:
+        """
+        Decoded values of a column, or of rows from start to stop of it.
+        """
+        with self.column(name) as codes:
+            return _decode(self.kinds[name], codes[start:stop], self.snapshot.strings)
+
+    def iter_dtos(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterable[DtoMixin]:
+        """
+        DTOs of all rows, decoded chunk_size rows at a time.
+        """
+        init_names = [f.name for f in dataclasses.fields(self.dto_cls) if f.init]
+        for start in range(0, self.rows, chunk_size):
+            columns = [self.values(name, start, start + chunk_size) for name in init_names]
+            for values in zip(*columns):
+                yield self.dto_cls(**dict(zip(init_names, values)))
+
+
+class Snapshot:
+    """
+    Snapshot file opened with mmap. Close it, or use it as a context manager, once
+    all views returned by SnapshotTable.column have been released.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        if self._buffer[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a unicorner snapshot")
+        (header_size,) = _header_length.unpack_from(self._buffer, len(MAGIC))
+        header_start = len(MAGIC) + _header_length.size
+        header = json.loads(bytes(self._buffer[header_start:header_start + header_size]))
+        if header["version"] != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {header['version']} in {path}")
+        if header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written on a {header['byteorder']} endian machine")
+        self._data_start = header_start + header_size
+
+        dto_classes = {dto_cls.get_export_name(): dto_cls for dto_cls in SNAPSHOT_DTO_CLASSES}
+        self.tables: Dict[Type[DtoMixin], SnapshotTable] = {
+            dto_classes[name]: SnapshotTable(self, dto_classes[name], table["rows"], table["columns"])
+            for name, table in header["tables"].items()
+        }
+        self._strings_header = header["strings"]
+        self._strings: Optional[List[str]] = None
+
+    def _view(self, offset: int, size: int) -> memoryview:
+        start = self._data_start + offset
+        return self._buffer[start:start + size]
+
+    @property
+    def strings(self) -> List[str]:
+        """
+        String table, decoded on first access.
+        """
+        if self._strings is None:
+            offsets = self._view(**self._strings_header["offsets"]).cast("q")
+            data = bytes(self._view(**self._strings_header["data"]))
+            self._strings = [
+                data[offsets[i]:offsets[i + 1]].decode() for i in range(self._strings_header["count"])
+            ]
+            offsets.release()
+        return self._strings
+
+    def __getitem__(self, dto_cls: Type[DtoMixin]) -> SnapshotTable:
+        return self.tables[dto_cls]
+
+    def to_extraction(self) -> Extraction:
+        """
+        DTOs of the snapshot, like create_extraction returns them.
+        """
+        extraction = Extraction()
+        for dto_cls, table in self.tables.items():
+            extraction[dto_cls].extend(table.iter_dtos())
+        return extraction
+
+    def close(self):
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_snapshot(path: Path) -> Snapshot:
+    return Snapshot(Path(path))
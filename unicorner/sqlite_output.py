@@ -0,0 +1,109 @@
+"""
+Write extractions to a SQLite database instead of gm*s.csv files.
+
+Each DTO class gets its own table named like the CSV file it would otherwise be written to
+(gmgames, gmseasons, gmteams, gmfranchises) with the DTO's id as the primary key.
+Re-running the extraction against the same database replaces rows with the same ids.
+"""
+import collections
+import dataclasses
+import datetime as dt
+import itertools
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Type, Union
+
+from .dtos import DtoMixin, FranchiseDto, GameDto, SeasonDto, TeamDto
+from .env import get_logger
+
+log = get_logger(__name__)
+
+SQLITE_DTO_CLASSES = (FranchiseDto, SeasonDto, TeamDto, GameDto)
+
+SQLITE_INDEXES = {
+    SeasonDto: [("league_id", "division_id"), ("first_week_date",)],
+    TeamDto: [("season_id",), ("franchise_id",)],
+    GameDto: [("season_id",), ("home_team_id",), ("away_team_id",), ("scheduled_time",)],
+}
+
+# Number of rows of one DTO class collected before they are inserted with executemany
+BATCH_SIZE = 5000
+
+_sqlite_types = {
+    int: "INTEGER",
+    str: "TEXT",
+    dt.date: "TEXT",
+    dt.datetime: "TEXT",
+}
+
+
+def get_create_statements(dto_cls: Type[DtoMixin]) -> List[str]:
+    table = dto_cls.get_export_name()
+    columns = []
+    for f in dataclasses.fields(dto_cls):
+        column = f"{f.name} {_sqlite_types[f.type]}"
+        if f.name == "id":
+            column += " PRIMARY KEY"
+        columns.append(column)
+
+    statements = [f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})"]
+    for index_columns in SQLITE_INDEXES.get(dto_cls, ()):
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{'_'.join(index_columns)} ON {table} ({', '.join(index_columns)})"
+        )
+    return statements
+
+
+def get_upsert_statement(dto_cls: Type[DtoMixin]) -> str:
+    field_names = dto_cls.get_field_names()
+    return (
+        f"INSERT OR REPLACE INTO {dto_cls.get_export_name()} ({', '.join(field_names)}) "
+        f"VALUES ({', '.join('?' for _ in field_names)})"
+    )
+
+
+def _to_sqlite_row(row: Tuple) -> Tuple:
+    # Dates are stored as text in the same format as in the CSV files
+    return tuple(str(v) if isinstance(v, dt.date) else v for v in row)
+
+
+def write_sqlite(extraction: Union[Dict[Type[DtoMixin], List[DtoMixin]], Iterable[DtoMixin]], db_path: Path):
+    """
+    Write DTOs to SQLite database at db_path, creating tables and indexes if they don't exist yet.
+
+    extraction can be either a dictionary as returned by create_extraction or any iterable of DTOs.
+    All rows are written in a single transaction.
+    """
+    if isinstance(extraction, dict):
+        extraction = itertools.chain.from_iterable(extraction.values())
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        with conn:
+            for dto_cls in SQLITE_DTO_CLASSES:
+                for statement in get_create_statements(dto_cls):
+                    conn.execute(statement)
+
+            batches: Dict[Type[DtoMixin], List[Tuple]] = collections.defaultdict(list)
+            counts: Dict[Type[DtoMixin], int] = collections.Counter()
+
+            def flush(dto_cls):
+                conn.executemany(get_upsert_statement(dto_cls), batches[dto_cls])
+                counts[dto_cls] += len(batches[dto_cls])
+                batches[dto_cls].clear()
+
+            for dto in extraction:
+                dto_cls = type(dto)
+                if dto_cls not in SQLITE_DTO_CLASSES:
+                    raise TypeError(f"Cannot write {dto_cls.__name__} to SQLite")
+                batches[dto_cls].append(_to_sqlite_row(dto_cls.get_row_getter()(dto)))
+                if len(batches[dto_cls]) >= BATCH_SIZE:
+                    flush(dto_cls)
+
+            for dto_cls in list(batches):
+                flush(dto_cls)
+    finally:
+        conn.close()
+
+    for dto_cls, count in counts.items():
+        log.info(f"{count} {dto_cls.__name__}s written to {db_path}")
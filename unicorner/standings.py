@@ -0,0 +1,198 @@
+"""
+Standings recomputed from games, to check the standings tables that GM shows.
+
+All games of any number of seasons are turned into a handful of NumPy arrays and every
+standings column of every team is computed with one bincount per column, so the whole
+archive is checked at once.
+
+Only regular season games with a score count. Forfeits count towards forfeit_for and
+forfeit_against instead of won and lost, and points are GameOutcomes.regular_season_points
+plus the team's bonus points from the parsed standings.
+
+Requires NumPy, install unicorner[numpy].
+"""
+import dataclasses
+from operator import attrgetter
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .dtos import GameDto
+from .extraction import iter_game_dtos
+from .season_page import SeasonParse, Team
+from .values import GameOutcomes, SeasonStages
+
+# Standings columns of Team that are recomputed, in the order GM shows them
+COLUMNS = (
+    "played",
+    "won",
+    "lost",
+    "drawn",
+    "forfeit_for",
+    "forfeit_against",
+    "score_for",
+    "score_against",
+    "score_difference",
+    "points",
+)
+
+# Outcome -> code used in arrays
+OUTCOME_CODES = {outcome: code for code, outcome in enumerate(GameOutcomes.regular_season_points)}
+
+# Code -> points, missing outcomes get no points
+_POINTS_BY_CODE = np.array([points or 0 for points in GameOutcomes.regular_season_points.values()], dtype=np.int64)
+
+_OUTCOME_COLUMNS = {
+    "won": OUTCOME_CODES[GameOutcomes.won],
+    "lost": OUTCOME_CODES[GameOutcomes.lost],
+    "drawn": OUTCOME_CODES[GameOutcomes.drawn],
+    "forfeit_for": OUTCOME_CODES[GameOutcomes.forfeit_for],
+    "forfeit_against": OUTCOME_CODES[GameOutcomes.forfeit_against],
+}
+
+_game_columns = attrgetter(
+    "season_stage", "home_team_id", "home_team_pts", "home_team_outcome",
+    "away_team_id", "away_team_pts", "away_team_outcome",
+)
+
+
+@dataclasses.dataclass
+class StandingsMismatch:
+    team_id: str
+    column: str
+    parsed: int
+    computed: int
+
+
+class Standings:
+    """
+    Recomputed standings: team_ids and an array per column in COLUMNS, aligned with team_ids.
+    """
+
+    def __init__(self, team_ids: List[str], columns: Dict[str, np.ndarray]):
+        self.team_ids = team_ids
+        self.columns = columns
+        self._index = {team_id: i for i, team_id in enumerate(team_ids)}
+
+    def __len__(self):
+        return len(self.team_ids)
+
+    def get(self, team_id: str) -> Dict[str, int]:
+        i = self._index[team_id]
+        return {column: int(values[i]) for column, values in self.columns.items()}
+
+    def _align(self, teams: List[Team]) -> np.ndarray:
+        """
+        Positions of teams in team_ids, teams which played no counted games are appended with zeros.
+        """
+        missing = [team.id for team in teams if team.id not in self._index]
+        if missing:
+            for team_id in missing:
+                self._index[team_id] = len(self.team_ids)
+                self.team_ids.append(team_id)
+            self.columns = {
+                column: np.concatenate([values, np.zeros(len(missing), dtype=values.dtype)])
+                for column, values in self.columns.items()
+            }
+        return np.fromiter((self._index[team.id] for team in teams), dtype=np.int64, count=len(teams))
+
+    def compare(self, teams: Iterable[Team]) -> List[StandingsMismatch]:
+        """
+        Mismatches between standings of parsed teams and recomputed standings,
+        ordered by team and then by column.
+        """
+        teams = list(teams)
+        positions = self._align(teams)
+        bonus_points = np.fromiter((team.bonus_points or 0 for team in teams), dtype=np.int64, count=len(teams))
+
+        mismatched = np.zeros(len(teams), dtype=bool)
+        computed_columns = {}
+        parsed_columns = {}
+        for column in COLUMNS:
+            computed = self.columns[column][positions]
+            if column == "points":
+                computed = computed + bonus_points
+            parsed = np.fromiter((getattr(team, column) or 0 for team in teams), dtype=np.int64, count=len(teams))
+            computed_columns[column] = computed
+            parsed_columns[column] = parsed
+            mismatched |= computed != parsed
+
+        mismatches = []
+        for i in np.flatnonzero(mismatched):
+            for column in COLUMNS:
+                parsed, computed = int(parsed_columns[column][i]), int(computed_columns[column][i])
+                if parsed != computed:
+                    mismatches.append(StandingsMismatch(
+                        team_id=teams[i].id, column=column, parsed=parsed, computed=computed,
+                    ))
+        return mismatches
+
+    def correct(self, teams: Iterable[Team]) -> List[Team]:
+        """
+        Copies of teams with their standings columns replaced with recomputed ones.
+        """
+        teams = list(teams)
+        positions = self._align(teams)
+        corrected = []
+        for team, i in zip(teams, positions.tolist()):
+            values = {column: int(self.columns[column][i]) for column in COLUMNS}
+            values["points"] += team.bonus_points or 0
+            corrected.append(dataclasses.replace(team, **values))
+        return corrected
+
+
+def compute_standings(games: Iterable[GameDto]) -> Standings:
+    """
+    Standings of all teams that played in games, of one or many seasons.
+    """
+    team_ids: List[str] = []
+    team_index: Dict[str, int] = {}
+    regular = SeasonStages.regular
+
+    home_teams, away_teams = [], []
+    home_scores, away_scores = [], []
+    home_outcomes, away_outcomes = [], []
+
+    for stage, home_id, home_pts, home_outcome, away_id, away_pts, away_outcome in map(_game_columns, games):
+        if stage != regular or home_pts is None or away_pts is None:
+            continue
+        for team_id in (home_id, away_id):
+            if team_id not in team_index:
+                team_index[team_id] = len(team_ids)
+                team_ids.append(team_id)
+        home_teams.append(team_index[home_id])
+        away_teams.append(team_index[away_id])
+        home_scores.append(home_pts)
+        away_scores.append(away_pts)
+        home_outcomes.append(OUTCOME_CODES[home_outcome])
+        away_outcomes.append(OUTCOME_CODES[away_outcome])
+
+    n = len(team_ids)
+    teams = np.concatenate([np.array(home_teams, dtype=np.int64), np.array(away_teams, dtype=np.int64)])
+    scores_for = np.concatenate([np.array(home_scores, dtype=np.int64), np.array(away_scores, dtype=np.int64)])
+    scores_against = np.concatenate([scores_for[len(home_scores):], scores_for[:len(home_scores)]])
+    outcomes = np.concatenate([np.array(home_outcomes, dtype=np.int64), np.array(away_outcomes, dtype=np.int64)])
+
+    def total(weights=None) -> np.ndarray:
+        return np.bincount(teams, weights=weights, minlength=n).astype(np.int64)
+
+    columns = {"played": total()}
+    for column, code in _OUTCOME_COLUMNS.items():
+        columns[column] = total(outcomes == code)
+    columns["score_for"] = total(scores_for)
+    columns["score_against"] = total(scores_against)
+    columns["score_difference"] = columns["score_for"] - columns["score_against"]
+    columns["points"] = total(_POINTS_BY_CODE[outcomes])
+
+    return Standings(team_ids=team_ids, columns={column: columns[column] for column in COLUMNS})
+
+
+def check_seasons(seasons: Iterable[SeasonParse]) -> Tuple[List[StandingsMismatch], List[Team]]:
+    """
+    Recompute standings of all seasons in one pass and compare them with the parsed standings.
+    Returns mismatches and all teams with corrected standings.
+    """
+    seasons = list(seasons)
+    standings = compute_standings(game for season in seasons for game in iter_game_dtos(season))
+    teams = [team for season in seasons for team in season.teams.values()]
+    return standings.compare(teams), standings.correct(teams)
@@ -0,0 +1,97 @@
+"""
+Timings of extraction stages and counters of what was encountered along the way.
+"""
+import collections
+import time
+from typing import Dict
+
+
+class _Timer:
+    __slots__ = ("stats", "stage", "started")
+
+    def __init__(self, stats: "ExtractionStats", stage: str):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stats.add_time(self.stage, time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_null_timer = _NullTimer()
+
+
+class ExtractionStats:
+    """
+    Accumulates time spent in each stage and counts of events.
+
+    A disabled instance (the default in UnicornerEnv) records nothing and its timer
+    is a shared no-op context manager, so instrumented code costs next to nothing when not profiling.
+
+    Timings of stages include timings of stages nested in them, for example the time to apply score
+    overrides is also included in the time of the standings table walk. When seasons are parsed
+    in worker processes, timings are summed across workers.
+    """
+
+    # Stages in pipeline order, used to order the summary
+    stages = (
+        "read_file",
+        "build_tree",
+        "standings_table",
+        "fixtures_table",
+        "apply_overrides",
+        "build_dtos",
+        "write_output",
+    )
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.timings: Dict[str, float] = collections.Counter()
+        self.counters: Dict[str, int] = collections.Counter()
+
+    def timer(self, stage: str):
+        if not self.enabled:
+            return _null_timer
+        return _Timer(self, stage)
+
+    def add_time(self, stage: str, seconds: float):
+        if self.enabled:
+            self.timings[stage] += seconds
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def merge(self, other: "ExtractionStats"):
+        self.timings.update(other.timings)
+        self.counters.update(other.counters)
+
+    def to_dict(self) -> Dict:
+        return {
+            "timings": dict(self.timings),
+            "counters": dict(self.counters),
+        }
+
+    def format_table(self) -> str:
+        order = {stage: i for i, stage in enumerate(self.stages)}
+        lines = [f"{'stage':<24} {'seconds':>10}"]
+        for stage in sorted(self.timings, key=lambda s: (order.get(s, len(order)), s)):
+            lines.append(f"{stage:<24} {self.timings[stage]:>10.3f}")
+        lines.append("")
+        lines.append(f"{'counter':<32} {'count':>10}")
+        for name in sorted(self.counters):
+            lines.append(f"{name:<32} {self.counters[name]:>10}")
+        return "\n".join(lines)
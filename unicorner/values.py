@@ -22,6 +22,16 @@ class SeasonStages:
 
     all_stages = all_playoffs + (regular,)
 
+    # Finals ranks of the winner and the loser of a game of each stage that decides them.
+    # In a 7 team league losing the 5th place semifinal means you finish last (7th).
+    finals_ranks = {
+        final1st: (1, 2),
+        final3rd: (3, 4),
+        final5th: (5, 6),
+        final7th: (7, 8),
+        semifinal5th1: (None, 7),
+    }
+
     gm_season_stages = {
         'Semi Final 1': semifinal1,
         'Semi Final 2': semifinal2,
@@ -90,6 +100,9 @@ class GameOutcomes:
         won, lost, drawn, forfeit_for, forfeit_against
     )
 
+    # Points of each outcome in each season stage, filled in below the class, see get_points_for
+    points = {}
+
     @classmethod
     def from_scores(cls, home, away):
         if (home, away) == (20, 0):
@@ -107,6 +120,10 @@ class GameOutcomes:
 
     @classmethod
     def get_points_for(cls, outcome, season_stage):
+        try:
+            return cls.points[outcome, season_stage]
+        except KeyError:
+            pass
         assert season_stage in SeasonStages.all_stages
         if season_stage != SeasonStages.regular:
             return 0
@@ -135,6 +152,13 @@ class GameOutcomes:
             return outcome
 
 
+GameOutcomes.points = {
+    (outcome, stage): points if stage == SeasonStages.regular else 0
+    for outcome, points in GameOutcomes.regular_season_points.items()
+    for stage in SeasonStages.all_stages
+}
+
+
 class ScoreStatuses:
     undecided = 0
     winner_and_score_ok = 1
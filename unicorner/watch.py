@@ -0,0 +1,192 @@
+"""
+Watch an input directory for changes of season pages and score overrides and report
+which games have changed, without extracting everything again.
+
+Files are polled for changes of their mtime and size. When a season's pages change,
+only that season is parsed again. When score overrides change, only seasons whose games
+the changed overrides apply to are parsed again. Games of re-parsed seasons are compared
+by game id with the games seen before and each added, changed or removed game is reported.
+"""
+import dataclasses
+import datetime as dt
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .env import get_logger
+from .extraction import create_env, group_season_pages, load_score_overrides, parse_season
+from .parse_cache import score_overrides_digest
+from .season_page import Game
+
+log = get_logger(__name__)
+
+SCORE_OVERRIDES_NAME = "score_overrides.csv"
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+
+@dataclasses.dataclass
+class GameChange:
+    kind: str
+    season_id: int
+    game: Game
+    # Game as it was before the change, None for added games
+    previous: Optional[Game] = None
+    changed_fields: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict:
+        return {
+            "change": self.kind,
+            "season_id": self.season_id,
+            "game": _game_to_dict(self.game),
+            "changed_fields": list(self.changed_fields),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+
+def _game_to_dict(game: Game) -> Dict:
+    d = dataclasses.asdict(game)
+    d["starts_at"] = game.starts_at.isoformat() if isinstance(game.starts_at, dt.datetime) else None
+    return d
+
+
+def diff_games(season_id: int, previous: Dict[int, Game], current: Dict[int, Game]) -> List[GameChange]:
+    """
+    Changes which turn games of a season in previous into games in current, both keyed by game id.
+    """
+    changes = []
+    for game_id, game in current.items():
+        old = previous.get(game_id)
+        if old is None:
+            changes.append(GameChange(kind=ADDED, season_id=season_id, game=game))
+        elif old != game:
+            changed_fields = tuple(
+                f.name for f in dataclasses.fields(Game) if getattr(old, f.name) != getattr(game, f.name)
+            )
+            changes.append(GameChange(
+                kind=CHANGED, season_id=season_id, game=game, previous=old, changed_fields=changed_fields,
+            ))
+    for game_id, old in previous.items():
+        if game_id not in current:
+            changes.append(GameChange(kind=REMOVED, season_id=season_id, game=old, previous=old))
+    return changes
+
+
+class SeasonWatcher:
+    """
+    Call poll to pick up changes since the previous poll, or run to poll until stopped.
+
+    The first poll parses all seasons to learn their games and reports nothing
+    unless emit_initial is set, in which case all games are reported as added.
+    """
+
+    def __init__(
+        self, input_dir: Path, html_parser: str = None,
+        on_change: Callable[[GameChange], None] = None, emit_initial: bool = False,
+    ):
+        self.input_dir = Path(input_dir)
+        self.html_parser = html_parser
+        self.on_change = on_change
+        self.emit_initial = emit_initial
+
+        # File name -> (mtime_ns, size) as of the previous poll
+        self._fingerprints: Dict[str, Tuple[int, int]] = {}
+        # Season id -> game id -> game
+        self._games: Dict[int, Dict[int, Game]] = {}
+        # Season id -> digest of score overrides that applied to the season's games
+        self._overrides_digests: Dict[int, str] = {}
+        self._score_overrides: Dict[int, Dict] = {}
+        self._initialized = False
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        fingerprints = {}
+        for path in self.input_dir.iterdir():
+            if path.suffix == ".html" or path.name == SCORE_OVERRIDES_NAME:
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                fingerprints[path.name] = (stat.st_mtime_ns, stat.st_size)
+        return fingerprints
+
+    def poll(self) -> List[GameChange]:
+        """
+        Changes since the previous poll, which are also passed to on_change.
+
+        The state of the watcher is only updated once all changed seasons have been parsed and
+        all changes have been passed to on_change. If parsing or on_change raises, the next poll
+        reports the same changes again.
+        """
+        fingerprints = self._scan()
+        changed_names = {
+            name for name in fingerprints.keys() | self._fingerprints.keys()
+            if fingerprints.get(name) != self._fingerprints.get(name)
+        }
+
+        season_pages = group_season_pages(self.input_dir)
+        changed_seasons = set()
+
+        score_overrides = self._score_overrides
+        if SCORE_OVERRIDES_NAME in changed_names or not self._initialized:
+            score_overrides = load_score_overrides(self.input_dir)
+            for season_id, games in self._games.items():
+                if score_overrides_digest(score_overrides, games) != self._overrides_digests.get(season_id):
+                    changed_seasons.add(season_id)
+
+        for season_id, pages in season_pages.items():
+            if any(path.name in changed_names for path in pages.values()):
+                changed_seasons.add(season_id)
+        changed_seasons.update(self._games.keys() - season_pages.keys())
+
+        changes = []
+        env = create_env(score_overrides, html_parser=self.html_parser)
+
+        # Season id -> games and digest of overrides, None for removed seasons
+        parsed: Dict[int, Optional[Tuple[Dict[int, Game], str]]] = {}
+        for season_id in sorted(changed_seasons):
+            previous = self._games.get(season_id, {})
+            if season_id in season_pages:
+                log.info(f"Parsing season {season_id}")
+                season = parse_season(env=env, **season_pages[season_id])
+                current = {game.id: game for game_day in season.game_days or () for game in game_day.games}
+                parsed[season_id] = current, score_overrides_digest(score_overrides, current)
+            else:
+                current = {}
+                parsed[season_id] = None
+
+            if self._initialized or self.emit_initial:
+                changes.extend(diff_games(season_id, previous, current))
+
+        if self.on_change is not None:
+            for change in changes:
+                self.on_change(change)
+
+        for season_id, result in parsed.items():
+            if result is None:
+                self._games.pop(season_id, None)
+                self._overrides_digests.pop(season_id, None)
+            else:
+                self._games[season_id], self._overrides_digests[season_id] = result
+        self._score_overrides = score_overrides
+        self._fingerprints = fingerprints
+        self._initialized = True
+
+        return changes
+
+    def run(self, interval: float = 5.0, stop: threading.Event = None):
+        """
+        Poll every interval seconds until stop is set.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                # Pages may be half-written when polled, nothing was recorded so the next poll tries again
+                log.exception(f"Failed to process changes in {self.input_dir}")
+            stop.wait(interval)